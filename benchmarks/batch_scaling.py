@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Batch CLI throughput against worker count.
+
+Writes a synthetic video, then runs glfps.batch over it with 1, 2, 4, ...
+single-threaded workers and reports frames per second and scaling
+efficiency (throughput / (workers x single-worker throughput)).
+
+    python benchmarks/batch_scaling.py --frames 600 --workers 1 2 4 8
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+import cv2
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from glfps.batch import run_batch  # noqa: E402
+from glfps.replay import synthetic_frames  # noqa: E402
+
+
+def write_video(path, frames, fps=30):
+    height, width = frames[0].shape[:2]
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+    for frame in frames:
+        writer.write(frame)
+    writer.release()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch processing throughput against worker count")
+    parser.add_argument("--model", default="yolov8n-pose.pt")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--chunk-size", type=int, default=64)
+    parser.add_argument("--out", default=None, help="Optional JSON output path")
+    args = parser.parse_args(argv)
+
+    report = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        video = os.path.join(tmp, "synthetic.mp4")
+        write_video(video, synthetic_frames(count=args.frames))
+        baseline = None
+        for workers in sorted(set(args.workers)):
+            summary = run_batch([video], out_dir=os.path.join(tmp, f"out{workers}"), model_path=args.model,
+                                workers=workers, threads_per_worker=1, chunk_size=args.chunk_size)
+            baseline = baseline or summary["fps"]
+            summary["efficiency"] = summary["fps"] / (workers * baseline) if baseline else 0.0
+            report[str(workers)] = summary
+            print(f"{workers:3d} workers: {summary['fps']:7.1f} FPS, efficiency {summary['efficiency']:.0%}")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+End-to-end pipeline benchmark.
+
+Replays frames through ScreenCapture's API (via ReplayCapture), the
+DetectionEngine and the overlay renderer, and records throughput and
+capture-to-result latency for every combination of model, backend, input
+resolution and thread count. Runs headless on CPU-only machines.
+
+    python benchmarks/e2e.py run --models yolov8n-pose.pt yolov8s-pose.pt \\
+        --resolutions 640x360 1280x720 --threads 1 4 --out results.json
+    python benchmarks/e2e.py compare benchmarks/baselines/e2e.json results.json
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from glfps.replay import ReplayCapture
+from glfps.screen_capture import downscale_frame
+from glfps.overlay import draw_detections
+
+DEFAULT_SOURCE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'test', 'images')
+
+
+def summarize(samples_ms):
+    """Return summary statistics for a list of millisecond samples."""
+    values = np.asarray(samples_ms, dtype=np.float64)
+    if values.size == 0:
+        return {}
+    return {
+        "mean": float(values.mean()),
+        "p50": float(np.percentile(values, 50)),
+        "p90": float(np.percentile(values, 90)),
+        "p99": float(np.percentile(values, 99)),
+        "max": float(values.max()),
+    }
+
+
+def parse_resolution(text):
+    width, height = text.lower().split('x')
+    return int(width), int(height)
+
+
+def set_threads(threads):
+    """Pin torch/OpenCV thread pools for one benchmark case."""
+    import torch
+    import cv2
+    torch.set_num_threads(threads)
+    cv2.setNumThreads(threads)
+
+
+def run_case(model, backend, resolution, threads, source, frames, warmup):
+    """Benchmark a single configuration and return its result record."""
+    from glfps.detection import DetectionEngine
+
+    set_threads(threads)
+    engine = DetectionEngine(model_path=model, backend=backend)
+    capture = ReplayCapture(source, resolution=resolution)
+
+    for _ in range(warmup):
+        engine.detect(downscale_frame(capture.get_frame()))
+
+    stages = {"capture": [], "preprocess": [], "detect": [], "overlay": []}
+    latencies = []
+    detection_counts = []
+    start = time.perf_counter()
+    for _ in range(frames):
+        t0 = time.perf_counter()
+        frame = capture.get_frame()
+        t1 = time.perf_counter()
+        processed = downscale_frame(frame)
+        t2 = time.perf_counter()
+        detections = engine.detect(processed)
+        t3 = time.perf_counter()
+        draw_detections(processed, detections)
+        t4 = time.perf_counter()
+
+        stages["capture"].append((t1 - t0) * 1000)
+        stages["preprocess"].append((t2 - t1) * 1000)
+        stages["detect"].append((t3 - t2) * 1000)
+        stages["overlay"].append((t4 - t3) * 1000)
+        latencies.append((t4 - t0) * 1000)
+        detection_counts.append(len(detections))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "model": os.path.basename(model),
+        "backend": backend,
+        "resolution": list(resolution),
+        "threads": threads,
+        "frames": frames,
+        "throughput_fps": frames / elapsed if elapsed > 0 else 0.0,
+        "latency_ms": summarize(latencies),
+        "stages_ms": {name: summarize(values) for name, values in stages.items()},
+        "mean_detections": float(np.mean(detection_counts)) if detection_counts else 0.0,
+    }
+
+
+def environment_info():
+    info = {
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    try:
+        import torch
+        info["torch"] = torch.__version__
+    except ImportError:
+        pass
+    return info
+
+
+def case_key(result):
+    return (result["model"], result["backend"], tuple(result["resolution"]), result["threads"])
+
+
+def compare_results(baseline, current, tolerance):
+    """
+    Compare two result documents. Returns a list of (key, metric, base, new, change)
+    tuples for every metric that regressed by more than tolerance (fraction).
+    A baseline case that failed or is missing in the current run is a
+    regression too, reported with metric "failed: <error>" or "missing"
+    and new/change of None.
+    """
+    current_cases = {case_key(r): r for r in current["results"]}
+    regressions = []
+    for base in baseline["results"]:
+        if "error" in base:
+            continue  # Already failing when the baseline was recorded
+        key = case_key(base)
+        result = current_cases.get(key)
+        if result is None or "error" in result:
+            metric = f"failed: {result['error']}" if result is not None else "missing"
+            regressions.append((key, metric, base["throughput_fps"], None, None))
+            continue
+
+        # Lower throughput is a regression
+        old, new = base["throughput_fps"], result["throughput_fps"]
+        if old > 0 and (old - new) / old > tolerance:
+            regressions.append((key, "throughput_fps", old, new, (new - old) / old))
+
+        # Higher latency is a regression
+        for metric in ("p50", "p99"):
+            old = base["latency_ms"].get(metric)
+            new = result["latency_ms"].get(metric)
+            if old and new is not None and (new - old) / old > tolerance:
+                regressions.append((key, f"latency_{metric}_ms", old, new, (new - old) / old))
+    return regressions
+
+
+def cmd_run(args):
+    resolutions = [parse_resolution(r) for r in args.resolutions]
+    results = []
+    cases = list(itertools.product(args.models, args.backends, resolutions, args.threads))
+    for i, (model, backend, resolution, threads) in enumerate(cases, 1):
+        print(f"[{i}/{len(cases)}] {model} backend={backend} {resolution[0]}x{resolution[1]} threads={threads}")
+        try:
+            result = run_case(model, backend, resolution, threads, args.source, args.frames, args.warmup)
+        except Exception as e:
+            print(f"   ❌ Failed: {e}")
+            # Kept in the results, so compare reports it instead of silently skipping the case
+            results.append({"model": os.path.basename(model), "backend": backend, "resolution": list(resolution),
+                            "threads": threads, "error": str(e)})
+            continue
+        print(f"   {result['throughput_fps']:.1f} FPS, p50 {result['latency_ms']['p50']:.1f} ms, "
+              f"p99 {result['latency_ms']['p99']:.1f} ms")
+        results.append(result)
+
+    document = {"environment": environment_info(), "results": results}
+    with open(args.out, 'w') as f:
+        json.dump(document, f, indent=2)
+    print(f"Results written to {args.out}")
+    return 0 if any("error" not in r for r in results) else 1
+
+
+def cmd_compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    regressions = compare_results(baseline, current, args.tolerance)
+    if not regressions:
+        print(f"✅ No regressions beyond {args.tolerance:.0%}")
+        return 0
+
+    print(f"❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+    for key, metric, old, new, change in regressions:
+        model, backend, resolution, threads = key
+        case = f"{model} {backend} {resolution[0]}x{resolution[1]} t={threads}"
+        if new is None:
+            print(f"   {case}: {metric} (baseline {old:.2f} FPS)")
+        else:
+            print(f"   {case}: {metric} {old:.2f} -> {new:.2f} ({change:+.1%})")
+    return 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="End-to-end detection pipeline benchmark")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Run the benchmark matrix")
+    run.add_argument("--models", nargs="+", default=["yolov8n-pose.pt"])
+    run.add_argument("--backends", nargs="+", default=["torch"],
+                     help="torch, onnx, openvino or torchscript")
+    run.add_argument("--resolutions", nargs="+", default=["1280x720"], help="WIDTHxHEIGHT")
+    run.add_argument("--threads", nargs="+", type=int, default=[os.cpu_count() or 1])
+    run.add_argument("--source", default=DEFAULT_SOURCE if os.path.isdir(DEFAULT_SOURCE) else None,
+                     help="Video file or image folder to replay (default: data/test/images, "
+                          "synthetic frames if missing)")
+    run.add_argument("--frames", type=int, default=100)
+    run.add_argument("--warmup", type=int, default=5)
+    run.add_argument("--out", default="e2e_results.json")
+    run.set_defaults(func=cmd_run)
+
+    compare = sub.add_parser("compare", help="Flag regressions against a stored baseline")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--tolerance", type=float, default=0.10,
+                         help="Allowed relative slowdown before failing (default 0.10)")
+    compare.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Accuracy/throughput trade-off of sparse detection with interpolation.
+
+Runs the model on every frame of a video to get reference results, then for
+each fixed stride and each adaptive scene-change threshold replays what
+`batch --interpolate` would write (the model only on key frames,
+interpolation in between, the last key frame's results held to the end)
+and compares it with the reference per frame: recall and
+precision at IoU >= 0.5 and the mean IoU of matched boxes. The speedup is
+frames / key frames, i.e. how many fewer forward passes were needed.
+
+    python benchmarks/interpolation_accuracy.py --video recording.mp4 --strides 1 2 4 8 16
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from glfps.inference_cache import InferenceCache  # noqa: E402
+from glfps.replay import synthetic_frames  # noqa: E402
+from glfps.sampling import associate, hold, interpolate_gap, iou, select_key_frames  # noqa: E402
+from glfps.video_reader import ThreadedVideoReader  # noqa: E402
+
+
+def load_frames(args):
+    if args.video is None:
+        return list(enumerate(synthetic_frames(count=args.max_frames)))
+    frames = []
+    with ThreadedVideoReader(args.video) as reader:
+        for index, frame in reader:
+            if index >= args.max_frames:
+                break
+            frames.append((index, frame))
+    return frames
+
+
+def reference_detections(detector, frames, video=None):
+    """Detections on every frame; model outputs for a video are cached across runs."""
+    if video is None:
+        return {index: detector.detect(frame) for index, frame in frames}
+    cache = InferenceCache()
+    key = cache.key(video, detector)
+    cached = cache.get(key)
+    recorder = cache.recorder(key, cached, input=video, model=detector.model_path)
+    reference = {}
+    for index, frame in frames:
+        raw = cached.raw(index) if cached is not None else None
+        if raw is None:
+            raw = detector.detect_raw(frame)
+            recorder.add(index, raw)
+        reference[index] = detector.parse_raw(raw, frame.shape)
+    recorder.commit()
+    return reference
+
+
+def sparse_results(frames, reference, stride, scene_threshold, min_iou):
+    """What `batch --interpolate` outputs, using the reference results on key frames."""
+    keys = [index for index, _, is_key in select_key_frames(frames, stride, scene_threshold) if is_key]
+    results = {keys[0]: reference[keys[0]]}
+    for start, end in zip(keys, keys[1:]):
+        results.update(interpolate_gap(start, reference[start], end, reference[end], min_iou))
+        results[end] = reference[end]
+    # Like run_batch: nothing after the last key frame to interpolate towards, so its results are held
+    for index, _ in frames:
+        if index > keys[-1]:
+            results[index] = hold(reference[keys[-1]])
+    return results, len(keys)
+
+
+def compare(reference, results, threshold=0.5):
+    matched = truth = predicted = 0
+    overlaps = []
+    for index, expected in reference.items():
+        actual = results[index]
+        pairs = associate(expected, actual, min_iou=threshold)
+        matched += len(pairs)
+        truth += len(expected)
+        predicted += len(actual)
+        overlaps += [iou(expected[i]["bbox"], actual[j]["bbox"]) for i, j in pairs]
+    return {"recall": matched / truth if truth else 1.0,
+            "precision": matched / predicted if predicted else 1.0,
+            "mean_iou": float(np.mean(overlaps)) if overlaps else 0.0}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sparse detection accuracy against speedup")
+    parser.add_argument("--model", default="yolov8n-pose.pt")
+    parser.add_argument("--video", help="Video to evaluate on (default: synthetic frames)")
+    parser.add_argument("--max-frames", type=int, default=300)
+    parser.add_argument("--strides", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--scene-thresholds", type=float, nargs="*", default=[0.02, 0.05, 0.1])
+    parser.add_argument("--max-gap", type=int, default=16, help="Stride used with the scene thresholds")
+    parser.add_argument("--min-iou", type=float, default=0.3)
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always run the reference pass instead of reusing cached model outputs")
+    parser.add_argument("--out", default=None, help="Optional JSON output path")
+    args = parser.parse_args(argv)
+
+    from glfps.detection import DetectionEngine
+    detector = DetectionEngine(model_path=args.model)
+    detector.verbose = False
+    frames = load_frames(args)
+    reference = reference_detections(detector, frames, None if args.no_cache else args.video)
+
+    runs = [(f"stride={k}", k, None) for k in args.strides]
+    runs += [(f"scene={t}", args.max_gap, t) for t in args.scene_thresholds]
+    report = {}
+    for name, stride, threshold in runs:
+        results, keys = sparse_results(frames, reference, stride, threshold, args.min_iou)
+        report[name] = dict(compare(reference, results), speedup=len(frames) / keys)
+        r = report[name]
+        print(f"{name:14s} speedup {r['speedup']:5.2f}x  recall {r['recall']:.3f}  "
+              f"precision {r['precision']:.3f}  mean IoU {r['mean_iou']:.3f}")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""Microbenchmarks for the capture conversion and resize path."""
+
+import numpy as np
+import pytest
+
+from conftest import check_threshold
+from glfps.screen_capture import bgra_to_bgr, downscale_frame
+
+
+@pytest.mark.parametrize("resolution", [(1920, 1080), (3840, 2160)], ids=["1920x1080", "3840x2160"])
+def bench_bgra_to_bgr_downscale(benchmark, resolution):
+    width, height = resolution
+    rng = np.random.default_rng(0)
+    raw = rng.integers(0, 255, size=(height, width, 4), dtype=np.uint8)
+
+    frame = benchmark(lambda: downscale_frame(bgra_to_bgr(raw), max_width=1280))
+    assert frame.shape[1] == 1280 and frame.shape[2] == 3
+    check_threshold(benchmark, f"bgra_to_bgr_downscale[{width}x{height}]")
+
+
+@pytest.mark.parametrize("pix_fmt", ["bgr24", "yuv420p"])
+def bench_raw_pipe_read(benchmark, tmp_path, pix_fmt):
+    """Read 1280x720 frames from a raw stream into RawPipeCapture's reused buffers."""
+    from glfps.raw_pipe import RawPipeCapture
+    width, height, frames = 1280, 720, 8
+    frame_bytes = width * height * 3 if pix_fmt == "bgr24" else width * height * 3 // 2
+    path = tmp_path / "frames.raw"
+    path.write_bytes(np.random.default_rng(0).integers(0, 255, size=frame_bytes * frames, dtype=np.uint8).tobytes())
+
+    capture = RawPipeCapture(str(path), width=width, height=height, pix_fmt=pix_fmt)
+
+    def read_frame():
+        frame = capture.get_frame()
+        if frame is None:  # Rewind instead of reopening so only the read is timed
+            capture.stream.seek(0)
+            capture.eof = False
+            frame = capture.get_frame()
+        return frame
+
+    frame = benchmark(read_frame)
+    assert frame.shape == (height, width, 3)
+    capture.close()
+    check_threshold(benchmark, f"raw_pipe_read[{pix_fmt}]")
+
+
+@pytest.fixture(scope="module")
+def short_video(tmp_path_factory):
+    import cv2
+    from glfps.replay import synthetic_frames
+    path = str(tmp_path_factory.mktemp("video") / "synthetic.avi")
+    frames = synthetic_frames(count=60, resolution=(1280, 720))
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 30, (1280, 720))
+    for frame in frames:
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+@pytest.mark.parametrize("stride", [1, 4], ids=["stride1", "stride4"])
+def bench_video_reader(benchmark, short_video, stride):
+    """Read a 60 frame 1280x720 video through ThreadedVideoReader; skipped frames are only grabbed."""
+    from glfps.video_reader import ThreadedVideoReader
+
+    def read_all():
+        with ThreadedVideoReader(short_video, stride=stride) as reader:
+            return [index for index, _ in reader]
+
+    indices = benchmark(read_all)
+    assert indices == list(range(0, 60, stride))
+    check_threshold(benchmark, f"video_reader[stride{stride}]")
+
+
+def bench_async_writer_write(benchmark, tmp_path):
+    """Producer-side cost of handing a 1280x720 frame to AsyncVideoWriter (drop policy)."""
+    from glfps.video_writer import AsyncVideoWriter
+    frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+    writer = AsyncVideoWriter(str(tmp_path / "out.avi"), fps=30, fourcc='MJPG', policy='drop')
+
+    benchmark(writer.write, frame)
+    writer.close()
+    assert writer.written + writer.dropped > 0
+    check_threshold(benchmark, "async_writer_write[1280x720]")
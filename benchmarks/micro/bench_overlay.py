@@ -0,0 +1,41 @@
+"""Microbenchmarks for overlay drawing and Qt image conversion."""
+
+import os
+
+import numpy as np
+import pytest
+
+from conftest import PEOPLE_COUNTS, check_threshold, make_detections
+from glfps.overlay import draw_detections
+
+
+@pytest.fixture
+def frame():
+    return np.zeros((720, 1280, 3), dtype=np.uint8)
+
+
+@pytest.mark.parametrize("people", PEOPLE_COUNTS)
+def bench_draw_detections(benchmark, frame, people):
+    detections = make_detections(people)
+
+    benchmark(draw_detections, frame, detections)
+    assert frame.any()
+    check_threshold(benchmark, f"draw_detections[{people}]")
+
+
+@pytest.fixture(scope="module")
+def qt_app():
+    """An offscreen QApplication, which QPixmap needs; held by the fixture so it outlives the benchmark."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    pytest.importorskip("PyQt5")
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+def bench_frame_to_pixmap(benchmark, frame, qt_app):
+    from PyQt5.QtCore import QSize
+    from glfps.qt_image import frame_to_pixmap
+
+    pixmap = benchmark(frame_to_pixmap, frame, QSize(640, 480))
+    assert not pixmap.isNull()
+    check_threshold(benchmark, "frame_to_pixmap[1280x720]")
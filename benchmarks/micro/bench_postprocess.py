@@ -0,0 +1,32 @@
+"""Microbenchmarks for detection post-processing."""
+
+import pytest
+
+from conftest import PEOPLE_COUNTS, check_threshold, make_detections, make_keypoints
+from glfps.detection import filter_detections
+
+
+@pytest.mark.parametrize("people", PEOPLE_COUNTS)
+def bench_extract_body_parts(benchmark, engine, people):
+    keypoints = make_keypoints(people)
+    shape = (720, 1280, 3)
+
+    def extract_all():
+        detections = []
+        for person in keypoints:
+            detections.extend(engine._extract_body_parts(person, shape))
+        return detections
+
+    detections = benchmark(extract_all)
+    assert detections
+    check_threshold(benchmark, f"extract_body_parts[{people}]")
+
+
+@pytest.mark.parametrize("people", PEOPLE_COUNTS)
+def bench_filter_detections(benchmark, people):
+    detections = make_detections(people)
+    target_parts = ['head', 'face', 'torso']
+
+    filtered = benchmark(filter_detections, detections, "Custom Selection", target_parts)
+    assert all(d["label"] in target_parts for d in filtered)
+    check_threshold(benchmark, f"filter_detections[{people}]")
@@ -0,0 +1,39 @@
+"""Microbenchmarks for ResultBus fan-out: cost of one publish with N subscribers."""
+
+import pytest
+
+from conftest import check_threshold, make_detections
+from glfps.result_bus import DetectionResult, ResultBus
+
+SUBSCRIBER_COUNTS = [1, 2, 5, 10]
+
+
+@pytest.mark.parametrize("subscribers", SUBSCRIBER_COUNTS)
+def bench_publish_fanout(benchmark, subscribers):
+    bus = ResultBus()
+    # Mix of delivery modes; nobody reads, so queues fill and start dropping
+    # like a stalled consumer would
+    subscriptions = [bus.subscribe(f"sub{i}", mode='latest' if i % 2 == 0 else 'queue', maxsize=8)
+                     for i in range(subscribers)]
+    result = DetectionResult(frame_id=0, timestamp=0.0, detections=make_detections(5))
+
+    benchmark(bus.publish, result)
+    assert all(s.pending() for s in subscriptions)
+    check_threshold(benchmark, f"publish_fanout[{subscribers}]")
+
+
+def bench_publish_with_consumers(benchmark):
+    """Publish while 10 subscribers are being drained on other threads."""
+    from glfps.result_bus import ConsumerThread
+    bus = ResultBus()
+    consumers = [ConsumerThread(bus.subscribe(f"sub{i}", mode='queue', maxsize=8), lambda r: None)
+                 for i in range(10)]
+    for consumer in consumers:
+        consumer.start()
+    result = DetectionResult(frame_id=0, timestamp=0.0, detections=make_detections(5))
+    try:
+        benchmark(bus.publish, result)
+    finally:
+        for consumer in consumers:
+            consumer.stop()
+    check_threshold(benchmark, "publish_fanout_consumers[10]")
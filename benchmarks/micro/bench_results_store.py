@@ -0,0 +1,49 @@
+"""Microbenchmarks for results store queries over an hour of 30 FPS detections."""
+
+import numpy as np
+import pytest
+
+from conftest import check_threshold
+from glfps.results_store import ResultStore, ResultStoreWriter
+
+HOUR_FRAMES = 30 * 60 * 60
+
+
+@pytest.fixture(scope="module", params=["zlib", None], ids=["zlib", "raw"])
+def store(request, tmp_path_factory):
+    """One hour at 30 FPS: a person plus 0-3 heads per frame with random confidences."""
+    path = str(tmp_path_factory.mktemp("store") / "hour.glfstore")
+    rng = np.random.default_rng(0)
+    heads = rng.integers(0, 4, size=HOUR_FRAMES)
+    confidences = rng.uniform(0.3, 1.0, size=(HOUR_FRAMES, 3))
+    writer = ResultStoreWriter(path, fps=30.0, compression=request.param)
+    for frame_id in range(HOUR_FRAMES):
+        detections = [{"bbox": [100, 100, 200, 400], "label": "person", "confidence": 0.9, "type": "person"}]
+        detections += [{"bbox": [150 + 60 * i, 110, 40, 40], "label": "head",
+                        "confidence": float(confidences[frame_id, i]), "type": "body_part"}
+                       for i in range(heads[frame_id])]
+        writer.write(frame_id, frame_id / 30.0, detections)
+    writer.close()
+    store = ResultStore(path)
+    yield store
+    store.close()
+
+
+def bench_store_frames_with(benchmark, store):
+    """Frames with >= 2 heads above 0.7 confidence."""
+    frames = benchmark(store.frames_with, "head", 2, 0.7)
+    assert 0 < len(frames) < HOUR_FRAMES
+    check_threshold(benchmark, f"store_frames_with[{store.compression or 'raw'}]")
+
+
+def bench_store_time_ranges(benchmark, store):
+    ranges = benchmark(store.time_ranges, "head", 3, 0.9)
+    assert ranges and ranges[0][0] <= ranges[0][1]
+    check_threshold(benchmark, f"store_time_ranges[{store.compression or 'raw'}]")
+
+
+def bench_store_frame(benchmark, store):
+    """Random access to one frame's detections."""
+    detections = benchmark(store.frame, HOUR_FRAMES // 2)
+    assert detections[0]["label"] == "person"
+    check_threshold(benchmark, f"store_frame[{store.compression or 'raw'}]")
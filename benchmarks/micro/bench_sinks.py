@@ -0,0 +1,41 @@
+"""Microbenchmarks for detection stream encoding: binary records vs. JSON Lines."""
+
+import os
+import timeit
+
+import pytest
+
+from conftest import check_threshold, make_detections
+from glfps.detection_codec import BinaryEncoder, JsonlEncoder
+
+ENCODE_PEOPLE = [1, 5]
+# The binary format must stay at least this many times cheaper than JSON
+MIN_BINARY_SPEEDUP = 10.0
+
+
+@pytest.mark.parametrize("people", ENCODE_PEOPLE)
+def bench_encode_jsonl(benchmark, people):
+    detections = make_detections(people)
+    data = benchmark(JsonlEncoder().encode, 12345, 1700000000.25, detections)
+    assert data.endswith(b"\n")
+    check_threshold(benchmark, f"encode_jsonl[{people}]")
+
+
+@pytest.mark.parametrize("people", ENCODE_PEOPLE)
+def bench_encode_binary(benchmark, people):
+    detections = make_detections(people)
+    data = benchmark(BinaryEncoder().encode, 12345, 1700000000.25, detections)
+    assert len(data) == 16 + 16 * len(detections)
+    check_threshold(benchmark, f"encode_binary[{people}]")
+
+
+def bench_binary_speedup():
+    """Binary encoding of a 5-person frame must be >= MIN_BINARY_SPEEDUP x cheaper than json.dumps."""
+    detections = make_detections(5)
+    jsonl, binary = JsonlEncoder(), BinaryEncoder()
+    json_time = min(timeit.repeat(lambda: jsonl.encode(1, 1700000000.25, detections), number=2000, repeat=5))
+    binary_time = min(timeit.repeat(lambda: binary.encode(1, 1700000000.25, detections), number=2000, repeat=5))
+    speedup = json_time / binary_time
+    print(f"binary encoding {speedup:.1f}x faster than JSON ({len(detections)} detections)")
+    minimum = MIN_BINARY_SPEEDUP / float(os.environ.get("GLFPS_BENCH_THRESHOLD_SCALE", "1.0"))
+    assert speedup >= minimum, f"binary encoding only {speedup:.1f}x faster than JSON (need {minimum:.1f}x)"
@@ -0,0 +1,93 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+# Upper bounds on the mean time per call in milliseconds. They are set well
+# above what a laptop CPU achieves so they only trip on real regressions;
+# scale them with GLFPS_BENCH_THRESHOLD_SCALE on slower machines.
+THRESHOLDS_MS = {
+    "extract_body_parts[1]": 1.0,
+    "extract_body_parts[5]": 5.0,
+    "extract_body_parts[20]": 20.0,
+    "filter_detections[1]": 0.05,
+    "filter_detections[5]": 0.1,
+    "filter_detections[20]": 0.3,
+    "bgra_to_bgr_downscale[1920x1080]": 15.0,
+    "bgra_to_bgr_downscale[3840x2160]": 60.0,
+    "raw_pipe_read[bgr24]": 3.0,
+    "raw_pipe_read[yuv420p]": 6.0,
+    "video_reader[stride1]": 400.0,
+    "video_reader[stride4]": 250.0,
+    "async_writer_write[1280x720]": 0.1,
+    "draw_detections[1]": 1.0,
+    "draw_detections[5]": 4.0,
+    "draw_detections[20]": 15.0,
+    "frame_to_pixmap[1280x720]": 25.0,
+    "publish_fanout[1]": 0.02,
+    "publish_fanout[2]": 0.03,
+    "publish_fanout[5]": 0.06,
+    "publish_fanout[10]": 0.1,
+    "publish_fanout_consumers[10]": 0.5,
+    "encode_jsonl[1]": 0.5,
+    "encode_jsonl[5]": 2.0,
+    "encode_binary[1]": 0.05,
+    "encode_binary[5]": 0.2,
+    "store_frames_with[zlib]": 30.0,
+    "store_frames_with[raw]": 30.0,
+    "store_time_ranges[zlib]": 30.0,
+    "store_time_ranges[raw]": 30.0,
+    "store_frame[zlib]": 0.5,
+    "store_frame[raw]": 0.5,
+}
+
+PEOPLE_COUNTS = [1, 5, 20]
+
+
+def check_threshold(benchmark, name):
+    """Fail if the benchmark's mean time exceeds its configured threshold."""
+    if benchmark.stats is None:  # --benchmark-disable
+        return
+    scale = float(os.environ.get("GLFPS_BENCH_THRESHOLD_SCALE", "1.0"))
+    limit_ms = THRESHOLDS_MS[name] * scale
+    mean_ms = benchmark.stats.stats.mean * 1000
+    assert mean_ms <= limit_ms, f"{name}: mean {mean_ms:.3f} ms exceeds threshold {limit_ms:.3f} ms"
+
+
+def make_keypoints(people, seed=0):
+    """
+    Synthetic YOLOv8 pose keypoints, one (17, 3) array of x, y, confidence
+    per person, as numpy arrays like the raw outputs parse_raw receives.
+    """
+    rng = np.random.default_rng(seed)
+    keypoints = []
+    for p in range(people):
+        cx = 40 + (p * 61) % 1200
+        cy = 100 + (p * 37) % 400
+        xy = rng.normal(loc=(cx, cy), scale=(30, 120), size=(17, 2))
+        conf = rng.uniform(0.2, 1.0, size=(17, 1))
+        keypoints.append(np.hstack([xy, conf]).astype(np.float32))
+    return keypoints
+
+
+def make_detections(people, seed=0):
+    """Synthetic detection dicts as produced by DetectionEngine.detect for N people."""
+    from glfps.detection import DetectionEngine
+    engine = DetectionEngine(model=object())
+    detections = []
+    for keypoints in make_keypoints(people, seed):
+        detections.extend(engine._extract_body_parts(keypoints, (720, 1280, 3)))
+        detections.append({"bbox": [10, 10, 100, 300], "label": "person",
+                           "confidence": 0.9, "type": "person"})
+    return detections
+
+
+@pytest.fixture
+def engine():
+    """A DetectionEngine without a loaded model, for post-processing benchmarks."""
+    from glfps.detection import DetectionEngine
+    return DetectionEngine(model=object())
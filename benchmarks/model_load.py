@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Model load benchmark: checkpoint load vs. fused artifact load.
+
+Each run launches a fresh interpreter (so nothing is cached in memory) and
+times DetectionEngine construction and the first detection on a synthetic
+frame, which is where ultralytics fuses conv+batchnorm for checkpoints:
+
+- cold:     the original checkpoint (GLFPS_ARTIFACTS=0)
+- artifact: the fused artifact from glfps.model_artifacts, built once
+            before the runs (its build time is reported separately)
+
+    python benchmarks/model_load.py --model yolov8n-pose.pt --runs 5
+    python benchmarks/model_load.py --format torchscript --imgsz 640
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child process; imports are timed separately from the load itself
+CHILD_SCRIPT = r'''
+import json, os, sys, time
+sys.path.insert(0, os.environ["GLFPS_PROJECT_ROOT"])
+marks = {}
+start = time.perf_counter()
+import numpy as np
+import ultralytics
+from glfps.detection import DetectionEngine
+marks["imports"] = time.perf_counter() - start
+
+model, fmt = os.environ["GLFPS_LOAD_MODEL"], os.environ["GLFPS_LOAD_FORMAT"]
+imgsz = int(os.environ["GLFPS_LOAD_IMGSZ"])
+start = time.perf_counter()
+if os.environ["GLFPS_ARTIFACTS"] != "0" and fmt != "fused":
+    from glfps.model_artifacts import get_artifact_cache
+    engine = DetectionEngine(model_path=model, model=get_artifact_cache().load(model, fmt, imgsz))
+else:
+    engine = DetectionEngine(model_path=model)
+marks["load"] = time.perf_counter() - start
+engine.verbose = False
+engine.inference_args["imgsz"] = imgsz
+start = time.perf_counter()
+engine.detect(np.zeros((720, 1280, 3), dtype=np.uint8))
+marks["first_detection"] = time.perf_counter() - start
+marks["ready"] = marks["load"] + marks["first_detection"]
+print("LOAD_MARKS " + json.dumps(marks), flush=True)
+'''
+
+MARKS = ["imports", "load", "first_detection", "ready"]
+
+
+def run_once(model, mode, fmt, imgsz, artifact_dir):
+    env = dict(os.environ)
+    env.update({
+        "GLFPS_PROJECT_ROOT": PROJECT_ROOT,
+        "GLFPS_LOAD_MODEL": model,
+        "GLFPS_LOAD_FORMAT": fmt,
+        "GLFPS_LOAD_IMGSZ": str(imgsz),
+        "GLFPS_ARTIFACTS": "0" if mode == "cold" else "1",
+        "GLFPS_ARTIFACT_DIR": artifact_dir,
+    })
+    result = subprocess.run([sys.executable, "-c", CHILD_SCRIPT], env=env, cwd=PROJECT_ROOT,
+                            capture_output=True, text=True, timeout=600)
+    for line in result.stdout.splitlines():
+        if line.startswith("LOAD_MARKS "):
+            return json.loads(line[len("LOAD_MARKS "):])
+    raise RuntimeError(f"Load probe failed (exit {result.returncode}):\n{result.stderr[-2000:]}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare checkpoint and fused artifact model loads")
+    parser.add_argument("--model", default="yolov8n-pose.pt", help="Local .pt checkpoint")
+    parser.add_argument("--format", choices=["fused", "torchscript"], default="fused")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--artifact-dir", default=None,
+                        help="Artifact cache to use (default: a fresh temporary directory)")
+    parser.add_argument("--out", default=None, help="Optional JSON output path")
+    args = parser.parse_args(argv)
+    if not os.path.isfile(args.model):
+        parser.error(f"{args.model} not found; artifacts are built from local checkpoints")
+    model = os.path.abspath(args.model)
+
+    with tempfile.TemporaryDirectory(prefix="glfps-artifacts-") as tmp:
+        artifact_dir = args.artifact_dir or tmp
+        sys.path.insert(0, PROJECT_ROOT)
+        from glfps.model_artifacts import ArtifactCache
+        cache = ArtifactCache(artifact_dir)
+        start = time.perf_counter()
+        cache.get(model, args.format, args.imgsz)
+        build_seconds = time.perf_counter() - start
+        print(f"Artifact ready in {build_seconds:.2f}s: {cache.paths(model, args.format, args.imgsz)[0]}")
+
+        runs = {"cold": [], "artifact": []}
+        for i in range(args.runs):
+            # Alternate so both modes see the same page cache and thermal state
+            for mode in runs:
+                marks = run_once(model, mode, args.format, args.imgsz, artifact_dir)
+                runs[mode].append(marks)
+                print(f"[{i + 1}/{args.runs}] {mode:8s} load {marks['load']:.3f}s, "
+                      f"first detection {marks['first_detection']:.3f}s")
+
+    summary = {mode: {name: statistics.median(r[name] for r in mode_runs) for name in MARKS}
+               for mode, mode_runs in runs.items()}
+    print("Median seconds:")
+    print(f"   {'':16s} {'cold':>8s} {'artifact':>8s}")
+    for name in MARKS:
+        print(f"   {name:16s} {summary['cold'][name]:8.3f} {summary['artifact'][name]:8.3f}")
+    speedup = summary["cold"]["ready"] / summary["artifact"]["ready"] if summary["artifact"]["ready"] else 0.0
+    print(f"Load + first detection: {speedup:.1f}x faster from the artifact")
+
+    if args.out:
+        report = {"model": args.model, "format": args.format, "imgsz": args.imgsz,
+                  "build_seconds": build_seconds, "median_seconds": summary, "runs": runs}
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Inference jitter with and without UI load, in-process vs. multi-process.
+
+Simulates the GUI's work (Python-level painting/bookkeeping that holds the
+GIL) on the main thread while detection runs either on a thread in the same
+process (like simple_detector.DetectionThread) or in the capture/inference
+processes of glfps.process_pipeline. Reports per-frame inference time and
+result-interval percentiles for each combination.
+
+With --capture-cpus / --inference-cpus the multi-process runs are repeated
+with those stages pinned (glfps.affinity), and every process run reports
+the scheduling jitter its stages measured (interval spread, late wake-ups,
+preemptions, CPU migrations), to compare placements.
+
+    python benchmarks/process_jitter.py --seconds 20 --fps 10
+    python benchmarks/process_jitter.py --capture-cpus 0 --inference-cpus 2-5
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from glfps.affinity import format_report  # noqa: E402
+from glfps.process_pipeline import ProcessPipeline  # noqa: E402
+from glfps.replay import ReplayCapture  # noqa: E402
+
+
+def ui_load(stop, duty=0.8):
+    """Hold the GIL with pure-Python work for `duty` of every 10 ms."""
+    while not stop.is_set():
+        end = time.perf_counter() + 0.010 * duty
+        total = 0
+        while time.perf_counter() < end:
+            total += sum(range(200))
+        time.sleep(0.010 * (1 - duty))
+
+
+def summarize(values):
+    ms = np.array(values) * 1000 if values else np.zeros(1)
+    return {"p50": float(np.percentile(ms, 50)), "p99": float(np.percentile(ms, 99)),
+            "std": float(ms.std()), "count": len(values)}
+
+
+def run_threaded(args, loaded):
+    from glfps.detection import DetectionEngine
+    detector = DetectionEngine(model_path=args.model)
+    detector.verbose = False
+    capture = ReplayCapture(None, max_fps=args.fps)
+    inference, stamps = [], []
+    stop = threading.Event()
+
+    def worker():
+        while not stop.is_set():
+            frame = capture.get_frame()
+            start = time.perf_counter()
+            detector.detect(frame)
+            inference.append(time.perf_counter() - start)
+            stamps.append(time.perf_counter())
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    ui_stop = threading.Event()
+    if loaded:
+        ui = threading.Thread(target=ui_load, args=(ui_stop,), daemon=True)
+        ui.start()
+    time.sleep(args.seconds)
+    stop.set()
+    ui_stop.set()
+    thread.join()
+    return inference, list(np.diff(stamps))
+
+
+def run_processes(args, loaded, stages=None):
+    pipeline = ProcessPipeline(model_path=args.model, source="synthetic", max_fps=args.fps, stages=stages)
+    pipeline.start()
+    inference, stamps = [], []
+    ui_stop = threading.Event()
+    if loaded:
+        ui = threading.Thread(target=ui_load, args=(ui_stop,), daemon=True)
+        ui.start()
+    try:
+        end = time.perf_counter() + args.seconds
+        while time.perf_counter() < end:
+            result = pipeline.get_result(timeout=0.1)
+            if result is None:
+                continue
+            inference.append(result["inference_ms"] / 1000)
+            stamps.append(result["timestamp_ns"] / 1e9)
+            pipeline.read_frame(result["frame_id"])
+    finally:
+        ui_stop.set()
+        pipeline.stop()
+    for report in pipeline.stage_stats.values():
+        print(f"    {format_report(report)}")
+    return inference, list(np.diff(stamps)), dict(pipeline.stage_stats)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inference jitter under simulated UI load")
+    parser.add_argument("--model", default="yolov8n-pose.pt")
+    parser.add_argument("--seconds", type=float, default=20.0, help="Duration of each run")
+    parser.add_argument("--fps", type=float, default=10.0)
+    parser.add_argument("--capture-cpus", help="Also run with the capture process pinned here, e.g. 0")
+    parser.add_argument("--inference-cpus", help="Also run with the inference process pinned here, e.g. 2-5")
+    parser.add_argument("--nice", type=int, help="Nice value for the pinned capture process")
+    parser.add_argument("--out", default=None, help="Optional JSON output path")
+    args = parser.parse_args(argv)
+
+    runs = [("thread", run_threaded), ("process", run_processes)]
+    if args.capture_cpus or args.inference_cpus:
+        stages = {"capture": {"cpus": args.capture_cpus, "nice": args.nice},
+                  "inference": {"cpus": args.inference_cpus}}
+        runs.append(("pinned", lambda a, loaded: run_processes(a, loaded, stages)))
+    report = {}
+    for mode, runner in runs:
+        for loaded in (False, True):
+            name = f"{mode}/{'ui_load' if loaded else 'idle'}"
+            inference, intervals, *stage_stats = runner(args, loaded)
+            report[name] = {"inference_ms": summarize(inference), "interval_ms": summarize(intervals)}
+            if stage_stats:
+                report[name]["stages"] = stage_stats[0]
+            stats = report[name]["inference_ms"]
+            print(f"{name:16s} inference p50 {stats['p50']:.1f} ms, p99 {stats['p99']:.1f} ms, "
+                  f"std {stats['std']:.1f} ms")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Load generator for the local inference server.
+
+Starts `python -m glfps server`, then for each client count runs that many
+client processes sending replayed frames back to back for a fixed duration,
+and reports aggregate throughput, per-request latency and the server's mean
+batch size.
+
+    python benchmarks/server_load.py --clients 1 2 4 8 --duration 10
+    python benchmarks/server_load.py --address 127.0.0.1:7878 --max-delay-ms 10
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from glfps.inference_server import InferenceClient  # noqa: E402
+from glfps.replay import ReplayCapture  # noqa: E402
+
+
+def client_worker(address, source, resolution, duration, start_at, results):
+    capture = ReplayCapture(source, resolution=resolution, loop=True)
+    client = InferenceClient(address)
+    latencies = []
+    try:
+        while time.time() < start_at:
+            time.sleep(0.001)
+        end = start_at + duration
+        while time.time() < end:
+            frame = capture.get_frame()
+            t0 = time.perf_counter()
+            client.detect(frame)
+            latencies.append(time.perf_counter() - t0)
+    finally:
+        client.close()
+    results.put(latencies)
+
+
+def wait_for_server(address, process, timeout=300):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Inference server exited during startup")
+        try:
+            InferenceClient(address, timeout=5).close()
+            return
+        except OSError:
+            time.sleep(0.5)
+    raise TimeoutError(f"Inference server did not come up on {address}")
+
+
+def run_level(address, clients, args):
+    results = multiprocessing.Queue()
+    start_at = time.time() + 1.0  # Let every client connect first
+    workers = [multiprocessing.Process(target=client_worker,
+                                       args=(address, args.source, args.resolution,
+                                             args.duration, start_at, results))
+               for _ in range(clients)]
+    for worker in workers:
+        worker.start()
+    latencies = []
+    for _ in workers:
+        latencies.extend(results.get())
+    for worker in workers:
+        worker.join()
+
+    stats_client = InferenceClient(address)
+    stats = stats_client.stats()
+    stats_client.close()
+
+    ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        "clients": clients,
+        "requests": len(latencies),
+        "throughput_fps": len(latencies) / args.duration,
+        "latency_ms": {"p50": float(np.percentile(ms, 50)), "p99": float(np.percentile(ms, 99)),
+                       "mean": float(ms.mean())},
+        "server": stats,
+    }
+
+
+def parse_resolution(value):
+    width, height = value.lower().split("x")
+    return int(width), int(height)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inference server throughput vs. client count")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per client count")
+    parser.add_argument("--model", action="append", help="backend=model_path (default torch=yolov8n-pose.pt)")
+    parser.add_argument("--address", default=None, help="Socket path or host:port (default: temp socket)")
+    parser.add_argument("--source", default=None, help="Video or image folder (default: synthetic frames)")
+    parser.add_argument("--resolution", type=parse_resolution, default=(1280, 720))
+    parser.add_argument("--max-batch", type=int, default=8)
+    parser.add_argument("--max-delay-ms", type=float, default=5.0)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--out", default=None, help="Optional JSON output path")
+    args = parser.parse_args(argv)
+
+    address = args.address or os.path.join(tempfile.mkdtemp(prefix="glfps-"), "inference.sock")
+    cmd = [sys.executable, "-m", "glfps", "server", "--address", address,
+           "--max-batch", str(args.max_batch), "--max-delay-ms", str(args.max_delay_ms)]
+    for spec in args.model or []:
+        cmd += ["--model", spec]
+    if args.threads:
+        cmd += ["--threads", str(args.threads)]
+
+    server = subprocess.Popen(cmd, cwd=PROJECT_ROOT)
+    levels = []
+    try:
+        wait_for_server(address, server)
+        for clients in args.clients:
+            # Stats are cumulative on the server; report the delta per level
+            before = InferenceClient(address)
+            previous = before.stats()
+            before.close()
+            level = run_level(address, clients, args)
+            for backend, now in level["server"].items():
+                batches = now["batches"] - previous[backend]["batches"]
+                frames = now["frames"] - previous[backend]["frames"]
+                now.update(batches=batches, frames=frames, mean_batch=frames / batches if batches else 0)
+            levels.append(level)
+            mean_batch = max((s["mean_batch"] for s in level["server"].values()), default=0)
+            print(f"{clients:3d} clients: {level['throughput_fps']:7.1f} FPS, "
+                  f"p50 {level['latency_ms']['p50']:.1f} ms, p99 {level['latency_ms']['p99']:.1f} ms, "
+                  f"mean batch {mean_batch:.2f}")
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    if args.out:
+        report = {"max_batch": args.max_batch, "max_delay_ms": args.max_delay_ms,
+                  "resolution": list(args.resolution), "duration": args.duration, "levels": levels}
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Long-running soak test with memory and latency drift detection.
+
+Runs the detection pipeline on replayed frames for N hours of *simulated*
+time (frames are processed as fast as possible and the clock advances by
+1/fps per frame), samples process health at a fixed simulated interval and
+fails if any metric drifts upward faster than its configured slope.
+
+The t=0 sample is taken after a warmup batch of frames, so lazy imports and
+caches that fill on first use are not counted as drift. Slopes are
+Theil-Sen estimates (the median of the slopes between every pair of
+samples) and a metric only fails when the lower end of the slope's 95%
+confidence interval is above its limit: a 30-minute run with p99 latency
+jumping between 5 and 28 ms is noisy, not drifting.
+
+    python benchmarks/soak.py --hours 4 --fps 10 --engine replay --out soak.json
+    python benchmarks/soak.py --hours 1 --mode qt --max-rss-slope 5
+
+Sampled metrics: RSS, tracemalloc traced memory and top growing allocators,
+Python object counts, thread counts and latency percentiles.
+"""
+
+import argparse
+import gc
+import json
+import math
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from glfps.replay import ReplayCapture
+from glfps.screen_capture import downscale_frame
+from glfps.overlay import draw_detections
+from glfps.detection import filter_detections
+
+DEFAULT_SOURCE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'test', 'images')
+
+# Sampled metric -> default allowed growth per simulated hour
+DRIFT_LIMITS = {
+    "rss_mb": 2.0,
+    "traced_mb": 1.0,
+    "objects": 500.0,
+    "threads": 0.01,
+    "latency_p99_ms": 1.0,
+}
+# Fewer samples than this (after warmup) cannot tell drift from noise
+MIN_SAMPLES = 10
+
+
+def theil_sen_slope(x, y, z=1.96):
+    """
+    Median of the slopes between all pairs of points (robust to outliers,
+    unlike least squares) and Sen's confidence interval for it, as
+    (slope, low, high).
+    """
+    n = len(x)
+    i, j = np.triu_indices(n, 1)
+    dx = x[j] - x[i]
+    keep = dx > 0
+    slopes = np.sort((y[j] - y[i])[keep] / dx[keep])
+    spread = z * math.sqrt(n * (n - 1) * (2 * n + 5) / 18)
+    low = min(max(int(round((len(slopes) - spread) / 2)), 0), len(slopes) - 1)
+    high = min(max(int(round((len(slopes) + spread) / 2)), 0), len(slopes) - 1)
+    return float(np.median(slopes)), float(slopes[low]), float(slopes[high])
+
+
+def read_rss_mb():
+    """Current resident set size in MB."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1e6
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1e6
+    except (OSError, ValueError):
+        import resource
+        # Peak rather than current RSS, but still catches monotonic growth
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+
+class ReplayDetector:
+    """
+    Stand-in for DetectionEngine that returns precomputed detections, so a
+    soak can run for many simulated hours without paying for inference.
+    Detections are computed once per distinct replay frame with the real
+    engine when a model is given, otherwise synthesized.
+    """
+    def __init__(self, frames, model_path=None):
+        self.results = []
+        engine = None
+        if model_path:
+            from glfps.detection import DetectionEngine
+            engine = DetectionEngine(model_path=model_path)
+        for i, frame in enumerate(frames):
+            if engine is not None:
+                self.results.append(engine.detect(downscale_frame(frame)))
+            else:
+                self.results.append(self._synthetic(i))
+        self.index = 0
+
+    def _synthetic(self, i):
+        detections = []
+        for p in range(3):
+            x = 100 + p * 300 + (i % 7) * 5
+            detections.append({"bbox": [x, 150, 120, 360], "label": "person",
+                               "confidence": 0.9, "type": "person"})
+            for j, part in enumerate(("head", "torso", "left_arm", "right_leg")):
+                detections.append({"bbox": [x + 10, 150 + j * 80, 60, 70], "label": part,
+                                   "confidence": 0.6 + 0.05 * j, "type": "body_part"})
+        return detections
+
+    def detect(self, frame):
+        detections = self.results[self.index % len(self.results)]
+        self.index += 1
+        # Fresh dicts each frame, like the real engine
+        return [dict(d, bbox=list(d["bbox"])) for d in detections]
+
+
+class SoakMonitor:
+    """Collects periodic samples and fits drift slopes against simulated time."""
+    def __init__(self, use_tracemalloc=True, top_allocators=10):
+        self.samples = []
+        self.latencies = []
+        self.use_tracemalloc = use_tracemalloc
+        self.top_allocators = top_allocators
+        self.baseline_snapshot = None
+        if use_tracemalloc:
+            tracemalloc.start(5)
+
+    def record_latency(self, latency_ms):
+        self.latencies.append(latency_ms)
+
+    def start(self):
+        """Take the t=0 sample once warmup frames are done; their latencies are dropped."""
+        self.latencies = []
+        return self.sample(0, 0)
+
+    def sample(self, sim_seconds, frames):
+        gc.collect()
+        sample = {
+            "sim_hours": sim_seconds / 3600.0,
+            "frames": frames,
+            "rss_mb": read_rss_mb(),
+            "objects": len(gc.get_objects()),
+            "threads": threading.active_count(),
+        }
+        if self.use_tracemalloc:
+            current, peak = tracemalloc.get_traced_memory()
+            sample["traced_mb"] = current / 1e6
+            if self.baseline_snapshot is None:
+                self.baseline_snapshot = tracemalloc.take_snapshot()
+        if self.latencies:
+            values = np.asarray(self.latencies)
+            sample["latency_p50_ms"] = float(np.percentile(values, 50))
+            sample["latency_p99_ms"] = float(np.percentile(values, 99))
+            self.latencies = []
+        self.samples.append(sample)
+        return sample
+
+    def top_growth(self):
+        """Allocation sites that grew the most since the first sample."""
+        if not self.use_tracemalloc or self.baseline_snapshot is None:
+            return []
+        snapshot = tracemalloc.take_snapshot()
+        stats = snapshot.compare_to(self.baseline_snapshot, 'lineno')
+        return [{"site": str(stat.traceback[0]), "size_diff_kb": stat.size_diff / 1e3,
+                 "count_diff": stat.count_diff}
+                for stat in stats[:self.top_allocators]]
+
+    def drift(self, warmup_fraction, min_samples=MIN_SAMPLES):
+        """
+        Per drift metric: Theil-Sen slope per simulated hour with its 95%
+        confidence interval. Metrics with fewer than min_samples samples
+        after warmup are left out.
+        """
+        skip = math.ceil(len(self.samples) * warmup_fraction)
+        samples = self.samples[skip:]
+        drift = {}
+        for metric in DRIFT_LIMITS:
+            points = [(s["sim_hours"], s[metric]) for s in samples if metric in s]
+            if len(points) < max(3, min_samples):
+                continue
+            x, y = np.asarray(points).T
+            slope, low, high = theil_sen_slope(x, y)
+            drift[metric] = {"slope_per_hour": slope, "low": low, "high": high, "samples": len(points)}
+        return drift
+
+
+def run_inline(capture, detector, monitor, total_frames, fps, sample_every, target_parts, warmup_frames=0):
+    """Capture -> downscale -> detect -> filter -> overlay on the calling thread."""
+    frames_per_sample = max(1, int(sample_every * fps))
+    for i in range(-warmup_frames, total_frames):
+        if i == 0:
+            monitor.start()
+        t0 = time.perf_counter()
+        frame = capture.get_frame()
+        processed = downscale_frame(frame)
+        detections = filter_detections(detector.detect(processed), "All Body Parts", target_parts)
+        draw_detections(processed, detections)
+        monitor.record_latency((time.perf_counter() - t0) * 1000)
+
+        if i >= 0 and (i + 1) % frames_per_sample == 0:
+            report_progress(monitor.sample((i + 1) / fps, i + 1), total_frames)
+
+
+def run_qt(capture, detector, monitor, total_frames, fps, sample_every, target_parts, warmup_frames=0):
+    """
+    Run the real DetectionThread from simple_detector with an offscreen Qt
+    application that converts every frame to a QPixmap, like the GUI does.
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication, QLabel
+    from glfps.qt_image import frame_to_pixmap
+    from glfps.qt_result_bridge import ResultBridge
+    from glfps.result_bus import ResultBus
+    from simple_detector import DetectionThread
+
+    app = QApplication.instance() or QApplication([])
+    label = QLabel()
+    label.resize(640, 480)
+    frames_per_sample = max(1, int(sample_every * fps))
+    state = {"frames": -warmup_frames, "last": time.perf_counter()}
+    if not warmup_frames:
+        monitor.start()
+
+    bus = ResultBus()
+    bridge = ResultBridge(bus)
+    thread = DetectionThread(capture, detector, "All Body Parts", target_parts, bus)
+
+    def on_result(result):
+        frame = result.frame.copy()
+        draw_detections(frame, result.detections, mark_body_parts=False)
+        label.setPixmap(frame_to_pixmap(frame, label.size()))
+        # The thread is unpaced, so the frame-to-frame interval is the latency
+        now = time.perf_counter()
+        monitor.record_latency((now - state["last"]) * 1000)
+        state["last"] = now
+        state["frames"] += 1
+        if state["frames"] == 0:
+            monitor.start()
+        elif state["frames"] > 0 and state["frames"] % frames_per_sample == 0:
+            report_progress(monitor.sample(state["frames"] / fps, state["frames"]), total_frames)
+        if state["frames"] >= total_frames:
+            thread.running = False
+            app.quit()
+
+    def on_error(message):
+        print(f"❌ Detection thread error: {message}")
+        app.quit()
+
+    bridge.result_ready.connect(on_result)
+    thread.error_occurred.connect(on_error)
+    thread.start()
+    app.exec_()
+    thread.stop()
+
+
+def report_progress(sample, total_frames):
+    print(f"   t={sample['sim_hours']:.2f}h frames={sample['frames']}/{total_frames} "
+          f"rss={sample['rss_mb']:.1f}MB objects={sample['objects']} threads={sample['threads']} "
+          f"p99={sample.get('latency_p99_ms', 0):.1f}ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Soak test the detection pipeline for memory/latency drift")
+    parser.add_argument("--hours", type=float, default=1.0, help="Simulated hours to run")
+    parser.add_argument("--fps", type=float, default=10.0, help="Simulated capture rate")
+    parser.add_argument("--sample-every", type=float, default=60.0, help="Simulated seconds between samples")
+    parser.add_argument("--source", default=DEFAULT_SOURCE if os.path.isdir(DEFAULT_SOURCE) else None,
+                        help="Video file or image folder to replay")
+    parser.add_argument("--resolution", default="1920x1080", help="Replay resolution WIDTHxHEIGHT")
+    parser.add_argument("--engine", choices=["replay", "real"], default="replay",
+                        help="replay: precomputed detections (fast); real: run DetectionEngine every frame")
+    parser.add_argument("--model", default=None,
+                        help="Model used by the real engine, or to precompute replay detections")
+    parser.add_argument("--mode", choices=["inline", "qt"], default="inline",
+                        help="inline: plain loop; qt: simple_detector.DetectionThread + QPixmap conversion")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="Disable tracemalloc sampling")
+    parser.add_argument("--warmup-fraction", type=float, default=0.1,
+                        help="Fraction of samples ignored when fitting drift slopes")
+    parser.add_argument("--warmup-frames", type=int, default=300,
+                        help="Frames processed before the t=0 sample (lazy imports, caches filling)")
+    parser.add_argument("--min-samples", type=int, default=MIN_SAMPLES,
+                        help="Samples needed after warmup before drift is judged")
+    for metric, limit in DRIFT_LIMITS.items():
+        parser.add_argument(f"--max-{metric.replace('_', '-')}-slope", type=float, default=limit,
+                            dest=f"max_{metric}_slope", help=f"Allowed {metric} growth per hour (default {limit})")
+    parser.add_argument("--out", default="soak_results.json")
+    args = parser.parse_args(argv)
+
+    width, height = (int(v) for v in args.resolution.lower().split('x'))
+    capture = ReplayCapture(args.source, resolution=(width, height))
+    if args.engine == "real":
+        from glfps.detection import DetectionEngine
+        detector = DetectionEngine(model_path=args.model or "yolov8n-pose.pt")
+    else:
+        detector = ReplayDetector(capture.frames, args.model)
+
+    total_frames = int(args.hours * 3600 * args.fps)
+    print(f"Soaking for {args.hours}h simulated ({total_frames} frames at {args.fps} FPS, "
+          f"engine={args.engine}, mode={args.mode})")
+
+    monitor = SoakMonitor(use_tracemalloc=not args.no_tracemalloc)
+    runner = run_qt if args.mode == "qt" else run_inline
+    start = time.perf_counter()
+    runner(capture, detector, monitor, total_frames, args.fps, args.sample_every, None, args.warmup_frames)
+    wall_seconds = time.perf_counter() - start
+
+    drift = monitor.drift(args.warmup_fraction, args.min_samples)
+    slopes = {metric: d["slope_per_hour"] for metric, d in drift.items()}
+    failures = []
+    for metric, d in drift.items():
+        limit = getattr(args, f"max_{metric}_slope")
+        # Rising faster than allowed even at the low end of the interval, not just by noise
+        if d["low"] > limit:
+            failures.append(dict(d, metric=metric, limit=limit))
+
+    report = {
+        "config": vars(args),
+        "wall_seconds": wall_seconds,
+        "slopes_per_hour": slopes,
+        "drift": drift,
+        "failures": failures,
+        "top_allocators": monitor.top_growth(),
+        "samples": monitor.samples,
+    }
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"Finished in {wall_seconds:.0f}s wall time, report written to {args.out}")
+    if not drift:
+        print(f"⚠️ Fewer than {args.min_samples} samples after warmup; drift not judged "
+              f"(run longer or lower --sample-every)")
+        return 0
+    for metric, d in drift.items():
+        print(f"   {metric}: {d['slope_per_hour']:+.3f}/h [{d['low']:+.3f}, {d['high']:+.3f}] "
+              f"(limit {getattr(args, f'max_{metric}_slope')})")
+    if failures:
+        print(f"❌ Drift detected in: {', '.join(f['metric'] for f in failures)}")
+        for site in report["top_allocators"][:5]:
+            print(f"   {site['size_diff_kb']:+.1f} KB  {site['site']}")
+        return 1
+    print("✅ No drift beyond configured slopes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
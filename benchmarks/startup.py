@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark: time-to-first-window and time-to-first-detection.
+
+Each run launches a fresh interpreter (so import costs are real), builds the
+main window offscreen and records when it is shown, then waits for the
+background model preload and times the first detection on a synthetic frame.
+
+    python benchmarks/startup.py --app simple --runs 5
+    python benchmarks/startup.py --app glfps --importtime
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child process; T0 is the parent's wall clock just before spawn
+CHILD_SCRIPT = r'''
+import json, os, sys, time
+T0 = float(os.environ["GLFPS_STARTUP_T0"])
+sys.path.insert(0, os.environ["GLFPS_PROJECT_ROOT"])
+marks = {}
+
+def mark(name):
+    marks[name] = time.time() - T0
+
+mark("interpreter")
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QTimer
+if os.environ["GLFPS_STARTUP_APP"] == "simple":
+    from simple_detector import MainWindow
+else:
+    from glfps.gui import MainWindow
+mark("imports")
+
+app = QApplication(sys.argv)
+window = MainWindow()
+window.show()
+
+def after_show():
+    mark("first_window")
+    import numpy as np
+    from glfps.model_cache import get_model_cache
+    # Joins the preload the window started; loads now if it did not
+    engine = get_model_cache().get(os.environ["GLFPS_STARTUP_MODEL"])
+    mark("model_ready")
+    engine.detect(np.zeros((720, 1280, 3), dtype=np.uint8))
+    mark("first_detection")
+    print("STARTUP_MARKS " + json.dumps(marks), flush=True)
+    os._exit(0)
+
+QTimer.singleShot(0, after_show)
+app.exec_()
+'''
+
+MARKS = ["interpreter", "imports", "first_window", "model_ready", "first_detection"]
+
+
+def run_once(app, model, importtime=False):
+    env = dict(os.environ)
+    env.update({
+        "QT_QPA_PLATFORM": env.get("QT_QPA_PLATFORM", "offscreen"),
+        "GLFPS_PROJECT_ROOT": PROJECT_ROOT,
+        "GLFPS_STARTUP_APP": app,
+        "GLFPS_STARTUP_MODEL": model,
+    })
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ["-X", "importtime"]
+    cmd += ["-c", CHILD_SCRIPT]
+
+    env["GLFPS_STARTUP_T0"] = repr(time.time())
+    result = subprocess.run(cmd, env=env, cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=600)
+    for line in result.stdout.splitlines():
+        if line.startswith("STARTUP_MARKS "):
+            return json.loads(line[len("STARTUP_MARKS "):]), result.stderr
+    raise RuntimeError(f"Startup probe failed (exit {result.returncode}):\n{result.stderr[-2000:]}")
+
+
+def slowest_imports(stderr, top=15):
+    """Parse `-X importtime` output into the slowest modules by cumulative time."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        try:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            rows.append((int(cumulative), name.strip()))
+        except ValueError:
+            continue
+    rows.sort(reverse=True)
+    return [{"module": name, "cumulative_ms": us / 1000} for us, name in rows[:top]]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure time-to-first-window and time-to-first-detection")
+    parser.add_argument("--app", choices=["simple", "glfps"], default="simple",
+                        help="simple: simple_detector.py, glfps: python -m glfps / main.py")
+    parser.add_argument("--model", default="yolov8n-pose.pt")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--importtime", action="store_true", help="Also report the slowest imports")
+    parser.add_argument("--out", default=None, help="Optional JSON output path")
+    args = parser.parse_args(argv)
+
+    runs = []
+    stderr = ""
+    for i in range(args.runs):
+        marks, stderr = run_once(args.app, args.model, importtime=args.importtime and i == 0)
+        runs.append(marks)
+        print(f"[{i + 1}/{args.runs}] window {marks['first_window']:.2f}s, "
+              f"first detection {marks['first_detection']:.2f}s")
+
+    summary = {name: statistics.median(r[name] for r in runs) for name in MARKS}
+    print("Median seconds since launch:")
+    for name in MARKS:
+        print(f"   {name:16s} {summary[name]:.3f}")
+
+    report = {"app": args.app, "model": args.model, "median_seconds": summary, "runs": runs}
+    if args.importtime:
+        report["slowest_imports"] = slowest_imports(stderr)
+        print("Slowest imports (cumulative):")
+        for row in report["slowest_imports"]:
+            print(f"   {row['cumulative_ms']:8.1f} ms  {row['module']}")
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
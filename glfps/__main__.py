@@ -0,0 +1,268 @@
+"""
+Command line entry point.
+
+    python -m glfps                     # launch the GUI
+    python -m glfps run --config service.yaml
+    python -m glfps serve ...           # alias for run
+    python -m glfps server --model torch=yolov8n-pose.pt
+    python -m glfps batch videos/*.mp4 --output-dir results
+    python -m glfps query results/video.glfstore --label head --min-count 2
+    python -m glfps autotune --model yolov8n-pose.pt --size 1280x720
+    python -m glfps profile --model yolov8n-pose.pt
+    python -m glfps clips video.mp4 results/video.glfstore --label person --pre-roll 2
+"""
+
+import argparse
+import sys
+
+
+def add_run_parser(sub):
+    for name in ("run", "serve"):
+        run = sub.add_parser(name, help="Run headless detection (no Qt required)")
+        run.add_argument("--config", help="JSON or YAML service config")
+        run.add_argument("--source",
+                         help="'screen', a video file / image folder to replay, or pipe:PATH "
+                              "for raw frames from a FIFO, file or stdin (pipe:-)")
+        run.add_argument("--width", type=int, help="Raw frame width for pipe sources")
+        run.add_argument("--height", type=int, help="Raw frame height for pipe sources")
+        run.add_argument("--pix-fmt", help="Raw pixel format for pipe sources (default bgr24)")
+        run.add_argument("--model", help="Model path")
+        run.add_argument("--backend", help="torch, onnx, openvino or torchscript")
+        run.add_argument("--threads", type=int, help="Inference threads")
+        run.add_argument("--sink", action="append",
+                         help="JSONL path ('-' for stdout), .bin path, unix:PATH or fifo:PATH; may be repeated")
+        run.add_argument("--max-frames", type=int)
+        run.set_defaults(func=cmd_run)
+
+
+def add_server_parser(sub):
+    server = sub.add_parser("server", help="Run the local inference server shared by capture clients")
+    server.add_argument("--address", default=None,
+                        help="Unix socket path, or host:port for loopback TCP")
+    server.add_argument("--model", action="append",
+                        help="backend=model_path, e.g. onnx=yolov8n-pose.pt; may be repeated")
+    server.add_argument("--max-batch", type=int, default=8)
+    server.add_argument("--max-delay-ms", type=float, default=5.0,
+                        help="Longest time the first request in a batch waits for others")
+    server.add_argument("--threads", type=int, help="Inference threads")
+    server.set_defaults(func=cmd_server)
+
+
+def add_batch_parser(sub):
+    batch = sub.add_parser("batch", help="Process videos and image folders offline with a worker pool")
+    batch.add_argument("inputs", nargs="+",
+                       help="Video files, image folders, or .txt files listing one per line")
+    batch.add_argument("--output-dir", default="batch_results")
+    batch.add_argument("--format", choices=("jsonl", "columnar"), default="jsonl",
+                       help="Per-input <name>.jsonl, or a <name>.glfstore results store")
+    batch.add_argument("--annotate", action="store_true",
+                       help="Also write <name>_annotated.mp4 (or a folder for image inputs)")
+    batch.add_argument("--model", default="yolov8n-pose.pt", help="Model path")
+    batch.add_argument("--backend", default="torch", help="torch, onnx, openvino or torchscript")
+    batch.add_argument("--workers", type=int, help="Worker processes (default: one per core)")
+    batch.add_argument("--threads", type=int, help="Inference threads per worker (default: cores / workers)")
+    batch.add_argument("--pin", action="store_true",
+                       help="Pin every worker to its own set of --threads CPUs")
+    batch.add_argument("--chunk-size", type=int, default=256,
+                       help="Frames per work item (video chunks are aligned to keyframes)")
+    batch.add_argument("--stride", type=int, default=1,
+                       help="Run the model on every Nth frame (the longest gap with --scene-threshold)")
+    batch.add_argument("--scene-threshold", type=float,
+                       help="Run the model on frames whose content changed by more than this "
+                            "fraction since the last one run, e.g. 0.08")
+    batch.add_argument("--interpolate", action="store_true",
+                       help="Fill frames the model skipped by interpolating between the results around them")
+    batch.add_argument("--mode", default="All Body Parts",
+                       choices=("All Body Parts", "Person Only", "Custom Selection"))
+    batch.add_argument("--parts", help="Comma separated body parts for Custom Selection")
+    batch.set_defaults(func=cmd_batch)
+
+
+def add_query_parser(sub):
+    query = sub.add_parser("query", help="Search a results store written by batch --format columnar")
+    query.add_argument("store", help="Path of a .glfstore directory")
+    query.add_argument("--label", required=True)
+    query.add_argument("--min-count", type=int, default=1, help="Detections of the label needed per frame")
+    query.add_argument("--min-confidence", type=float, default=0.0)
+    query.add_argument("--ranges", action="store_true", help="Print time ranges instead of frame ids")
+    query.add_argument("--max-gap", type=int, default=1, help="Frames between matches that still join a range")
+    query.set_defaults(func=cmd_query)
+
+
+def add_clips_parser(sub):
+    clips = sub.add_parser("clips", help="Export the parts of a video where labels were detected")
+    clips.add_argument("video", help="The video the results store was made from")
+    clips.add_argument("store", help="Path of a .glfstore directory")
+    clips.add_argument("--label", action="append", required=True, help="Label to export; may be repeated")
+    clips.add_argument("--output-dir", default="clips")
+    clips.add_argument("--min-count", type=int, default=1, help="Detections of the label needed per frame")
+    clips.add_argument("--min-confidence", type=float, default=0.0)
+    clips.add_argument("--pre-roll", type=float, default=2.0, help="Seconds kept before each event")
+    clips.add_argument("--post-roll", type=float, default=2.0, help="Seconds kept after each event")
+    clips.add_argument("--max-gap", type=float, default=1.0,
+                       help="Seconds between detections that still belong to one event")
+    clips.add_argument("--method", choices=("copy", "reencode"), default="copy",
+                       help="Stream copy from the preceding keyframe, or re-encode the clip frames only")
+    clips.add_argument("--annotate", action="store_true", help="Draw the stored detections on the clips")
+    clips.add_argument("--mode", default="All Body Parts",
+                       choices=("All Body Parts", "Person Only", "Custom Selection"))
+    clips.add_argument("--parts", help="Comma separated body parts for Custom Selection")
+    clips.add_argument("--dry-run", action="store_true", help="List the clips without writing them")
+    clips.set_defaults(func=cmd_clips)
+
+
+def add_autotune_parser(sub):
+    autotune = sub.add_parser("autotune", help="Find the fastest split of CPUs into engine replicas x threads")
+    autotune.add_argument("--model", default="yolov8n-pose.pt", help="Model path")
+    autotune.add_argument("--backend", default="torch", help="torch, onnx, openvino or torchscript")
+    autotune.add_argument("--size", default="1280x720", help="Input frame size, WIDTHxHEIGHT")
+    autotune.add_argument("--frames", type=int, default=256,
+                          help="Frames timed per split (length of the synthetic video)")
+    autotune.add_argument("--input", help="Video to time batch processing on (default: synthetic, --size)")
+    autotune.add_argument("--pool", action="store_true",
+                          help="Time a ReplicaPool fed decoded frames instead of batch workers")
+    autotune.add_argument("--split", action="append",
+                          help="REPLICASxTHREADS to try, e.g. 4x8; may be repeated (default: all powers of two)")
+    autotune.add_argument("--out", help="Optional JSON output path")
+    autotune.set_defaults(func=cmd_autotune)
+
+
+def add_profile_parser(sub):
+    profile = sub.add_parser("profile", help="Show this machine's tuned profile for a model, tuning it if needed")
+    profile.add_argument("--model", default="yolov8n-pose.pt", help="Model path")
+    profile.add_argument("--retune", action="store_true", help="Benchmark again even if a profile is stored")
+    profile.add_argument("--target-fps", type=float, default=15,
+                         help="Frame rate the inference size is chosen to sustain")
+    profile.set_defaults(func=cmd_profile)
+
+
+def run_overrides(args):
+    """Translate command line flags into config overrides."""
+    overrides = {}
+    if args.source:
+        if args.source == "screen":
+            overrides["source"] = {"type": "screen"}
+        elif args.source.startswith("pipe:"):
+            overrides["source"] = {"type": "pipe", "path": args.source[len("pipe:"):]}
+        else:
+            overrides["source"] = {"type": "replay", "path": args.source}
+    raw = {k: v for k, v in (("width", args.width), ("height", args.height), ("pix_fmt", args.pix_fmt)) if v}
+    if raw:
+        overrides.setdefault("source", {}).update(raw)
+    model = {k: v for k, v in (("path", args.model), ("backend", args.backend)) if v}
+    if model:
+        overrides["model"] = model
+    if args.threads:
+        overrides["threads"] = {"torch": args.threads}
+    if args.sink:
+        overrides["sinks"] = args.sink
+    if args.max_frames:
+        overrides["run"] = {"max_frames": args.max_frames}
+    return overrides
+
+
+def cmd_run(args):
+    from glfps.service import run_service
+    return run_service(args.config, run_overrides(args))
+
+
+def cmd_server(args):
+    from glfps.service import pin_threads
+    pin_threads({"torch": args.threads})
+    from glfps.inference_server import DEFAULT_ADDRESS, InferenceServer, parse_models
+    server = InferenceServer(parse_models(args.model), address=args.address or DEFAULT_ADDRESS,
+                             max_batch=args.max_batch, max_delay_ms=args.max_delay_ms)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def cmd_batch(args):
+    from glfps.batch import run_batch
+    parts = [p.strip() for p in args.parts.split(",") if p.strip()] if args.parts else None
+    run_batch(args.inputs, out_dir=args.output_dir, model_path=args.model, backend=args.backend,
+              workers=args.workers, threads_per_worker=args.threads, chunk_size=args.chunk_size,
+              output_format=args.format, annotate=args.annotate, mode=args.mode, target_parts=parts,
+              stride=args.stride, interpolate=args.interpolate, scene_threshold=args.scene_threshold,
+              pin_cpus=args.pin)
+    return 0
+
+
+def cmd_query(args):
+    from glfps.results_store import ResultStore
+    with ResultStore(args.store) as store:
+        if args.ranges:
+            for start, end in store.time_ranges(args.label, args.min_count, args.min_confidence, args.max_gap):
+                print(f"{start:.3f}\t{end:.3f}")
+        else:
+            for frame_id in store.frames_with(args.label, args.min_count, args.min_confidence):
+                print(frame_id)
+    return 0
+
+
+def cmd_clips(args):
+    from glfps.clips import export_clips
+    parts = [p.strip() for p in args.parts.split(",") if p.strip()] if args.parts else None
+    export_clips(args.video, args.store, args.output_dir, args.label, min_count=args.min_count,
+                 min_confidence=args.min_confidence, pre_roll=args.pre_roll, post_roll=args.post_roll,
+                 max_gap=args.max_gap, method=args.method, annotate=args.annotate, mode=args.mode,
+                 target_parts=parts, dry_run=args.dry_run)
+    return 0
+
+
+def cmd_autotune(args):
+    import json
+    from glfps.replicas import autotune
+    from glfps.service import log
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    splits = [tuple(int(v) for v in split.lower().split("x")) for split in args.split] if args.split else None
+    results = autotune(args.model, args.backend, (width, height), args.frames, splits, log=log,
+                       input_path=args.input, mode='pool' if args.pool else 'batch')
+    best = results[0]
+    usage = (f"ReplicaPool(replicas={best['replicas']}, threads={best['threads']})" if args.pool
+             else f"batch --workers {best['replicas']} --threads {best['threads']} --pin")
+    log(f"✅ Best: {best['replicas']} replicas x {best['threads']} threads, {best['fps']:.1f} FPS ({usage})")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+def cmd_profile(args):
+    import json
+    from glfps.profiles import get_profile, profile_path
+    from glfps.service import log
+    profile = get_profile(args.model, retune=args.retune, target_fps=args.target_fps, log=log)
+    log(f"Profile stored in {profile_path(args.model)}")
+    print(json.dumps(profile, indent=2))
+    return 0
+
+
+def cmd_gui(args):
+    from glfps.gui import launch_gui
+    launch_gui()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m glfps", description="Human object detection app")
+    sub = parser.add_subparsers(dest="command")
+    gui = sub.add_parser("gui", help="Launch the GUI (default)")
+    gui.set_defaults(func=cmd_gui)
+    add_run_parser(sub)
+    add_server_parser(sub)
+    add_batch_parser(sub)
+    add_query_parser(sub)
+    add_clips_parser(sub)
+    add_autotune_parser(sub)
+    add_profile_parser(sub)
+
+    args = parser.parse_args(argv)
+    if args.command is None:
+        return cmd_gui(args)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+"""
+CPU placement of the realtime pipeline stages, and the jitter they see.
+
+Each stage (capture, inference, render) can be pinned to a CPU set and
+given a nice value in the config:
+
+    stages:
+      capture:   {cpus: "0", nice: -5}
+      inference: {cpus: "2-7"}
+      render:    {cpus: "1"}
+
+apply_stage() applies a stage's settings to the calling thread (threads it
+starts afterwards inherit them), so it is called first thing on the thread
+or process that runs the stage. Threads and processes inherit both
+settings from the thread that starts them, so a stage without cpus or nice
+is put back on the process's original CPUs and nice value (recorded when
+this module is first imported, and passed on to child processes through
+the environment). Pinning uses os.sched_setaffinity and nice uses
+os.setpriority on the thread's native id, both Linux-specific; elsewhere
+the settings are ignored with a warning.
+
+StageMonitor measures what the scheduler does to a stage: loop interval
+spread, how late sleeps wake past their deadline, involuntary context
+switches and CPU migrations of the stage's thread.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import deque
+from typing import List, Optional
+
+STAGES = ("capture", "inference", "render")
+# Child processes start with their parent's (possibly pinned) settings; these carry the originals
+DEFAULT_CPUS_ENV = "GLFPS_DEFAULT_CPUS"
+DEFAULT_NICE_ENV = "GLFPS_DEFAULT_NICE"
+
+
+def _warn(message):
+    print(message, file=sys.stderr, flush=True)
+
+
+def parse_cpus(spec) -> Optional[List[int]]:
+    """CPU list from "0-3,8", [0, 1, 2] or None (no pinning)."""
+    if spec is None or spec == "":
+        return None
+    if isinstance(spec, int):
+        return [spec]
+    if not isinstance(spec, str):
+        return sorted({int(cpu) for cpu in spec})
+    cpus = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if "-" in part:
+            first, last = part.split("-")
+            cpus.update(range(int(first), int(last) + 1))
+        elif part:
+            cpus.add(int(part))
+    return sorted(cpus)
+
+
+def _record_defaults():
+    """The process's original CPU set and nice value, shared with child processes via the environment."""
+    cpus = parse_cpus(os.environ.get(DEFAULT_CPUS_ENV))
+    if cpus is None and hasattr(os, "sched_getaffinity"):
+        cpus = sorted(os.sched_getaffinity(0))
+        os.environ[DEFAULT_CPUS_ENV] = ",".join(map(str, cpus))
+    nice = os.environ.get(DEFAULT_NICE_ENV)
+    if nice is None and hasattr(os, "getpriority"):
+        nice = os.getpriority(os.PRIO_PROCESS, 0)
+        os.environ[DEFAULT_NICE_ENV] = str(nice)
+    return cpus, int(nice) if nice is not None else None
+
+
+DEFAULT_CPUS, DEFAULT_NICE = _record_defaults()
+
+
+def restore_defaults():
+    """Put the calling thread back on the process's original CPUs and nice value."""
+    if DEFAULT_CPUS and hasattr(os, "sched_getaffinity") and sorted(os.sched_getaffinity(0)) != DEFAULT_CPUS:
+        try:
+            os.sched_setaffinity(0, DEFAULT_CPUS)
+        except OSError as e:
+            _warn(f"⚠️ Could not restore CPU affinity {DEFAULT_CPUS}: {e}")
+    if DEFAULT_NICE is not None:
+        try:
+            tid = threading.get_native_id()
+            if os.getpriority(os.PRIO_PROCESS, tid) != DEFAULT_NICE:
+                os.setpriority(os.PRIO_PROCESS, tid, DEFAULT_NICE)
+        except OSError as e:
+            # Lowering a raised nice value again needs CAP_SYS_NICE
+            _warn(f"⚠️ Could not restore nice {DEFAULT_NICE}: {e}")
+
+
+def apply_stage(name, settings) -> dict:
+    """
+    Pin the calling thread to the stage's CPUs and set its nice value; a
+    setting that is not configured goes back to the process default.
+    Returns what was applied ({"cpus": [...], "nice": n}, empty if nothing).
+    """
+    settings = settings or {}
+    applied = {}
+    cpus = parse_cpus(settings.get("cpus"))
+    nice = settings.get("nice")
+    if not cpus or nice is None:
+        restore_defaults()
+    if cpus:
+        if hasattr(os, "sched_setaffinity"):
+            try:
+                os.sched_setaffinity(0, cpus)  # pid 0 is the calling thread
+                applied["cpus"] = cpus
+            except OSError as e:
+                _warn(f"⚠️ Could not pin {name} stage to CPUs {cpus}: {e}")
+        else:
+            _warn(f"⚠️ CPU pinning is not supported on this platform; {name} stage is not pinned")
+    if nice is not None:
+        try:
+            # On Linux a thread id here changes that thread only, not the whole process
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), int(nice))
+            applied["nice"] = int(nice)
+        except (AttributeError, OSError) as e:
+            # Negative values need CAP_SYS_NICE (or a raised RLIMIT_NICE)
+            _warn(f"⚠️ Could not set nice {nice} for {name} stage: {e}")
+    return applied
+
+
+def _task_path(tid, name):
+    return f"/proc/self/task/{tid}/{name}"
+
+
+def _current_cpu(tid) -> Optional[int]:
+    try:
+        with open(_task_path(tid, "stat")) as f:
+            # Fields after the ")" closing the command name start at field 3; processor is field 39
+            return int(f.read().rsplit(")", 1)[1].split()[36])
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def _involuntary_switches(tid) -> Optional[int]:
+    try:
+        with open(_task_path(tid, "status")) as f:
+            for line in f:
+                if line.startswith("nonvoluntary_ctxt_switches:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _summary_ms(values) -> dict:
+    if not values:
+        return {"p50": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(values)
+
+    def percentile(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    return {"p50": percentile(0.50), "p99": percentile(0.99), "max": ordered[-1] * 1000}
+
+
+class StageMonitor:
+    """
+    Scheduling jitter of one stage's loop, measured on the thread that runs
+    it. Call tick() once per iteration and sleep with sleep_until().
+    """
+    def __init__(self, name, window=1000, track_cpu=True):
+        self.name = name
+        self.track_cpu = track_cpu and os.path.isdir("/proc/self/task")
+        self.intervals = deque(maxlen=window)
+        self.wake_late = deque(maxlen=window)
+        self.migrations = 0
+        # report() may run on another thread while the stage keeps ticking
+        self._lock = threading.Lock()
+        self._last = None
+        self._tid = None
+        self._cpu = None
+        self._switches_start = None
+
+    def tick(self):
+        now = time.perf_counter()
+        if self._tid is None:
+            self._tid = threading.get_native_id()
+            if self.track_cpu:
+                self._switches_start = _involuntary_switches(self._tid)
+        cpu = _current_cpu(self._tid) if self.track_cpu else None
+        with self._lock:
+            if self._last is not None:
+                self.intervals.append(now - self._last)
+            self._last = now
+            if cpu is not None and self._cpu is not None and cpu != self._cpu:
+                self.migrations += 1
+            if cpu is not None:
+                self._cpu = cpu
+
+    def sleep_until(self, deadline):
+        """Sleep until the perf_counter() deadline, recording how late the thread woke up."""
+        delay = deadline - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+            late = time.perf_counter() - deadline
+            with self._lock:
+                self.wake_late.append(late)
+
+    def report(self) -> dict:
+        switches = None
+        if self._switches_start is not None:
+            current = _involuntary_switches(self._tid)
+            switches = current - self._switches_start if current is not None else None
+        with self._lock:
+            intervals = list(self.intervals)
+            wake_late = list(self.wake_late)
+            migrations, cpu = self.migrations, self._cpu
+        mean = sum(intervals) / len(intervals) if intervals else 0.0
+        std = (sum((v - mean) ** 2 for v in intervals) / len(intervals)) ** 0.5 if intervals else 0.0
+        return {
+            "stage": self.name,
+            "samples": len(intervals),
+            "interval_ms": dict(_summary_ms(intervals), mean=mean * 1000, std=std * 1000),
+            "wake_late_ms": _summary_ms(wake_late),
+            "involuntary_switches": switches,
+            "migrations": migrations if self.track_cpu else None,
+            "cpu": cpu,
+        }
+
+
+def format_report(report) -> str:
+    """One status line for a StageMonitor report."""
+    interval, late = report["interval_ms"], report["wake_late_ms"]
+    line = (f"{report['stage']}: interval {interval['mean']:.1f}±{interval['std']:.1f} ms "
+            f"(p99 {interval['p99']:.1f}), wake-up late p50 {late['p50']:.2f} / p99 {late['p99']:.2f} ms")
+    if report["involuntary_switches"] is not None:
+        line += f", {report['involuntary_switches']} preemptions, {report['migrations']} migrations"
+    return line
@@ -1,5 +1,3 @@
-import pyautogui
-
 class Automation:
     """
     Executes customizable mouse and keyboard actions based on detection results.
@@ -16,4 +14,5 @@ class Automation:
             x, y, w, h = bbox
             center_x = x + w // 2
             center_y = y + h // 2
+            import pyautogui  # Deferred: slow to import and needs a display
             pyautogui.moveTo(center_x, center_y) 
\ No newline at end of file
@@ -0,0 +1,338 @@
+"""
+Headless batch processing of videos and image folders.
+
+    python -m glfps batch recordings/*.mp4 screenshots/ --workers 8 --output-dir results/
+
+Every input is split into chunks (keyframe-aligned frame ranges for videos,
+file lists for image folders) that a process pool of DetectionEngine workers
+runs in parallel, each decoding ahead of inference on a reader thread.
+Results are written in frame order per input as JSON Lines or a columnar
+results store (glfps.results_store), optionally with an annotated copy of
+the input.
+"""
+
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import get_context
+from typing import List, NamedTuple, Optional
+
+import cv2
+
+from glfps.detection import filter_detections
+from glfps.overlay import draw_detections
+from glfps.replay import IMAGE_EXTENSIONS
+from glfps.replicas import partition_cpus, pin_process
+from glfps.results_store import ResultStoreWriter
+from glfps.sampling import hold, interpolate_gap, select_key_frames
+from glfps.service import log, pin_threads
+from glfps.sinks import JsonlSink
+from glfps.video_reader import ThreadedVideoReader, keyframe_chunks
+from glfps.video_writer import AsyncVideoWriter
+
+
+class BatchInput(NamedTuple):
+    path: str
+    kind: str                   # 'video' | 'images'
+    frame_count: int
+    fps: float
+    files: Optional[List[str]]  # image folder contents, in order
+
+
+class Chunk(NamedTuple):
+    input_index: int
+    chunk_index: int
+    start: int                  # first frame (inclusive)
+    end: int                    # last frame (exclusive)
+
+
+def expand_inputs(paths) -> List[str]:
+    """Expand .txt list files (one video or folder per line, # comments) into paths."""
+    expanded = []
+    for path in paths:
+        if path.lower().endswith(".txt") and os.path.isfile(path):
+            base = os.path.dirname(path)
+            with open(path) as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith("#"):
+                        expanded.append(os.path.join(base, line))
+        else:
+            expanded.append(path)
+    return expanded
+
+
+def scan_input(path) -> BatchInput:
+    """Describe a video file or image folder: kind, frame count and frame rate."""
+    if os.path.isdir(path):
+        files = sorted(os.path.join(path, name) for name in os.listdir(path)
+                       if name.lower().endswith(IMAGE_EXTENSIONS))
+        return BatchInput(path, 'images', len(files), 0.0, files)
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise ValueError(f"Cannot open video {path}")
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    cap.release()
+    return BatchInput(path, 'video', frame_count, fps, None)
+
+
+def plan_chunks(inputs, chunk_size) -> List[Chunk]:
+    chunks = []
+    for input_index, batch_input in enumerate(inputs):
+        if batch_input.kind == 'video':
+            ranges = keyframe_chunks(batch_input.path, batch_input.frame_count, chunk_size, batch_input.fps)
+        else:
+            ranges = [(start, min(start + chunk_size, batch_input.frame_count))
+                      for start in range(0, batch_input.frame_count, chunk_size)]
+        for chunk_index, (start, end) in enumerate(ranges):
+            chunks.append(Chunk(input_index, chunk_index, start, end))
+    return chunks
+
+
+def iter_chunk_frames(batch_input, start, end, stride=1):
+    """
+    Yield (frame_index, frame) for the frames in start..end-1 of an input
+    whose index is a multiple of stride.
+    """
+    start += -start % stride  # Sample the same frames however the input is chunked
+    if batch_input.kind == 'images':
+        for index in range(start, end, stride):
+            frame = cv2.imread(batch_input.files[index])
+            if frame is not None:
+                yield index, frame
+        return
+    if start >= end:
+        return
+    with ThreadedVideoReader(batch_input.path, start=start, end=end, stride=stride) as reader:
+        yield from reader
+
+
+# Worker process state, set up once per process by _init_worker
+_worker = {}
+
+
+def _init_worker(model_path, backend, threads, inputs, mode, target_parts, stride, scene_threshold,
+                 cache=None, cpu_sets=None, worker_counter=None):
+    """
+    cache: optional (inference cache root, [entry key per input]) to reuse and record raw outputs.
+    cpu_sets: optional CPU set per worker; each worker takes the next one from worker_counter.
+    """
+    if cpu_sets:
+        with worker_counter.get_lock():
+            index = worker_counter.value
+            worker_counter.value += 1
+        pin_process(cpu_sets[index % len(cpu_sets)], threads)
+    else:
+        pin_threads({"torch": threads, "opencv": 1})
+    from glfps.detection import DetectionEngine
+    engine = DetectionEngine(model_path=model_path, backend=backend)
+    engine.verbose = False
+    cached = None
+    if cache is not None:
+        from glfps.inference_cache import InferenceCache
+        root, keys = cache
+        inference_cache = InferenceCache(root)
+        # Read-only: the parent records the entry's use, so workers never write the shared manifests
+        cached = [inference_cache.get(key, touch=False) if key else None for key in keys]
+    _worker.update(engine=engine, inputs=inputs, mode=mode, target_parts=target_parts, stride=stride,
+                   scene_threshold=scene_threshold, cached=cached)
+
+
+def _process_chunk(chunk):
+    """
+    Run detection over one chunk. Returns (chunk, [(frame_index, detections)],
+    seconds, [(frame_index, raw)]), the last holding the raw outputs of frames
+    the worker's inference cache didn't have (empty without a cache).
+    """
+    engine = _worker["engine"]
+    batch_input = _worker["inputs"][chunk.input_index]
+    started = time.perf_counter()
+    results, new_raws = [], []
+    cached = _worker["cached"][chunk.input_index] if _worker["cached"] is not None else None
+    stride, scene_threshold = _worker["stride"], _worker["scene_threshold"]
+    if scene_threshold is None:
+        frames = iter_chunk_frames(batch_input, chunk.start, chunk.end, stride)
+    else:
+        # Adaptive: decode every frame, run the model where the scene changed (at least every stride)
+        frames = ((index, frame) for index, frame, is_key in select_key_frames(
+            iter_chunk_frames(batch_input, chunk.start, chunk.end), stride, scene_threshold) if is_key)
+    for index, frame in frames:
+        raw = cached.raw(index) if cached is not None else None
+        if raw is None:
+            raw = engine.detect_raw(frame)
+            if _worker["cached"] is not None:
+                new_raws.append((index, raw))
+        detections = filter_detections(engine.parse_raw(raw, frame.shape), _worker["mode"], _worker["target_parts"])
+        results.append((index, detections))
+    return chunk, results, time.perf_counter() - started, new_raws
+
+
+class AnnotatedOutput:
+    """
+    Draws results onto a sequential re-read of the input: an .mp4 for videos
+    (drawn and encoded on the AsyncVideoWriter thread), a folder for images.
+    """
+    def __init__(self, batch_input, path, stride=1):
+        self.batch_input = batch_input
+        self.path = path
+        self.stride = stride
+        self.frames = iter_chunk_frames(batch_input, 0, batch_input.frame_count, stride)
+        self.writer = None
+        if batch_input.kind == 'images':
+            os.makedirs(path, exist_ok=True)
+
+    def write(self, frame_id, detections):
+        for index, frame in self.frames:
+            if index == frame_id:
+                break
+        else:
+            return
+        if self.batch_input.kind == 'images':
+            draw_detections(frame, detections)
+            cv2.imwrite(os.path.join(self.path, os.path.basename(self.batch_input.files[index])), frame)
+            return
+        if self.writer is None:
+            # Back-pressure rather than drops: batch output must have every frame
+            self.writer = AsyncVideoWriter(self.path, self.batch_input.fps / self.stride, policy='block')
+        self.writer.write(frame, detections)
+
+    def close(self):
+        self.frames.close()  # Stops the reader thread if the input was not read to the end
+        if self.writer is not None:
+            self.writer.close()
+            log(f"   {self.path}: {self.writer.written} frames encoded at "
+                f"{self.writer.stats()['encode_fps']:.1f} FPS")
+
+
+def _write_frame(batch_input, sink, annotated, frame_id, detections):
+    timestamp = frame_id / batch_input.fps if batch_input.fps else 0.0
+    sink.write(frame_id, timestamp, detections)
+    if annotated is not None:
+        annotated.write(frame_id, detections)
+
+
+def output_stem(out_dir, path):
+    name = os.path.basename(os.path.normpath(path))
+    return os.path.join(out_dir, os.path.splitext(name)[0])
+
+
+def run_batch(paths, out_dir="batch_results", model_path="yolov8n-pose.pt", backend="torch",
+              workers=None, threads_per_worker=None, chunk_size=256, output_format="jsonl",
+              annotate=False, mode="All Body Parts", target_parts=None, stride=1, interpolate=False,
+              scene_threshold=None, min_iou=0.3, pin_cpus=False, cpus=None):
+    """
+    Process every input with a pool of detection workers. Returns a summary dict.
+
+    With stride > 1 the model runs on every stride-th frame only, or with
+    scene_threshold set, on frames where the scene changed (at least every
+    stride frames). interpolate fills the frames in between from the
+    surrounding results, flagged "interpolated". pin_cpus gives every worker
+    a CPU set of its own out of cpus (default: all available, see glfps.replicas).
+    """
+    inputs = [scan_input(path) for path in expand_inputs(paths)]
+    chunks = plan_chunks(inputs, chunk_size)
+    stride = max(1, stride)
+    total_frames = sum(i.frame_count for i in inputs)
+    chunk_counts = [sum(1 for c in chunks if c.input_index == i) for i in range(len(inputs))]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(chunks) or 1))
+    threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+    os.makedirs(out_dir, exist_ok=True)
+    log(f"Processing {len(inputs)} input(s), {total_frames} frames in {len(chunks)} chunks "
+        f"with {workers} workers x {threads_per_worker} threads")
+
+    outputs = []
+    for batch_input in inputs:
+        stem = output_stem(out_dir, batch_input.path)
+        if output_format == "columnar":
+            sink = ResultStoreWriter(stem + ".glfstore", fps=batch_input.fps or None)
+        else:
+            if os.path.exists(stem + ".jsonl"):
+                os.remove(stem + ".jsonl")  # JsonlSink appends; a rerun replaces the results
+            sink = JsonlSink(stem + ".jsonl", flush_every=chunk_size)
+        annotated = None
+        if annotate:
+            annotated = AnnotatedOutput(batch_input, stem + ("_annotated" if batch_input.kind == 'images'
+                                                             else "_annotated.mp4"),
+                                        1 if interpolate or scene_threshold is not None else stride)
+        outputs.append((sink, annotated))
+
+    # Chunks finish out of order; hold them until their predecessors are written
+    next_chunk = [0] * len(inputs)
+    finished = [{} for _ in inputs]
+    last_key = [None] * len(inputs)  # (frame_index, detections) of the last frame run per input
+    done_frames = 0
+    inferred_frames = 0
+    worker_seconds = 0.0
+    started = time.perf_counter()
+
+    context = get_context('spawn')
+    cpu_sets = partition_cpus(workers, threads_per_worker, cpus) if pin_cpus else None
+    executor = ProcessPoolExecutor(
+        max_workers=workers, mp_context=context, initializer=_init_worker,
+        initargs=(model_path, backend, threads_per_worker, inputs, mode, target_parts, stride,
+                  scene_threshold, None, cpu_sets, context.Value('i', 0)))
+    try:
+        # Keep a couple of chunks queued per worker so results stream out in order
+        pending = set()
+        queue = iter(chunks)
+        for chunk in queue:
+            pending.add(executor.submit(_process_chunk, chunk))
+            if len(pending) >= workers * 2:
+                break
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk, results, seconds, _ = future.result()
+                worker_seconds += seconds
+                done_frames += chunk.end - chunk.start
+                inferred_frames += len(results)
+                finished[chunk.input_index][chunk.chunk_index] = results
+                for next_future_chunk in queue:
+                    pending.add(executor.submit(_process_chunk, next_future_chunk))
+                    break
+
+            for input_index, batch_input in enumerate(inputs):
+                sink, annotated = outputs[input_index]
+                while next_chunk[input_index] in finished[input_index]:
+                    for frame_id, detections in finished[input_index].pop(next_chunk[input_index]):
+                        if interpolate and last_key[input_index] is not None:
+                            for between_id, between in interpolate_gap(*last_key[input_index], frame_id,
+                                                                       detections, min_iou):
+                                _write_frame(batch_input, sink, annotated, between_id, between)
+                        _write_frame(batch_input, sink, annotated, frame_id, detections)
+                        last_key[input_index] = (frame_id, detections)
+                    next_chunk[input_index] += 1
+                    if interpolate and next_chunk[input_index] == chunk_counts[input_index] \
+                            and last_key[input_index] is not None:
+                        # Nothing after the last frame run to interpolate towards: hold its results
+                        key_id, key_detections = last_key[input_index]
+                        for frame_id in range(key_id + 1, batch_input.frame_count):
+                            _write_frame(batch_input, sink, annotated, frame_id, hold(key_detections))
+
+            elapsed = time.perf_counter() - started
+            fps = done_frames / elapsed if elapsed else 0.0
+            eta = (total_frames - done_frames) / fps if fps else 0.0
+            log(f"   {done_frames}/{total_frames} frames ({done_frames / max(1, total_frames):.0%}), "
+                f"{fps:.1f} FPS, ETA {eta:.0f}s")
+    finally:
+        executor.shutdown(cancel_futures=True)
+        for sink, annotated in outputs:
+            sink.close()
+            if annotated is not None:
+                annotated.close()
+
+    elapsed = time.perf_counter() - started
+    summary = {
+        "inputs": len(inputs),
+        "frames": done_frames,
+        "inferred": inferred_frames,
+        "seconds": elapsed,
+        "fps": done_frames / elapsed if elapsed else 0.0,
+        "workers": workers,
+        "threads_per_worker": threads_per_worker,
+        "per_worker_fps": inferred_frames / worker_seconds if worker_seconds else 0.0,
+    }
+    log(f"✅ {done_frames} frames ({inferred_frames} inferred) in {elapsed:.1f}s: {summary['fps']:.1f} FPS "
+        f"({summary['per_worker_fps']:.1f} inferences/s per worker)")
+    return summary
@@ -0,0 +1,159 @@
+"""
+Export the parts of a video where chosen labels were detected.
+
+    python -m glfps clips recording.mp4 recording.glfstore --label person --pre-roll 2 --post-roll 3
+
+Events come from a results store (glfps.results_store), so nothing is
+re-detected. Each event becomes one clip, padded by the pre/post roll:
+
+- 'copy' cuts with ffmpeg stream copy. Clip starts are moved back to the
+  keyframe at or before them, so nothing is re-encoded and the cut is
+  exact; clips just start up to one GOP early.
+- 'reencode' re-encodes only the frames of each clip, for exact starts.
+
+Annotated clips are always re-encoded (the overlay is drawn on decoded
+frames), but again only the frames in the clips are decoded and encoded.
+Without ffmpeg, raw clips fall back to decoding and encoding with OpenCV.
+"""
+
+import math
+import os
+import shutil
+import subprocess
+from typing import List, NamedTuple
+
+import cv2
+
+from glfps.detection import filter_detections
+from glfps.results_store import ResultStore
+from glfps.service import log
+from glfps.video_reader import ThreadedVideoReader, keyframe_indices
+from glfps.video_writer import AsyncVideoWriter
+
+METHODS = ('copy', 'reencode')
+
+
+class Segment(NamedTuple):
+    start: int                  # first frame (inclusive)
+    end: int                    # last frame (exclusive)
+
+
+def event_segments(store, labels, frame_count, fps, min_count=1, min_confidence=0.0,
+                   pre_roll=2.0, post_roll=2.0, max_gap=1.0) -> List[Segment]:
+    """
+    Frame ranges around the frames where any of labels was detected (at
+    least min_count times above min_confidence). Matches up to max_gap
+    seconds apart form one event; events are padded by pre_roll/post_roll
+    seconds and merged where the padding makes them overlap.
+    """
+    matches = set()
+    for label in labels:
+        if label in store.label_ids:
+            matches.update(int(f) for f in store.frames_with(label, min_count, min_confidence))
+    if not matches:
+        return []
+    gap = max(1, round(max_gap * fps))
+    pre, post = round(pre_roll * fps), round(post_roll * fps)
+    segments = []
+    frames = sorted(matches)
+    run_start = previous = frames[0]
+    for frame in frames[1:] + [None]:
+        if frame is not None and frame - previous <= gap:
+            previous = frame
+            continue
+        start, end = max(0, run_start - pre), min(frame_count, previous + 1 + post)
+        if segments and start <= segments[-1].end:
+            segments[-1] = Segment(segments[-1].start, max(end, segments[-1].end))
+        else:
+            segments.append(Segment(start, end))
+        if frame is not None:
+            run_start = previous = frame
+    return segments
+
+
+def snap_to_keyframes(segments, keyframes) -> List[Segment]:
+    """Move segment starts back to the keyframe at or before them, merging segments that then overlap."""
+    snapped = []
+    for segment in segments:
+        start = max((k for k in keyframes if k <= segment.start), default=0)
+        if snapped and start <= snapped[-1].end:
+            snapped[-1] = Segment(snapped[-1].start, max(segment.end, snapped[-1].end))
+        else:
+            snapped.append(Segment(start, segment.end))
+    return snapped
+
+
+def _ffmpeg_cut(ffmpeg, video_path, out_path, start_time, duration, method):
+    # -ss before -i seeks by keyframe index (fast); with stream copy the cut starts on that keyframe
+    codec = ["-c", "copy"] if method == 'copy' else ["-c:v", "libx264", "-preset", "veryfast", "-c:a", "aac"]
+    cmd = [ffmpeg, "-loglevel", "error", "-nostdin", "-y", "-ss", f"{start_time:.6f}", "-i", video_path,
+           "-t", f"{duration:.6f}", "-map", "0:v:0", "-map", "0:a?"] + codec + \
+          ["-avoid_negative_ts", "make_zero", out_path]
+    subprocess.run(cmd, check=True, capture_output=True)
+
+
+def _encode_segment(video_path, out_path, segment, fps, store=None, mode="All Body Parts", target_parts=None):
+    """Decode only the segment's frames and encode them, drawing stored detections when store is given."""
+    writer = AsyncVideoWriter(out_path, fps, policy='block')
+    last = []
+    try:
+        with ThreadedVideoReader(video_path, start=segment.start, end=segment.end) as reader:
+            for index, frame in reader:
+                detections = None
+                if store is not None:
+                    # Frames the model skipped (stride) keep the last results, as playback shows them
+                    if index < len(store) and not math.isnan(store.timestamps[index]):
+                        last = filter_detections(store.frame(index), mode, target_parts)
+                    detections = last
+                writer.write(frame, detections)
+    finally:
+        writer.close()
+
+
+def export_clips(video_path, store_path, out_dir, labels, min_count=1, min_confidence=0.0,
+                 pre_roll=2.0, post_roll=2.0, max_gap=1.0, method='copy', annotate=False,
+                 mode="All Body Parts", target_parts=None, ffmpeg="ffmpeg", dry_run=False) -> List[str]:
+    """
+    Write one clip per event in out_dir. Returns the clip paths (the ones
+    that would be written with dry_run=True).
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method '{method}', expected one of: {', '.join(METHODS)}")
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise ValueError(f"Cannot open video {video_path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+
+    has_ffmpeg = shutil.which(ffmpeg) is not None
+    with ResultStore(store_path) as store:
+        # Some containers and streams report no (or too few) frames; the store covers every frame decoded
+        frame_count = max(frame_count, len(store))
+        segments = event_segments(store, labels, frame_count, store.fps or fps, min_count, min_confidence,
+                                  pre_roll, post_roll, max_gap)
+        if method == 'copy' and not annotate and has_ffmpeg:
+            keyframes = keyframe_indices(video_path, fps)
+            if keyframes:
+                segments = snap_to_keyframes(segments, keyframes)
+        total = sum(s.end - s.start for s in segments)
+        log(f"{len(segments)} clip(s), {total / fps:.1f}s of {frame_count / fps:.1f}s "
+            f"({total / max(1, frame_count):.0%} of the video)")
+
+        os.makedirs(out_dir, exist_ok=True)
+        stem = os.path.splitext(os.path.basename(video_path))[0]
+        paths = []
+        for n, segment in enumerate(segments, 1):
+            start_time, end_time = segment.start / fps, segment.end / fps
+            path = os.path.join(out_dir, f"{stem}_clip{n:03d}_{start_time:.1f}-{end_time:.1f}.mp4")
+            paths.append(path)
+            log(f"   {path}: frames {segment.start}-{segment.end - 1} ({end_time - start_time:.1f}s)")
+            if dry_run:
+                continue
+            if annotate:
+                _encode_segment(video_path, path, segment, fps, store, mode, target_parts)
+            elif has_ffmpeg:
+                _ffmpeg_cut(ffmpeg, video_path, path, start_time, end_time - start_time, method)
+            else:
+                _encode_segment(video_path, path, segment, fps)
+    return paths
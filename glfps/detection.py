@@ -1,15 +1,95 @@
-from ultralytics import YOLO
+import copy
 import numpy as np
-import cv2
+import os
+
+def _yolo():
+    """Import ultralytics on first use; it pulls in torch and takes seconds."""
+    from ultralytics import YOLO
+    return YOLO
+
+# Exported formats ultralytics can load directly, keyed by backend name
+EXPORT_SUFFIXES = {
+    'onnx': '.onnx',
+    'openvino': '_openvino_model',
+    'torchscript': '.torchscript',
+}
+
+def _numpy(values):
+    return values.cpu().numpy() if hasattr(values, 'cpu') else np.asarray(values)
+
+def raw_output(result):
+    """
+    The parts of an ultralytics result that post-processing needs, as plain
+    arrays: boxes (N, 6) of x1, y1, x2, y2, confidence, class and, for pose
+    models, keypoints (N, 17, 3) of x, y, confidence (None otherwise).
+    """
+    boxes = np.zeros((0, 6), dtype=np.float32)
+    if getattr(result, 'boxes', None) is not None and len(result.boxes):
+        b = result.boxes
+        boxes = np.column_stack([_numpy(b.xyxy), _numpy(b.conf), _numpy(b.cls)]).astype(np.float32)
+    keypoints = None
+    if getattr(result, 'keypoints', None) is not None:
+        keypoints = _numpy(result.keypoints.data).astype(np.float32)
+    return {"boxes": boxes, "keypoints": keypoints}
+
+def resolve_model_path(model_path, backend='torch'):
+    """
+    Return the model file to load for the given backend, exporting the
+    PyTorch weights once next to the original file if needed.
+    """
+    if backend in (None, 'torch', 'pytorch'):
+        return model_path
+    if backend not in EXPORT_SUFFIXES:
+        raise ValueError(f"Unknown backend '{backend}', expected one of: torch, {', '.join(EXPORT_SUFFIXES)}")
+    
+    exported_path = os.path.splitext(model_path)[0] + EXPORT_SUFFIXES[backend]
+    if not os.path.exists(exported_path):
+        print(f"Exporting {model_path} for {backend} backend...")
+        exported_path = _yolo()(model_path).export(format=backend)
+    return exported_path
+
+def load_model(model_path, backend='torch'):
+    """
+    Load the YOLO model for model_path and backend. PyTorch weights go
+    through the artifact cache (glfps.model_artifacts), which stores them
+    fused and inference-ready after the first load; set GLFPS_ARTIFACTS=0
+    to load the original checkpoint every time.
+    """
+    if backend in (None, 'torch', 'pytorch') and os.path.isfile(model_path) \
+            and os.environ.get("GLFPS_ARTIFACTS", "1") != "0":
+        from glfps.model_artifacts import get_artifact_cache
+        try:
+            return get_artifact_cache().load(model_path)
+        except Exception as e:
+            print(f"⚠️ Model artifact unavailable for {model_path} ({e}), loading the checkpoint")
+    return _yolo()(resolve_model_path(model_path, backend))
+
+# Default model call arguments; DetectionEngine.inference_args starts from a copy
+INFERENCE_ARGS = {"imgsz": 640, "conf": 0.25, "iou": 0.7}
+
 
 class DetectionEngine:
     """
     Runs the AI model to detect human-like objects and body parts in frames.
     """
-    def __init__(self, model_path='yolov8n-pose.pt'):
-        # Load YOLOv8 pose model for body part detection
-        self.model = YOLO(model_path)
-        self.target_classes = [0]  # COCO class 0 = 'person'
+    def __init__(self, model_path='yolov8n-pose.pt', backend='torch', model=None):
+        # Load YOLOv8 pose model for body part detection (unless one is supplied)
+        self.model_path = model_path
+        self.backend = backend
+        self.model = model if model is not None else load_model(model_path, backend)
+        self.verbose = True  # Per-frame ultralytics logging
+        # Arguments that change what the model outputs (part of inference cache keys)
+        self.inference_args = dict(INFERENCE_ARGS)
+        # Class id -> label from the model's own class names ("Left Hand" -> "left_hand"),
+        # so detectors trained on our datasets (e.g. body/head) produce the labels we use
+        names = getattr(self.model, 'names', None) or {0: 'person'}
+        if not isinstance(names, dict):
+            names = dict(enumerate(names))
+        self.class_labels = {int(i): str(name).strip().lower().replace(' ', '_') for i, name in names.items()}
+        # Pose models (and stand-in models without a task) get keypoint body parts and
+        # person boxes only; detection-only models report every class they know
+        self.has_keypoints = getattr(self.model, 'task', 'pose') == 'pose'
+        self.target_classes = [0] if self.has_keypoints else sorted(self.class_labels)  # COCO class 0 = 'person'
         
         # Body part keypoints mapping for YOLOv8 pose model
         self.body_parts = {
@@ -40,39 +120,67 @@ class DetectionEngine:
             "body": [5, 6, 11, 12]    # torso
         }
 
+    def with_inference_args(self, **overrides):
+        """
+        A view of this engine that shares its model but has its own
+        inference arguments, for holders of a cached engine (see
+        glfps.model_cache) that need e.g. a different imgsz.
+        """
+        engine = copy.copy(self)
+        engine.inference_args = dict(self.inference_args, **overrides)
+        return engine
+
     def detect(self, frame):
         """
         Run YOLO pose detection and return bounding boxes for human-like objects and body parts.
         """
-        results = self.model(frame)
+        return self.parse_raw(self.detect_raw(frame), frame.shape)
+
+    def detect_raw(self, frame):
+        """Model outputs for one frame before post-processing (see raw_output)."""
+        results = self.model(frame, verbose=self.verbose, **self.inference_args)
+        return raw_output(results[0])
+
+    def detect_batch(self, frames):
+        """
+        Run detection on several frames in one forward pass.
+        Returns one detection list per frame, in order.
+        """
+        if not frames:
+            return []
+        results = self.model(list(frames), verbose=self.verbose, **self.inference_args)
+        return [self.parse_raw(raw_output(r), frame.shape) for r, frame in zip(results, frames)]
+
+    def parse_raw(self, raw, frame_shape):
+        """Convert raw model outputs for one frame into detection dicts."""
         detections = []
+        keypoints = raw.get("keypoints") if self.has_keypoints else None
+        if keypoints is not None and len(keypoints) > 0:
+            # Pose detection - extract body parts
+            detections.extend(self._extract_body_parts(keypoints[0], frame_shape))
         
-        for r in results:
-            if hasattr(r, 'keypoints') and r.keypoints is not None:
-                # Pose detection - extract body parts
-                keypoints = r.keypoints.data[0] if len(r.keypoints.data) > 0 else None
-                if keypoints is not None:
-                    detections.extend(self._extract_body_parts(keypoints, frame.shape))
-            
-            # Also get person bounding boxes
-            if hasattr(r, 'boxes') and r.boxes is not None:
-                boxes = r.boxes
-                for box in boxes:
-                    cls = int(box.cls[0])
-                    if cls in self.target_classes:
-                        x1, y1, x2, y2 = map(int, box.xyxy[0])
-                        bbox = [x1, y1, x2 - x1, y2 - y1]
-                        label = "person"
-                        confidence = float(box.conf[0])
-                        detections.append({
-                            "bbox": bbox, 
-                            "label": label, 
-                            "confidence": confidence,
-                            "type": "person"
-                        })
+        # Also get class bounding boxes (person boxes for pose models)
+        for x1, y1, x2, y2, conf, cls in raw["boxes"]:
+            if int(cls) in self.target_classes:
+                x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
+                bbox = [x1, y1, x2 - x1, y2 - y1]
+                label = self.class_labels.get(int(cls), str(int(cls)))
+                confidence = float(conf)
+                detections.append({
+                    "bbox": bbox, 
+                    "label": label, 
+                    "confidence": confidence,
+                    "type": "person" if label == "person" else "body_part"
+                })
         
         return detections
 
+    def label_names(self):
+        """All labels this engine can produce, in a stable order."""
+        if not self.has_keypoints:
+            return [self.class_labels[i] for i in self.target_classes]
+        return list(self.body_part_groups) + [self.class_labels.get(0, "person")]
+
     def _extract_body_parts(self, keypoints, frame_shape):
         """
         Extract body part bounding boxes from keypoints.
@@ -134,4 +242,18 @@ class DetectionEngine:
             if det["label"] in target_parts:
                 filtered_detections.append(det)
         
-        return filtered_detections 
\ No newline at end of file
+        return filtered_detections
+
+
+def filter_detections(detections, mode, target_parts=None):
+    """
+    Filter detections for a detection mode ("All Body Parts", "Person Only"
+    or "Custom Selection"). In "All Body Parts" mode a non-empty target_parts
+    list still restricts the labels that are kept.
+    """
+    if mode == "Person Only":
+        return [d for d in detections if d["label"] == "person"]
+    if mode == "Custom Selection" or target_parts:
+        allowed = set(target_parts or ())
+        return [d for d in detections if d["label"] in allowed]
+    return detections
@@ -0,0 +1,153 @@
+"""
+Decoded frames around a playhead, for scrubbing a video without waiting on
+the decoder.
+
+FrameCache keeps up to `slots` decoded frames in a memory-mapped scratch
+file and a background thread that fills the window around the playhead:
+the frames ahead of it first, then the ones behind it. Moving the playhead
+within the window needs no decoding at all; jumping outside it costs one
+seek (to the nearest keyframe, which OpenCV does internally) and a forward
+decode, after which stepping and scrubbing around the new position are
+served from the cache again.
+"""
+
+import os
+import tempfile
+import threading
+from typing import Optional
+
+import cv2
+import numpy as np
+
+# Forward gaps up to this many frames are skipped with grab() instead of a seek
+MAX_GRAB_GAP = 30
+
+
+class FrameCache:
+    """
+    Memory-mapped cache of decoded frames of one video. get() never decodes
+    on the caller's thread: it returns None for frames not decoded yet, and
+    wait=True blocks until the decoder thread has produced it.
+    """
+    def __init__(self, path, slots=240, behind=60, directory=None):
+        self.path = path
+        cap = cv2.VideoCapture(path)
+        if not cap.isOpened():
+            raise ValueError(f"Cannot open video {path}")
+        self.fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        ok, first = cap.read()
+        if not ok:
+            cap.release()
+            raise ValueError(f"Cannot decode video {path}")
+        self.shape = first.shape
+        self.slots = max(2, slots)
+        self.behind = min(max(0, behind), self.slots - 1)
+
+        self._file = tempfile.NamedTemporaryFile(prefix="glfps-frames-", suffix=".raw", dir=directory)
+        self._file.truncate(self.slots * first.nbytes)
+        self.frames = np.memmap(self._file.name, dtype=np.uint8, mode='r+', shape=(self.slots,) + self.shape)
+        self._slot_of = {}                  # frame index -> slot
+        self._frame_in = [-1] * self.slots  # slot -> frame index
+        self._cap = cap
+        self._position = 1                  # Next frame cap.read() returns
+        self.playhead = 0
+        self._store(0, first)
+
+        self._cond = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._decode_loop, daemon=True, name=f"frame-cache-{os.path.basename(path)}")
+        self._thread.start()
+
+    def window(self):
+        """Frame range [start, end) the decoder keeps filled around the playhead."""
+        start = max(0, self.playhead - self.behind)
+        end = min(self.frame_count, start + self.slots) if self.frame_count > 0 else start + self.slots
+        return start, end
+
+    def set_playhead(self, index):
+        with self._cond:
+            self.playhead = max(0, index)
+            self._cond.notify_all()
+
+    def cached(self, index) -> bool:
+        return index in self._slot_of
+
+    def get(self, index, wait=False, timeout=None) -> Optional[np.ndarray]:
+        """A copy of frame index if it is decoded (after waiting for it with wait=True), else None."""
+        with self._cond:
+            if wait and index not in self._slot_of:
+                self._cond.wait_for(lambda: index in self._slot_of or not self._running, timeout)
+            slot = self._slot_of.get(index)
+            # Copy under the lock: the decoder may reuse the slot as soon as the playhead moves on
+            return np.array(self.frames[slot]) if slot is not None else None
+
+    def _next_missing(self) -> Optional[int]:
+        start, end = self.window()
+        playhead = min(max(self.playhead, start), end - 1)
+        for index in range(playhead, end):
+            if index not in self._slot_of:
+                return index
+        for index in range(start, playhead):
+            if index not in self._slot_of:
+                return index
+        return None
+
+    def _free_slot(self) -> int:
+        """An empty slot, or the one holding the frame furthest outside the window."""
+        start, end = self.window()
+        best, best_distance = 0, -1
+        for slot, index in enumerate(self._frame_in):
+            if index < 0:
+                return slot
+            distance = start - index if index < start else index - end + 1 if index >= end else -1
+            if distance > best_distance:
+                best, best_distance = slot, distance
+        return best
+
+    def _store(self, index, frame):
+        slot = self._free_slot()
+        old = self._frame_in[slot]
+        if old >= 0:
+            del self._slot_of[old]
+        self.frames[slot] = frame
+        self._frame_in[slot] = index
+        self._slot_of[index] = slot
+
+    def _decode_loop(self):
+        cap = self._cap
+        while True:
+            with self._cond:
+                index = self._next_missing()
+                while self._running and index is None:
+                    self._cond.wait()
+                    index = self._next_missing()
+                if not self._running:
+                    return
+            # Decode outside the lock so get() and set_playhead() never wait on it
+            if not 0 <= index - self._position <= MAX_GRAB_GAP:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+                self._position = index
+            while self._position < index and cap.grab():
+                self._position += 1
+            ok, frame = cap.read()
+            with self._cond:
+                if not ok:
+                    # Past the real end (frame counts are estimates for some files)
+                    self.frame_count = max(1, self._position)
+                    self._cond.notify_all()
+                    continue
+                self._position += 1
+                start, end = self.window()
+                if start <= index < end:
+                    self._store(index, frame)
+                self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._thread.join(timeout=2)
+        self._cap.release()
+        del self.frames
+        self._file.close()
@@ -0,0 +1,188 @@
+"""
+Shared-memory ring of BGR frames for passing frames between processes
+without pickling or copying.
+
+Layout of the segment:
+
+    control   4 x int64     magic, slots, slot_bytes, latest frame id + 1
+    headers   slots x 16 x int64 (see the SLOT_* field indices)
+    data      slots x slot_bytes, 64-byte aligned
+
+There is exactly one writer. Each slot header carries a sequence counter used
+as a seqlock: the writer makes it odd before touching the slot and even again
+when the frame and its metadata are complete. Readers sample the counter
+before and after using a slot and discard the frame if it changed or was odd.
+"""
+
+from multiprocessing import shared_memory
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from glfps.shm_utils import attach_shared_memory
+
+MAGIC = 0x474C4650  # "GLFP"
+CONTROL_FIELDS = 4
+HEADER_FIELDS = 16
+
+_MAGIC, _SLOTS, _SLOT_BYTES, _LATEST = range(CONTROL_FIELDS)
+
+SLOT_SEQ = 0
+SLOT_FRAME_ID = 1
+SLOT_HEIGHT = 2
+SLOT_WIDTH = 3
+SLOT_CHANNELS = 4
+SLOT_TIMESTAMP_NS = 5
+SLOT_ORIGINAL_WIDTH = 6
+SLOT_ORIGINAL_HEIGHT = 7
+SLOT_LEFT = 8
+SLOT_TOP = 9
+
+
+class FrameRef(NamedTuple):
+    """A frame in the ring. frame may be a view into shared memory; check FrameRing.is_valid() after use."""
+    frame: np.ndarray
+    frame_id: int
+    slot: int
+    seq: int
+    timestamp_ns: int
+    original_size: tuple
+    monitor_offset: tuple
+
+
+def _align(offset, alignment=64):
+    return (offset + alignment - 1) // alignment * alignment
+
+
+class FrameRing:
+    """
+    Fixed-size ring of frames in a multiprocessing.shared_memory segment.
+    Create it once in the owning process (create=True) and attach to it by
+    name everywhere else.
+    """
+    def __init__(self, name=None, slots=4, max_shape=(2160, 1280, 3), create=True):
+        if create:
+            slot_bytes = _align(int(np.prod(max_shape)))
+            size = self._data_offset(slots) + slots * slot_bytes
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        else:
+            self.shm = attach_shared_memory(name)
+        self.owner = create
+
+        self.control = np.ndarray((CONTROL_FIELDS,), dtype=np.int64, buffer=self.shm.buf)
+        if create:
+            self.control[:] = (MAGIC, slots, slot_bytes, 0)
+        elif self.control[_MAGIC] != MAGIC:
+            self.close()
+            raise ValueError(f"Shared memory segment '{name}' is not a frame ring")
+
+        self.slots = int(self.control[_SLOTS])
+        self.slot_bytes = int(self.control[_SLOT_BYTES])
+        self.headers = np.ndarray((self.slots, HEADER_FIELDS), dtype=np.int64, buffer=self.shm.buf,
+                                  offset=CONTROL_FIELDS * 8)
+        if create:
+            self.headers[:] = 0
+        self.data_offset = self._data_offset(self.slots)
+        self.next_frame_id = int(self.control[_LATEST])
+
+    @staticmethod
+    def _data_offset(slots):
+        return _align((CONTROL_FIELDS + slots * HEADER_FIELDS) * 8)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def _slot_view(self, slot, shape):
+        return np.ndarray(shape, dtype=np.uint8, buffer=self.shm.buf,
+                          offset=self.data_offset + slot * self.slot_bytes)
+
+    # Writer side
+
+    def begin_write(self, shape):
+        """
+        Claim the next slot and return (slot, view) so the producer can write
+        the frame in place, e.g. cv2.cvtColor(..., dst=view). Finish with end_write().
+        """
+        if int(np.prod(shape)) > self.slot_bytes:
+            raise ValueError(f"Frame {shape} does not fit in a {self.slot_bytes} byte ring slot")
+        slot = self.next_frame_id % self.slots
+        self.headers[slot, SLOT_SEQ] += 1  # Odd: slot is being written
+        return slot, self._slot_view(slot, shape)
+
+    def end_write(self, slot, shape, timestamp_ns=0, original_size=None, monitor_offset=(0, 0)):
+        """Publish the frame written into the slot claimed by begin_write()."""
+        height, width = shape[:2]
+        frame_id = self.next_frame_id
+        header = self.headers[slot]
+        header[SLOT_FRAME_ID] = frame_id
+        header[SLOT_HEIGHT] = height
+        header[SLOT_WIDTH] = width
+        header[SLOT_CHANNELS] = shape[2] if len(shape) > 2 else 1
+        header[SLOT_TIMESTAMP_NS] = timestamp_ns
+        header[SLOT_ORIGINAL_WIDTH], header[SLOT_ORIGINAL_HEIGHT] = original_size or (width, height)
+        header[SLOT_LEFT], header[SLOT_TOP] = monitor_offset
+        header[SLOT_SEQ] += 1  # Even: slot is complete
+        self.control[_LATEST] = frame_id + 1
+        self.next_frame_id = frame_id + 1
+        return frame_id
+
+    def write(self, frame, **meta):
+        """Copy a frame into the next slot and publish it. Returns its frame id."""
+        slot, view = self.begin_write(frame.shape)
+        np.copyto(view, frame)
+        return self.end_write(slot, frame.shape, **meta)
+
+    # Reader side
+
+    def latest_id(self) -> int:
+        """Id of the newest complete frame, or -1 if nothing was written yet."""
+        return int(self.control[_LATEST]) - 1
+
+    def read(self, frame_id=None, copy=False) -> Optional[FrameRef]:
+        """
+        Return a FrameRef for frame_id (default: the newest frame), or None if
+        it is being written or has already been overwritten.
+
+        With copy=False the frame is a view into shared memory: use it, then
+        call is_valid() and drop anything derived from it if that is False.
+        With copy=True the copy is validated before returning.
+        """
+        if frame_id is None:
+            frame_id = self.latest_id()
+        if frame_id < 0:
+            return None
+        slot = frame_id % self.slots
+        header = self.headers[slot]
+        seq = int(header[SLOT_SEQ])
+        if seq % 2 or int(header[SLOT_FRAME_ID]) != frame_id:
+            return None
+        fields = header.tolist()
+        shape = (fields[SLOT_HEIGHT], fields[SLOT_WIDTH], fields[SLOT_CHANNELS])
+        frame = self._slot_view(slot, shape)
+        if copy:
+            frame = frame.copy()
+        ref = FrameRef(frame, frame_id, slot, seq, fields[SLOT_TIMESTAMP_NS],
+                       (fields[SLOT_ORIGINAL_WIDTH], fields[SLOT_ORIGINAL_HEIGHT]),
+                       (fields[SLOT_LEFT], fields[SLOT_TOP]))
+        if not self.is_valid(ref):
+            return None
+        return ref
+
+    def is_valid(self, ref: FrameRef) -> bool:
+        """True if the slot behind ref has not been rewritten since it was read."""
+        return int(self.headers[ref.slot, SLOT_SEQ]) == ref.seq
+
+    def close(self):
+        # Views must go before the segment can be closed
+        self.control = self.headers = None
+        try:
+            self.shm.close()
+        except BufferError:
+            pass  # A caller still holds a frame view
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+            self.owner = False
@@ -1,21 +1,31 @@
 import sys
 import os
 import platform
+import shutil
 import subprocess
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import get_context
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QPushButton, QLabel, QComboBox, 
                              QCheckBox, QGridLayout, QTextEdit, QFileDialog,
                              QMessageBox, QTabWidget, QProgressBar, QSpinBox,
-                             QDoubleSpinBox, QGroupBox, QLineEdit)
+                             QDoubleSpinBox, QGroupBox, QLineEdit, QSlider)
 from PyQt5.QtCore import QTimer, QThread, pyqtSignal, Qt
-from PyQt5.QtGui import QImage, QPixmap
 import cv2
 import numpy as np
 
 # Import our modules
-from glfps.detection import DetectionEngine
-from glfps.screen_capture import ScreenCapture
-from glfps.automation import Automation
+from glfps.batch import AnnotatedOutput, _init_worker, _process_chunk, plan_chunks, scan_input
+from glfps.detection import INFERENCE_ARGS, filter_detections
+from glfps.frame_cache import FrameCache
+from glfps.inference_cache import InferenceCache
+from glfps.qt_model_loader import ModelLoader
+from glfps.screen_capture import ScreenCapture, downscale_frame
+from glfps.overlay import draw_detections
+from glfps.qt_image import frame_to_pixmap
+from glfps.results_store import FORMAT_VERSION as RESULTS_STORE_VERSION, ResultStore, ResultStoreWriter
 from glfps.training.annotator import Annotator
 
 def launch_gui():
@@ -138,6 +148,13 @@ class DetectionTab(QWidget):
         # Initialize components
         self.screen_capture = None
         self.detector = None
+        self.requested_model = None
+        self.start_pending = False  # Start was clicked before the model finished loading
+        self.model_loader = ModelLoader(self)
+        self.model_loader.model_loaded.connect(self.on_model_loaded)
+        self.model_loader.model_failed.connect(self.on_model_failed)
+        # Load the default model once the window is up
+        QTimer.singleShot(0, lambda: self.change_model(self.model_combo.currentText()))
         self.is_detecting = False
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_frame)
@@ -160,12 +177,31 @@ class DetectionTab(QWidget):
                 checkbox.setEnabled(True)
 
     def change_model(self, model_path):
-        try:
-            self.detector = DetectionEngine(model_path=model_path)
-            self.status_label.setText(f"Status: Model loaded - {model_path}")
-        except Exception as e:
-            self.status_label.setText(f"Status: Error loading model - {e}")
-            QMessageBox.warning(self, "Model Error", f"Failed to load model: {e}")
+        """Load the model in the background; frames keep using the old one until it is ready."""
+        self.requested_model = model_path
+        self.status_label.setText(f"Status: Loading model - {model_path}")
+        self.model_loader.load(model_path)
+
+    def on_model_loaded(self, model_path, detector):
+        if model_path != self.requested_model:
+            return  # Superseded by a newer selection
+        # update_frame runs on this thread, so the swap lands between frames
+        self.detector = detector
+        self.status_label.setText(f"Status: Model loaded - {model_path}")
+        if self.start_pending:
+            self.start_pending = False
+            self.start_btn.setEnabled(True)
+            self.toggle_detection()
+
+    def on_model_failed(self, model_path, error):
+        if model_path != self.requested_model:
+            return  # Superseded by a newer selection
+        self.requested_model = None
+        if self.start_pending:
+            self.start_pending = False
+            self.start_btn.setEnabled(True)
+        self.status_label.setText(f"Status: Error loading model - {error}")
+        QMessageBox.warning(self, "Model Error", f"Failed to load model: {error}")
 
     def change_monitor(self, monitor_name):
         """Change the monitor to capture."""
@@ -205,11 +241,13 @@ class DetectionTab(QWidget):
                 self.screen_capture = ScreenCapture(monitor_index=1, max_fps=self.fps_spinbox.value())
             
             if self.detector is None:
-                try:
-                    self.detector = DetectionEngine(model_path=self.model_combo.currentText())
-                except Exception as e:
-                    QMessageBox.warning(self, "Model Error", f"Failed to load model: {e}")
-                    return
+                # Start once the background load is done instead of loading on the GUI thread
+                self.start_pending = True
+                self.start_btn.setEnabled(False)
+                if self.requested_model is None:  # Not started yet, or the last load failed
+                    self.change_model(self.model_combo.currentText())
+                self.status_label.setText(f"Status: Waiting for model - {self.requested_model}")
+                return
             
             # Test capture before starting
             if not self.screen_capture.test_capture():
@@ -244,73 +282,23 @@ class DetectionTab(QWidget):
         
         try:
             # Resize frame for faster processing (optional)
-            height, width = frame.shape[:2]
-            if width > 1280:  # Resize if too large for performance
-                scale = 1280 / width
-                new_width = int(width * scale)
-                new_height = int(height * scale)
-                frame = cv2.resize(frame, (new_width, new_height))
+            frame = downscale_frame(frame, max_width=1280)
             
             # Get detection mode and target parts
             mode = self.detection_mode.currentText()
-            if mode == "All Body Parts":
-                detections = self.detector.detect(frame)
-            elif mode == "Person Only":
-                detections = [d for d in self.detector.detect(frame) if d["label"] == "person"]
-            else:  # Custom Selection
+            target_parts = None
+            if mode == "Custom Selection":
                 target_parts = [part for part, checkbox in self.body_part_checkboxes.items() 
                               if checkbox.isChecked()]
-                detections = self.detector.detect_specific_parts(frame, target_parts)
-            
-            # Color mapping for different body parts
-            colors = {
-                'head': (255, 0, 0),      # Blue
-                'face': (255, 0, 255),    # Magenta
-                'torso': (0, 255, 0),     # Green
-                'left_arm': (255, 165, 0), # Orange
-                'right_arm': (255, 165, 0), # Orange
-                'left_leg': (128, 0, 128), # Purple
-                'right_leg': (128, 0, 128), # Purple
-                'left_hand': (0, 255, 255), # Yellow
-                'right_hand': (0, 255, 255), # Yellow
-                'left_foot': (165, 42, 42), # Brown
-                'right_foot': (165, 42, 42), # Brown
-                'body': (0, 255, 0),      # Green
-                'person': (0, 255, 0)     # Green
-            }
+            detections = filter_detections(self.detector.detect(frame), mode, target_parts)
             
             # Draw detections
-            for det in detections:
-                x, y, w, h = det["bbox"]
-                label = det["label"]
-                conf = det["confidence"]
-                det_type = det.get("type", "unknown")
-                
-                # Get color for this body part
-                color = colors.get(label, (0, 255, 0))
-                
-                # Draw bounding box
-                cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
-                
-                # Draw label with confidence
-                label_text = f"{label.replace('_', ' ').title()} {int(conf * 100)}%"
-                cv2.putText(frame, label_text, (x, y - 10), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
-                
-                # Add type indicator
-                if det_type == "body_part":
-                    cv2.circle(frame, (x + w - 5, y + 5), 3, (255, 255, 255), -1)
+            draw_detections(frame, detections)
             
             # Convert frame to Qt format for display (only if needed)
             if hasattr(self, 'video_label') and self.video_label.isVisible():
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                h, w, ch = rgb_frame.shape
-                bytes_per_line = ch * w
-                qt_image = QImage(rgb_frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
-                
                 # Scale image to fit label while maintaining aspect ratio
-                scaled_image = qt_image.scaled(self.video_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                self.video_label.setPixmap(QPixmap.fromImage(scaled_image))
+                self.video_label.setPixmap(frame_to_pixmap(frame, self.video_label.size()))
             
             # Show in OpenCV window for debugging
             cv2.imshow("Live Detection - Body Parts", frame)
@@ -558,6 +546,157 @@ class TrainingTab(QWidget):
                 self.stop_btn.setEnabled(False)
                 self.training_process = None
 
+def cached_store_path(cache, video_path, model_path, stride):
+    """Where the results store for this video, model and stride lives in an inference cache."""
+    # Keyed by file contents, so a store found here belongs to this exact video and model.
+    # Hashing reads the whole video: call this off the GUI thread
+    key = cache.make_key(video_path, model_path, 'torch', stride=stride,
+                         store=RESULTS_STORE_VERSION, **INFERENCE_ARGS)
+    directory = os.path.join(cache.root, "stores")
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f"{key}.glfstore")
+
+
+class VideoDetectionWorker(QThread):
+    """
+    Runs detection over a whole video in a pool of worker processes, writing
+    every frame's (unfiltered) detections to a results store. The chunks at
+    and after the playhead are scheduled first, so the pool works ahead of
+    playback; results are also kept in `results` so the tab can draw a
+    chunk as soon as it finishes. Without a store_path the store goes in the
+    cache; one found there from an earlier run is reported by `found`
+    instead of detecting again.
+    """
+    progress = pyqtSignal(int, int, float)  # frames done, total, frames per second
+    completed = pyqtSignal(str)             # store path
+    found = pyqtSignal(str)                 # store path of an earlier complete run
+    failed = pyqtSignal(str)
+
+    def __init__(self, video_path, model_path, store_path=None, stride=1, workers=2, cache=None,
+                 annotated_path=None, mode="All Body Parts", target_parts=None, chunk_size=64):
+        super().__init__()
+        self.video_path = video_path
+        self.model_path = model_path
+        self.store_path = store_path
+        self.stride = stride
+        self.workers = workers
+        self.cache = cache
+        self.annotated_path = annotated_path
+        self.mode = mode
+        self.target_parts = target_parts
+        self.chunk_size = chunk_size
+        self.results = {}
+        self.playhead = 0  # Set by the tab
+        self.running = True
+
+    def stop(self):
+        self.running = False
+        self.wait()
+
+    def run(self):
+        try:
+            if self.store_path is None:
+                self.store_path = cached_store_path(self.cache, self.video_path, self.model_path, self.stride)
+                if os.path.exists(os.path.join(self.store_path, "meta.json")):
+                    self.found.emit(self.store_path)
+                    self.annotate_stored()
+                    return
+            self.detect()
+        except Exception as e:
+            self.failed.emit(str(e))
+
+    def annotate_stored(self):
+        """Write the annotated video from a stored run's detections, if one was asked for."""
+        if not self.annotated_path:
+            return
+        batch_input = scan_input(self.video_path)
+        annotated = AnnotatedOutput(batch_input, self.annotated_path, self.stride)
+        try:
+            with ResultStore(self.store_path) as store:
+                for index in range(0, batch_input.frame_count, self.stride):
+                    if not self.running:
+                        break
+                    annotated.write(index, filter_detections(store.frame(index), self.mode, self.target_parts))
+        finally:
+            annotated.close()
+
+    def take_next_chunk(self, remaining):
+        """Remove and return the chunk to run next: the first one not wholly behind the playhead."""
+        ahead = [chunk for chunk in remaining if chunk.end > self.playhead]
+        chunk = min(ahead or remaining, key=lambda c: c.start)
+        remaining.remove(chunk)
+        return chunk
+
+    def detect(self):
+        batch_input = scan_input(self.video_path)
+        chunks = plan_chunks([batch_input], self.chunk_size)
+        total = len(range(0, batch_input.frame_count, self.stride))
+        workers = max(1, min(self.workers, len(chunks) or 1))
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        worker_cache, recorder = None, None
+        if self.cache is not None:
+            key = self.cache.make_key(self.video_path, self.model_path, 'torch', **INFERENCE_ARGS)
+            worker_cache = (self.cache.root, [key])
+            recorder = self.cache.recorder(key, self.cache.get(key), input=self.video_path, model=self.model_path)
+
+        partial_path = self.store_path + ".partial"
+        store = ResultStoreWriter(partial_path, fps=batch_input.fps)
+        annotated = None
+        if self.annotated_path:
+            annotated = AnnotatedOutput(batch_input, self.annotated_path, self.stride)
+        remaining = list(chunks)
+        finished = {}
+        next_to_write = 0
+        done = 0
+        self.progress.emit(0, total, 0.0)
+        started = time.perf_counter()
+        # Workers load the model themselves, so nothing here blocks on it
+        executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=get_context('spawn'), initializer=_init_worker,
+            initargs=(self.model_path, 'torch', threads, [batch_input], "All Body Parts", None,
+                      self.stride, None, worker_cache))
+        try:
+            pending = set()
+            while self.running and (pending or remaining):
+                while remaining and len(pending) < workers * 2:
+                    pending.add(executor.submit(_process_chunk, self.take_next_chunk(remaining)))
+                # A short timeout keeps stop() and playhead moves from waiting on a whole chunk
+                ready, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                for future in ready:
+                    chunk, results, _, new_raws = future.result()
+                    self.results.update(results)
+                    if recorder is not None:
+                        for index, raw in new_raws:
+                            recorder.add(index, raw)
+                    finished[chunk.chunk_index] = results
+                    done += len(results)
+                # The store takes frames in order: write out every chunk whose predecessors are done
+                while next_to_write in finished:
+                    for index, detections in finished.pop(next_to_write):
+                        store.write(index, index / batch_input.fps, detections)
+                        if annotated is not None:
+                            annotated.write(index, filter_detections(detections, self.mode, self.target_parts))
+                    next_to_write += 1
+                if ready:
+                    self.progress.emit(done, total, done / (time.perf_counter() - started))
+        finally:
+            # Chunks already running finish in the background; queued ones are dropped
+            executor.shutdown(wait=False, cancel_futures=True)
+            store.close()
+            if recorder is not None:
+                recorder.commit()
+            if annotated is not None:
+                annotated.close()
+        if not self.running:
+            shutil.rmtree(partial_path, ignore_errors=True)  # Stopped early: incomplete results aren't kept
+            return
+        # Only a complete run becomes the store that later sessions open
+        if os.path.exists(self.store_path):
+            shutil.rmtree(self.store_path)
+        os.replace(partial_path, self.store_path)
+        self.completed.emit(self.store_path)
+
+
 class VideoTestTab(QWidget):
     def __init__(self):
         super().__init__()
@@ -597,13 +736,91 @@ class VideoTestTab(QWidget):
         self.detection_mode.currentTextChanged.connect(self.on_detection_mode_changed)
         layout.addWidget(QLabel("Detection Mode:"))
         layout.addWidget(self.detection_mode)
+
+        # Process every Nth frame; skipped frames are not fully decoded
+        stride_layout = QHBoxLayout()
+        stride_layout.addWidget(QLabel("Frame Stride:"))
+        self.stride_spinbox = QSpinBox()
+        self.stride_spinbox.setRange(1, 100)
+        self.stride_spinbox.setValue(1)
+        stride_layout.addWidget(self.stride_spinbox)
+        layout.addLayout(stride_layout)
+
+        # Annotated copy, encoded on a background thread
+        self.save_video_checkbox = QCheckBox("Save Annotated Video")
+        layout.addWidget(self.save_video_checkbox)
+
+        # Reruns on the same video and model reuse stored model outputs
+        self.use_cache_checkbox = QCheckBox("Reuse Cached Inference Results")
+        self.use_cache_checkbox.setChecked(True)
+        layout.addWidget(self.use_cache_checkbox)
+        self.inference_cache = None
+
+        # Detection runs in this many processes, ahead of playback
+        workers_layout = QHBoxLayout()
+        workers_layout.addWidget(QLabel("Detection Workers:"))
+        self.workers_spinbox = QSpinBox()
+        self.workers_spinbox.setRange(1, max(1, os.cpu_count() or 1))
+        self.workers_spinbox.setValue(max(1, min(4, (os.cpu_count() or 1) // 2)))
+        workers_layout.addWidget(self.workers_spinbox)
+        layout.addLayout(workers_layout)
         
         self.start_btn = QPushButton("Start Video Detection")
         self.start_btn.clicked.connect(self.run_detection)
         layout.addWidget(self.start_btn)
+        self.status_label = QLabel("")
+        layout.addWidget(self.status_label)
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setVisible(False)
+        layout.addWidget(self.progress_bar)
+
+        # Player: overlays come from stored results, frames from the frame cache
+        self.display_label = QLabel()
+        self.display_label.setMinimumSize(640, 360)
+        self.display_label.setAlignment(Qt.AlignCenter)
+        self.display_label.setStyleSheet("border: 2px solid gray; background-color: black;")
+        layout.addWidget(self.display_label)
+        self.position_slider = QSlider(Qt.Horizontal)
+        self.position_slider.setEnabled(False)
+        self.position_slider.valueChanged.connect(self.seek)
+        layout.addWidget(self.position_slider)
+        player_layout = QHBoxLayout()
+        self.step_back_btn = QPushButton("◀ Step")
+        self.step_back_btn.clicked.connect(lambda: self.step(-1))
+        player_layout.addWidget(self.step_back_btn)
+        self.play_btn = QPushButton("Play")
+        self.play_btn.clicked.connect(self.toggle_play)
+        player_layout.addWidget(self.play_btn)
+        self.step_forward_btn = QPushButton("Step ▶")
+        self.step_forward_btn.clicked.connect(lambda: self.step(1))
+        player_layout.addWidget(self.step_forward_btn)
+        self.position_label = QLabel("")
+        player_layout.addWidget(self.position_label)
+        layout.addLayout(player_layout)
+        for widget in (self.step_back_btn, self.play_btn, self.step_forward_btn):
+            widget.setEnabled(False)
+
         self.setLayout(layout)
+        self.setFocusPolicy(Qt.StrongFocus)
         self.is_windows = platform.system() == 'Windows'
 
+        self.worker = None
+        self.frame_cache = None
+        self.store = None
+        self.temp_store_dir = None
+        self.stride = 1
+        self.playhead = 0
+        self.shown_detected = False
+        self.play_timer = QTimer()
+        self.play_timer.timeout.connect(self.advance)
+        # Retries drawing the playhead frame until the frame cache has decoded it
+        self.pending_timer = QTimer()
+        self.pending_timer.setInterval(15)
+        self.pending_timer.timeout.connect(self.show_current)
+        for checkbox in self.body_part_checkboxes.values():
+            checkbox.toggled.connect(lambda _: self.show_current())
+        self.detection_mode.currentTextChanged.connect(lambda _: self.show_current())
+
     def on_detection_mode_changed(self, mode):
         """Enable/disable checkboxes based on detection mode"""
         if mode == "All Body Parts":
@@ -630,92 +847,198 @@ class VideoTestTab(QWidget):
             self.model_path = path
             self.model_label.setText(f"Model: {path}")
 
+    def current_filter(self):
+        mode = self.detection_mode.currentText()
+        target_parts = None
+        if mode == "Custom Selection":
+            target_parts = [part for part, checkbox in self.body_part_checkboxes.items()
+                            if checkbox.isChecked()]
+        return mode, target_parts
+
+    def temp_store_path(self):
+        """A results store for this session only (when the cache is off)."""
+        self.temp_store_dir = tempfile.mkdtemp(prefix="glfps-video-")
+        return os.path.join(self.temp_store_dir, "results.glfstore")
+
     def run_detection(self):
         if not self.video_path:
             QMessageBox.warning(self, "Missing Input", "Please select a video file.")
             return
-        
-        from glfps.detection import DetectionEngine
-        import cv2
-        
+        self.close_video()
         try:
-            detector = DetectionEngine(model_path=self.model_path)
-        except Exception as e:
-            QMessageBox.warning(self, "Model Error", f"Failed to load model: {e}")
-            return
-        
-        cap = cv2.VideoCapture(self.video_path)
-        if not cap.isOpened():
+            self.frame_cache = FrameCache(self.video_path)
+        except ValueError:
             QMessageBox.warning(self, "Error", "Failed to open video file.")
             return
-        
-        window_name = "Video Detection - Body Parts"
-        cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
-        
-        # Color mapping for different body parts
-        colors = {
-            'head': (255, 0, 0),      # Blue
-            'face': (255, 0, 255),    # Magenta
-            'torso': (0, 255, 0),     # Green
-            'left_arm': (255, 165, 0), # Orange
-            'right_arm': (255, 165, 0), # Orange
-            'left_leg': (128, 0, 128), # Purple
-            'right_leg': (128, 0, 128), # Purple
-            'left_hand': (0, 255, 255), # Yellow
-            'right_hand': (0, 255, 255), # Yellow
-            'left_foot': (165, 42, 42), # Brown
-            'right_foot': (165, 42, 42), # Brown
-            'body': (0, 255, 0),      # Green
-            'person': (0, 255, 0)     # Green
-        }
-        
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            # Get detection mode and target parts
-            mode = self.detection_mode.currentText()
-            if mode == "All Body Parts":
-                detections = detector.detect(frame)
-            elif mode == "Person Only":
-                detections = [d for d in detector.detect(frame) if d["label"] == "person"]
-            else:  # Custom Selection
-                target_parts = [part for part, checkbox in self.body_part_checkboxes.items() 
-                              if checkbox.isChecked()]
-                detections = detector.detect_specific_parts(frame, target_parts)
-            
-            # Draw detections
-            for det in detections:
-                x, y, w, h = det["bbox"]
-                label = det["label"]
-                conf = det["confidence"]
-                det_type = det.get("type", "unknown")
-                
-                # Get color for this body part
-                color = colors.get(label, (0, 255, 0))
-                
-                # Draw bounding box
-                cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
-                
-                # Draw label with confidence
-                label_text = f"{label.replace('_', ' ').title()} {int(conf * 100)}%"
-                cv2.putText(frame, label_text, (x, y - 10), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
-                
-                # Add type indicator
-                if det_type == "body_part":
-                    cv2.circle(frame, (x + w - 5, y + 5), 3, (255, 255, 255), -1)
-            
-            cv2.imshow(window_name, frame)
-            key = cv2.waitKey(1) & 0xFF
-            if key == ord('q'):
-                break
-            elif key == ord(' '):  # Spacebar to pause
-                cv2.waitKey(0)
-        
-        cap.release()
-        cv2.destroyWindow(window_name)
+        self.stride = self.stride_spinbox.value()
+        use_cache = self.use_cache_checkbox.isChecked()
+        if use_cache and self.inference_cache is None:
+            self.inference_cache = InferenceCache()
+
+        self.position_slider.blockSignals(True)
+        self.position_slider.setRange(0, max(0, self.frame_cache.frame_count - 1))
+        self.position_slider.setValue(0)
+        self.position_slider.blockSignals(False)
+        for widget in (self.position_slider, self.step_back_btn, self.play_btn, self.step_forward_btn):
+            widget.setEnabled(True)
+        self.play_timer.setInterval(max(1, int(1000 / self.frame_cache.fps)))
+        self.playhead = 0
+
+        annotated_path = None
+        if self.save_video_checkbox.isChecked():
+            annotated_path, _ = QFileDialog.getSaveFileName(self, "Save Annotated Video", "", "Videos (*.mp4)")
+        mode, target_parts = self.current_filter()
+        # The worker looks up the cached store itself: hashing a long video would freeze the tab
+        self.worker = VideoDetectionWorker(
+            self.video_path, self.model_path, None if use_cache else self.temp_store_path(), stride=self.stride,
+            workers=self.workers_spinbox.value(), cache=self.inference_cache if use_cache else None,
+            annotated_path=annotated_path or None, mode=mode, target_parts=target_parts)
+        self.worker.progress.connect(self.on_detection_progress)
+        self.worker.completed.connect(self.on_detection_completed)
+        self.worker.found.connect(self.on_store_found)
+        self.worker.failed.connect(self.on_detection_failed)
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setValue(0)
+        self.status_label.setText("Looking for stored detections..." if use_cache else "Detecting...")
+        self.worker.start()
+        self.show_current()
+
+    def on_detection_progress(self, done, total, fps):
+        if self.worker is None:
+            return  # Signal queued before the worker was stopped
+        if total:
+            self.progress_bar.setMaximum(total)
+            self.progress_bar.setValue(min(done, total))
+        if not done:
+            self.status_label.setText(f"Starting {self.worker.workers} detection workers...")
+            return
+        playback = "keeping up with" if fps >= self.frame_cache.fps / self.stride else "behind"
+        self.status_label.setText(f"Detecting: {done}/{total or '?'} frames, {fps:.1f} FPS "
+                                  f"({self.worker.workers} workers, {playback} playback)")
+        if not self.shown_detected and self.detections_at(self.playhead) is not None:
+            self.show_current()  # The frame on screen just got its results
+
+    def on_detection_completed(self, store_path):
+        self.store = ResultStore(store_path)
+        self.progress_bar.setVisible(False)
+        self.status_label.setText(f"Detection complete: {len(self.store)} frames stored")
+        self.show_current()
+
+    def on_store_found(self, store_path):
+        if self.worker is None:
+            return  # Signal queued before the worker was stopped
+        # Detected before: scrub straight away without running the model
+        self.store = ResultStore(store_path)
+        self.progress_bar.setVisible(False)
+        self.status_label.setText("Loaded stored detections")
+        self.show_current()
+
+    def on_detection_failed(self, error):
+        self.progress_bar.setVisible(False)
+        self.status_label.setText(f"Detection failed: {error}")
+        QMessageBox.warning(self, "Detection Error", error)
+
+    def detections_at(self, index):
+        """Stored detections for a frame (from the nearest sampled frame with a stride), None if not run yet."""
+        index -= index % self.stride
+        if self.store is not None:
+            return self.store.frame(index)
+        if self.worker is not None:
+            return self.worker.results.get(index)
+        return None
+
+    def seek(self, index):
+        if self.frame_cache is None:
+            return
+        self.playhead = max(0, min(index, self.frame_cache.frame_count - 1))
+        self.frame_cache.set_playhead(self.playhead)
+        if self.worker is not None:
+            self.worker.playhead = self.playhead  # The pool schedules from here
+        if self.position_slider.value() != self.playhead:
+            self.position_slider.blockSignals(True)
+            self.position_slider.setValue(self.playhead)
+            self.position_slider.blockSignals(False)
+        self.show_current()
+
+    def step(self, delta):
+        self.seek(self.playhead + delta)
+
+    def toggle_play(self):
+        if self.play_timer.isActive():
+            self.play_timer.stop()
+            self.play_btn.setText("Play")
+        elif self.frame_cache is not None:
+            self.play_timer.start()
+            self.play_btn.setText("Pause")
+
+    def advance(self):
+        """
+        Playback tick: move on once the next frame is decoded and, while
+        detection runs, detected, so playback runs at source FPS as long as
+        the pool keeps up and waits for it otherwise.
+        """
+        if self.playhead + 1 >= self.frame_cache.frame_count:
+            self.toggle_play()
+            return
+        detecting = self.worker is not None and self.worker.isRunning()
+        if detecting and self.detections_at(self.playhead + 1) is None:
+            return
+        if self.frame_cache.cached(self.playhead + 1):
+            self.seek(self.playhead + 1)
+
+    def show_current(self):
+        if self.frame_cache is None:
+            return
+        frame = self.frame_cache.get(self.playhead)
+        if frame is None:
+            self.pending_timer.start()
+            return
+        self.pending_timer.stop()
+        detections = self.detections_at(self.playhead)
+        if detections is not None:
+            draw_detections(frame, filter_detections(detections, *self.current_filter()))
+        self.display_label.setPixmap(frame_to_pixmap(frame, self.display_label.size()))
+        self.shown_detected = detections is not None
+        seconds = self.playhead / self.frame_cache.fps
+        suffix = "" if detections is not None else " (not detected yet)"
+        self.position_label.setText(f"Frame {self.playhead + 1}/{self.frame_cache.frame_count}  "
+                                    f"{seconds:.2f}s{suffix}")
+
+    def keyPressEvent(self, event):
+        key = event.key()
+        if key == Qt.Key_Space:
+            self.toggle_play()
+        elif key == Qt.Key_Left:
+            self.step(-1)
+        elif key == Qt.Key_Right:
+            self.step(1)
+        elif key == Qt.Key_Home:
+            self.seek(0)
+        elif key == Qt.Key_End and self.frame_cache is not None:
+            self.seek(self.frame_cache.frame_count - 1)
+        else:
+            super().keyPressEvent(event)
+
+    def close_video(self):
+        self.play_timer.stop()
+        self.pending_timer.stop()
+        self.play_btn.setText("Play")
+        if self.worker is not None:
+            self.worker.stop()
+            self.worker = None
+        if self.frame_cache is not None:
+            self.frame_cache.close()
+            self.frame_cache = None
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+        if self.temp_store_dir is not None:
+            shutil.rmtree(self.temp_store_dir, ignore_errors=True)
+            self.temp_store_dir = None
+
+    def closeEvent(self, event):
+        self.close_video()
+        super().closeEvent(event)
 
 class SettingsTab(QWidget):
     def __init__(self):
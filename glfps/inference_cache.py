@@ -0,0 +1,261 @@
+"""
+On-disk cache of raw model outputs per frame, for videos and datasets that
+are processed more than once.
+
+Entries are keyed by a hash of the input's content, the model weights, the
+backend and the arguments that change what the model outputs (image size,
+confidence and IoU thresholds). They hold raw outputs (see
+detection.raw_output), not detection dicts, so changes to post-processing
+(keypoint thresholds, filtering, target classes) still reuse them.
+
+Each entry is an uncompressed .npz with a .json manifest beside it that
+records its SHA-256; entries that fail the check are deleted on load. The
+cache is bounded by total bytes and evicts the least recently used
+entries first.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+CACHE_VERSION = 1
+DEFAULT_MAX_BYTES = 4 * 1024 ** 3
+
+
+def default_cache_dir():
+    return os.environ.get("GLFPS_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "glfps", "inference")
+
+
+def _file_sha256(path, block=1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for data in iter(lambda: f.read(block), b''):
+            digest.update(data)
+    return digest.hexdigest()
+
+
+class CachedOutputs:
+    """Raw outputs of the frames stored in one cache entry."""
+    def __init__(self, arrays):
+        self.frame_ids = arrays["frame_ids"]
+        self.offsets = arrays["offsets"]
+        self.boxes = arrays["boxes"]
+        self.keypoints = arrays["keypoints"] if arrays["has_keypoints"] else None
+        self.rows = {int(frame_id): i for i, frame_id in enumerate(self.frame_ids)}
+
+    def __len__(self):
+        return len(self.frame_ids)
+
+    def __contains__(self, frame_id):
+        return frame_id in self.rows
+
+    def raw(self, frame_id) -> Optional[dict]:
+        """The raw output stored for frame_id, or None if it was never run."""
+        i = self.rows.get(frame_id)
+        if i is None:
+            return None
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return {"boxes": self.boxes[start:end],
+                "keypoints": self.keypoints[start:end] if self.keypoints is not None else None}
+
+    def items(self):
+        for frame_id in self.frame_ids:
+            yield int(frame_id), self.raw(int(frame_id))
+
+
+class CacheRecorder:
+    """
+    Collects raw outputs while a run goes, then stores them (together with
+    any entry it extends) under one key with commit().
+    """
+    def __init__(self, cache, key, existing: Optional[CachedOutputs] = None, info=None):
+        self.cache = cache
+        self.key = key
+        self.info = info or {}
+        self.outputs: Dict[int, dict] = dict(existing.items()) if existing is not None else {}
+        self.added = 0
+
+    def add(self, frame_id, raw):
+        self.outputs[frame_id] = raw
+        self.added += 1
+
+    def commit(self) -> bool:
+        """Store everything recorded; skipped when nothing new was added."""
+        if not self.added:
+            return False
+        self.cache.put(self.key, self.outputs, self.info)
+        self.added = 0
+        return True
+
+
+class InferenceCache:
+    """
+    Content-addressed store of raw per-frame model outputs under root
+    (default ~/.cache/glfps/inference, or $GLFPS_CACHE_DIR), capped at
+    max_bytes with least-recently-used eviction.
+    """
+    def __init__(self, root=None, max_bytes=DEFAULT_MAX_BYTES, verify=True):
+        self.root = root or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.verify = verify
+        self._lock = threading.Lock()
+        self._hashes = {}
+        os.makedirs(self.root, exist_ok=True)
+
+    def content_hash(self, path) -> str:
+        """SHA-256 of a file (or of the sorted files in a folder); file hashes are memoized by size and mtime."""
+        if not os.path.exists(path):
+            return hashlib.sha256(str(path).encode()).hexdigest()  # e.g. a model name to be downloaded
+        if os.path.isdir(path):
+            combined = hashlib.sha256()
+            for name in sorted(os.listdir(path)):
+                child = os.path.join(path, name)
+                if os.path.isfile(child):
+                    combined.update(name.encode() + b"\0" + self.content_hash(child).encode())
+            return combined.hexdigest()
+        stat = os.stat(path)
+        memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        digest = self._hashes.get(memo_key)
+        if digest is None:
+            digest = self._hashes[memo_key] = _file_sha256(path)
+        return digest
+
+    def key(self, input_path, engine) -> str:
+        """Cache key for running engine (a DetectionEngine) over input_path."""
+        return self.make_key(input_path, engine.model_path, engine.backend, **engine.inference_args)
+
+    def make_key(self, input_path, model_path, backend='torch', **inference_args) -> str:
+        parts = {
+            "version": CACHE_VERSION,
+            "input": self.content_hash(input_path),
+            "model": self.content_hash(model_path),
+            "backend": backend or 'torch',
+            "args": inference_args,
+        }
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()[:40]
+
+    def _paths(self, key):
+        base = os.path.join(self.root, key)
+        return base + ".npz", base + ".json"
+
+    def get(self, key, touch=True) -> Optional[CachedOutputs]:
+        """
+        Load an entry, or None if missing or corrupt. With touch (the default)
+        the entry's last use is recorded and corrupt entries are removed;
+        touch=False only reads, for worker processes sharing the cache.
+        """
+        data_path, manifest_path = self._paths(key)
+        with self._lock:
+            try:
+                with open(manifest_path) as f:
+                    manifest = json.load(f)
+                if self.verify and _file_sha256(data_path) != manifest["sha256"]:
+                    raise ValueError("checksum mismatch")
+                with np.load(data_path) as data:
+                    outputs = CachedOutputs({name: data[name] for name in data.files})
+            except FileNotFoundError:
+                return None
+            except (OSError, ValueError, KeyError) as e:
+                if touch:
+                    print(f"⚠️ Dropping corrupt inference cache entry {key}: {e}")
+                    self._remove(key)
+                return None
+            if touch:
+                manifest["last_used"] = time.time()
+                try:
+                    self._write_manifest(manifest_path, manifest)
+                except OSError as e:
+                    # Only eviction order depends on it; another process may have evicted the entry
+                    print(f"⚠️ Could not update inference cache entry {key}: {e}")
+        return outputs
+
+    def recorder(self, key, existing: Optional[CachedOutputs] = None, **info) -> CacheRecorder:
+        return CacheRecorder(self, key, existing, info)
+
+    def put(self, key, outputs: Dict[int, dict], info=None):
+        """Store raw outputs ({frame_id: raw}) under key, replacing any previous entry."""
+        frame_ids = np.array(sorted(outputs), dtype=np.int64)
+        raws = [outputs[int(i)] for i in frame_ids]
+        offsets = np.zeros(len(raws) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(raw["boxes"]) for raw in raws])
+        boxes = np.concatenate([raw["boxes"] for raw in raws]) if raws else np.zeros((0, 6), np.float32)
+        with_keypoints = [raw["keypoints"] for raw in raws if raw.get("keypoints") is not None]
+        has_keypoints = bool(with_keypoints)
+        keypoints = np.zeros((0, 17, 3), np.float32)
+        if has_keypoints:
+            # Keypoint rows line up with box rows; pad frames that had none
+            shape = with_keypoints[0].shape[1:]
+            keypoints = np.concatenate([raw["keypoints"] if raw.get("keypoints") is not None
+                                        else np.zeros((len(raw["boxes"]),) + shape, np.float32) for raw in raws])
+
+        data_path, manifest_path = self._paths(key)
+        with self._lock:
+            fd, tmp = tempfile.mkstemp(dir=self.root, prefix=key + ".", suffix=".tmp.npz")
+            os.close(fd)
+            try:
+                np.savez(tmp, frame_ids=frame_ids, offsets=offsets, boxes=boxes.astype(np.float32),
+                         keypoints=keypoints.astype(np.float32), has_keypoints=np.array(has_keypoints))
+                os.replace(tmp, data_path)
+            except BaseException:
+                os.remove(tmp)
+                raise
+            now = time.time()
+            self._write_manifest(manifest_path, dict(info or {}, key=key, sha256=_file_sha256(data_path),
+                                                     bytes=os.path.getsize(data_path), frames=len(frame_ids),
+                                                     created=now, last_used=now))
+            self._evict()
+
+    @staticmethod
+    def _write_manifest(path, manifest):
+        # A unique temporary name: other processes may be writing the same manifest
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(manifest, f)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def _remove(self, key):
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def entries(self) -> list:
+        """Manifests of all entries, least recently used first."""
+        manifests = []
+        for name in os.listdir(self.root):
+            if name.endswith(".json"):
+                try:
+                    with open(os.path.join(self.root, name)) as f:
+                        manifests.append(json.load(f))
+                except (OSError, ValueError):
+                    continue
+        return sorted(manifests, key=lambda m: m.get("last_used", 0))
+
+    def total_bytes(self) -> int:
+        return sum(m.get("bytes", 0) for m in self.entries())
+
+    def _evict(self):
+        entries = self.entries()
+        total = sum(m.get("bytes", 0) for m in entries)
+        for manifest in entries[:-1]:  # Never evict the newest entry, even if it alone is over budget
+            if total <= self.max_bytes:
+                break
+            self._remove(manifest["key"])
+            total -= manifest.get("bytes", 0)
+
+    def clear(self):
+        with self._lock:
+            for manifest in self.entries():
+                self._remove(manifest["key"])
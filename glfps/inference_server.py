@@ -0,0 +1,406 @@
+"""
+Local inference server with cross-client dynamic batching.
+
+One process owns one loaded DetectionEngine per backend. Capture clients on
+the same machine send frames as shared memory handles over a Unix socket (or
+loopback TCP), the server batches concurrent requests up to a latency
+deadline and returns compact detections.
+
+    python -m glfps server --address /tmp/glfps.sock --model torch=yolov8n-pose.pt
+
+Wire format: every message is a 4-byte big-endian length followed by JSON.
+Detections are returned as [x, y, w, h, label_id, confidence_permille] rows;
+label ids index the label table returned by the "hello" request.
+"""
+
+import json
+import math
+import os
+import queue
+import socket
+import struct
+import sys
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from glfps.shm_utils import attach_shared_memory
+
+DEFAULT_ADDRESS = "/tmp/glfps-inference.sock"
+_HEADER = struct.Struct("!I")
+
+
+def parse_address(address):
+    """'host:port' means loopback TCP, anything else is a Unix socket path."""
+    if isinstance(address, tuple):
+        return socket.AF_INET, address
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit() and "/" not in address:
+        return socket.AF_INET, (host or "127.0.0.1", int(port))
+    return socket.AF_UNIX, address
+
+
+def send_message(sock, message):
+    data = json.dumps(message, separators=(",", ":")).encode()
+    sock.sendall(_HEADER.pack(len(data)) + data)
+
+
+def _recv_exact(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def recv_message(sock):
+    """Read one message, or None when the peer closed the connection."""
+    header = _recv_exact(sock, _HEADER.size)
+    if header is None:
+        return None
+    data = _recv_exact(sock, _HEADER.unpack(header)[0])
+    return None if data is None else json.loads(data)
+
+
+def encode_detections(detections, label_ids):
+    """Pack detection dicts into compact [x, y, w, h, label_id, conf_permille] rows."""
+    return [[*det["bbox"], label_ids.get(det["label"], -1), int(det["confidence"] * 1000)]
+            for det in detections]
+
+
+def decode_detections(rows, labels):
+    """Inverse of encode_detections, back to the dicts DetectionEngine returns."""
+    detections = []
+    for x, y, w, h, label_id, conf in rows:
+        label = labels[label_id] if 0 <= label_id < len(labels) else "unknown"
+        detections.append({
+            "bbox": [x, y, w, h],
+            "label": label,
+            "confidence": conf / 1000.0,
+            "type": "person" if label == "person" else "body_part",
+        })
+    return detections
+
+
+class DynamicBatcher(threading.Thread):
+    """
+    Collects requests for one engine and runs them as a batch once max_batch
+    requests are waiting or the oldest request has waited max_delay seconds.
+    """
+    def __init__(self, engine, max_batch=8, max_delay=0.005):
+        super().__init__(daemon=True, name="batcher")
+        self.engine = engine
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.requests = queue.Queue()
+        self.running = True
+        self.batches = 0
+        self.frames = 0
+
+    def submit(self, frame, reply):
+        """Queue a frame; reply(detections, error) is called from the batcher thread."""
+        self.requests.put((frame, reply, time.perf_counter()))
+
+    def run(self):
+        while self.running:
+            try:
+                first = self.requests.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            batch = [first]
+            deadline = first[2] + self.max_delay
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.requests.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            frames = [frame for frame, _, _ in batch]
+            replies = [reply for _, reply, _ in batch]
+            try:
+                results, error = self.engine.detect_batch(frames), None
+            except Exception as e:
+                results, error = [None] * len(batch), str(e)
+            self.batches += 1
+            self.frames += len(replies)
+            # Frames may be views of client shared memory, which a reply lets the
+            # client reuse and the server unmap: drop them before replying
+            del first, batch, frames
+            for reply, detections in zip(replies, results):
+                reply(detections, error)
+
+    def stop(self):
+        self.running = False
+
+
+class InferenceServer:
+    """
+    Serves detection requests from local clients. models maps backend name to
+    model path; one engine is loaded per backend and shared by all clients.
+    """
+    def __init__(self, models, address=DEFAULT_ADDRESS, max_batch=8, max_delay_ms=5.0):
+        from glfps.model_cache import get_model_cache
+        self.address = address
+        self.batchers = {}
+        self.labels = {}
+        for backend, model_path in models.items():
+            engine = get_model_cache().get(model_path, backend)
+            engine.verbose = False
+            self.labels[backend] = engine.label_names()
+            self.batchers[backend] = DynamicBatcher(engine, max_batch, max_delay_ms / 1000.0)
+        self.default_backend = next(iter(models))
+        self.sock = None
+        self.running = False
+
+    def serve_forever(self):
+        family, bind_address = parse_address(self.address)
+        if family == socket.AF_UNIX and os.path.exists(bind_address):
+            os.unlink(bind_address)
+        self.sock = socket.socket(family, socket.SOCK_STREAM)
+        if family == socket.AF_INET:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(bind_address)
+        self.sock.listen()
+        for batcher in self.batchers.values():
+            batcher.start()
+
+        self.running = True
+        print(f"✅ Inference server listening on {self.address} "
+              f"(backends: {', '.join(self.batchers)})", flush=True)
+        try:
+            while self.running:
+                try:
+                    conn, _ = self.sock.accept()
+                except OSError:
+                    break
+                if family == socket.AF_INET:
+                    conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                threading.Thread(target=self._handle_client, args=(conn,), daemon=True).start()
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        self.running = False
+        for batcher in self.batchers.values():
+            batcher.stop()
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+            family, bind_address = parse_address(self.address)
+            if family == socket.AF_UNIX and os.path.exists(bind_address):
+                os.unlink(bind_address)
+
+    def _handle_client(self, conn):
+        send_lock = threading.Lock()
+        segments = _ClientSegments()
+
+        def reply_to(request_id, label_ids, shm_name):
+            def reply(detections, error):
+                message = {"id": request_id}
+                if error is not None:
+                    message["error"] = error
+                else:
+                    message["d"] = encode_detections(detections, label_ids)
+                with send_lock:
+                    try:
+                        send_message(conn, message)
+                    except OSError:
+                        pass
+                segments.done(shm_name)
+            return reply
+
+        label_ids = {backend: {label: i for i, label in enumerate(labels)}
+                     for backend, labels in self.labels.items()}
+        try:
+            while True:
+                message = recv_message(conn)
+                if message is None:
+                    break
+                op = message.get("op")
+                if op == "detect":
+                    backend = message.get("backend") or self.default_backend
+                    if backend not in self.batchers:
+                        with send_lock:
+                            send_message(conn, {"id": message.get("id"), "error": f"Unknown backend '{backend}'"})
+                        continue
+                    try:
+                        frame = segments.acquire(message)
+                    except (OSError, ValueError) as e:
+                        with send_lock:
+                            send_message(conn, {"id": message.get("id"), "error": f"Bad frame: {e}"})
+                        continue
+                    self.batchers[backend].submit(
+                        frame, reply_to(message.get("id"), label_ids[backend], message["shm"]))
+                    del frame  # The batcher holds the only view until it replies
+                elif op == "release":
+                    segments.release(message.get("shm"))
+                elif op == "hello":
+                    with send_lock:
+                        send_message(conn, {"backends": list(self.batchers), "labels": self.labels,
+                                            "default_backend": self.default_backend})
+                elif op == "stats":
+                    with send_lock:
+                        send_message(conn, {backend: {"batches": b.batches, "frames": b.frames,
+                                                      "mean_batch": b.frames / b.batches if b.batches else 0}
+                                            for backend, b in self.batchers.items()})
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Client connection error: {e}", file=sys.stderr)
+        finally:
+            conn.close()
+            segments.close()
+
+
+class _ClientSegments:
+    """
+    Shared memory segments attached for one client. A segment stays mapped
+    while any request reading it is queued or batched, even if the client
+    releases it or disconnects meanwhile; it is closed after the last of
+    those requests has been replied to.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.segments = {}   # name -> SharedMemory
+        self.in_flight = {}  # name -> requests still reading the segment
+        self.closing = set()  # Released while requests were in flight
+
+    def acquire(self, message):
+        """
+        Zero-copy view of a detect request's frame (attaching the segment on
+        first use), counted as in flight until done(). Raises ValueError for
+        a malformed request.
+        """
+        name, shape = message.get("shm"), message.get("shape")
+        if not isinstance(name, str) or not name:
+            raise ValueError("missing shared memory name")
+        if not isinstance(shape, (list, tuple)) or len(shape) not in (2, 3) \
+                or not all(isinstance(v, int) and v > 0 for v in shape):
+            raise ValueError(f"invalid frame shape {shape!r}")
+        with self.lock:
+            if name in self.closing:
+                raise ValueError(f"shared memory {name} was released")
+            if name not in self.segments:
+                self.segments[name] = attach_shared_memory(name)
+            segment = self.segments[name]
+            if math.prod(shape) > segment.size:
+                raise ValueError(f"frame shape {shape} does not fit in the {segment.size} byte segment")
+            self.in_flight[name] = self.in_flight.get(name, 0) + 1
+        # The client does not touch the segment until we reply
+        return np.ndarray(tuple(shape), dtype=np.uint8, buffer=segment.buf)
+
+    def done(self, name):
+        """A request on name has been replied to and no longer holds a view of it."""
+        with self.lock:
+            self.in_flight[name] -= 1
+            if self.in_flight[name]:
+                return
+            del self.in_flight[name]
+            if name not in self.closing:
+                return
+            self.closing.discard(name)
+            segment = self.segments.pop(name)
+        segment.close()
+
+    def release(self, name):
+        """Close name now, or once its in-flight requests are done."""
+        with self.lock:
+            if name not in self.segments:
+                return
+            if name in self.in_flight:
+                self.closing.add(name)
+                return
+            segment = self.segments.pop(name)
+        segment.close()
+
+    def close(self):
+        """The client is gone: close every segment no request is still reading."""
+        with self.lock:
+            names = list(self.segments)
+        for name in names:
+            self.release(name)
+
+
+class InferenceClient:
+    """
+    Client for InferenceServer. Frames are written into a shared memory
+    segment owned by this client; only the segment name and shape cross the
+    socket. One request is in flight at a time per client.
+    """
+    def __init__(self, address=DEFAULT_ADDRESS, backend=None, timeout=30.0):
+        family, connect_address = parse_address(address)
+        self.sock = socket.socket(family, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(connect_address)
+        if family == socket.AF_INET:
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        send_message(self.sock, {"op": "hello"})
+        hello = recv_message(self.sock)
+        self.backend = backend or hello["default_backend"]
+        self.labels = hello["labels"][self.backend]
+        self.shm = None
+        self.request_id = 0
+
+    def frame_buffer(self, shape):
+        """
+        Return a writable array backed by the shared segment, so a producer
+        can decode or capture straight into it and call detect_buffer().
+        """
+        nbytes = int(np.prod(shape))
+        if self.shm is None or self.shm.size < nbytes:
+            self._release_segment()
+            self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        return np.ndarray(shape, dtype=np.uint8, buffer=self.shm.buf)
+
+    def detect(self, frame):
+        """Copy frame into shared memory and run detection on the server."""
+        buffer = self.frame_buffer(frame.shape)
+        np.copyto(buffer, frame)
+        return self.detect_buffer(frame.shape)
+
+    def detect_buffer(self, shape):
+        """Run detection on the frame already written into frame_buffer(shape)."""
+        self.request_id += 1
+        send_message(self.sock, {"op": "detect", "id": self.request_id, "shm": self.shm.name,
+                                 "shape": list(shape), "backend": self.backend})
+        response = recv_message(self.sock)
+        if response is None:
+            raise ConnectionError("Inference server closed the connection")
+        if "error" in response:
+            raise RuntimeError(response["error"])
+        return decode_detections(response["d"], self.labels)
+
+    def stats(self):
+        send_message(self.sock, {"op": "stats"})
+        return recv_message(self.sock)
+
+    def _release_segment(self):
+        if self.shm is not None:
+            try:
+                send_message(self.sock, {"op": "release", "shm": self.shm.name})
+            except OSError:
+                pass
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def close(self):
+        self._release_segment()
+        self.sock.close()
+
+
+def parse_models(specs):
+    """Parse ['torch=yolov8n-pose.pt', 'onnx=yolov8n-pose.pt'] into {backend: path}."""
+    models = {}
+    for spec in specs or ["torch=yolov8n-pose.pt"]:
+        backend, sep, path = spec.partition("=")
+        if not sep:
+            backend, path = "torch", spec
+        models[backend] = path
+    return models
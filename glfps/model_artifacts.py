@@ -0,0 +1,241 @@
+"""
+Inference-ready model artifacts, built once per model and reused on every load.
+
+YOLO(model_path) unpickles the training checkpoint, converts it to float32
+and, on the first predict, fuses every conv+batchnorm pair. An artifact is
+the result of all that, stored so the next load is a single torch.load:
+
+- 'fused': an ultralytics-style checkpoint holding the already fused,
+  float32, eval-mode module. ultralytics loads it as usual and skips fusing
+  (it checks whether a model is fused), so nothing else changes.
+- 'torchscript': the fused module traced at a fixed input size, with the
+  metadata ultralytics reads from TorchScript files (names, stride, imgsz,
+  task, keypoint shape) in its config.txt. No Python module rebuild at
+  all, but the input size is fixed at build time.
+
+Artifacts live under ~/.cache/glfps/artifacts (or $GLFPS_ARTIFACT_DIR)
+keyed by the model's content hash, the format, the input size and the
+torch and ultralytics versions, with a JSON file of that metadata beside
+each one so it can be read without loading the model. Builds write to a
+unique temporary file under a lock file shared by all processes (batch
+workers and replicas all load the model at once), and the metadata records
+the artifact's size and SHA-256: an artifact that does not match, or that
+fails to load, is deleted and built again.
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: builds are only serialized within a process
+    fcntl = None
+
+ARTIFACT_VERSION = 1
+FORMATS = ('fused', 'torchscript')
+SUFFIXES = {'fused': '.pt', 'torchscript': '.torchscript'}
+
+
+def default_artifact_dir():
+    return os.environ.get("GLFPS_ARTIFACT_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "glfps", "artifacts")
+
+
+def _file_sha256(path, block=1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for data in iter(lambda: f.read(block), b''):
+            digest.update(data)
+    return digest.hexdigest()
+
+
+def _versions() -> dict:
+    import torch
+    import ultralytics
+    return {"torch": torch.__version__, "ultralytics": ultralytics.__version__}
+
+
+class ArtifactCache:
+    """Builds and finds inference-ready artifacts of YOLO models."""
+    def __init__(self, root=None, verify=True):
+        self.root = root or default_artifact_dir()
+        self.verify = verify
+        self._lock = threading.Lock()
+        self._hashes = {}
+
+    def _model_hash(self, model_path) -> str:
+        """Content hash of a model file, memoized by size and mtime."""
+        stat = os.stat(model_path)
+        memo_key = (os.path.abspath(model_path), stat.st_size, stat.st_mtime_ns)
+        digest = self._hashes.get(memo_key)
+        if digest is None:
+            digest = self._hashes[memo_key] = _file_sha256(model_path)
+        return digest
+
+    @contextlib.contextmanager
+    def _locked(self, artifact_path):
+        """Hold this process's lock and, where supported, an exclusive lock file for artifact_path."""
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            with open(artifact_path + ".lock", "a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def key(self, model_path, fmt='fused', imgsz=640) -> str:
+        parts = dict(_versions(), version=ARTIFACT_VERSION, model=self._model_hash(model_path), format=fmt,
+                     imgsz=imgsz if fmt == 'torchscript' else None)
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()[:40]
+
+    def paths(self, model_path, fmt='fused', imgsz=640):
+        base = os.path.join(self.root, f"{os.path.splitext(os.path.basename(model_path))[0]}-"
+                                       f"{self.key(model_path, fmt, imgsz)}")
+        return base + SUFFIXES[fmt], base + ".json"
+
+    def metadata(self, model_path, fmt='fused', imgsz=640) -> Optional[dict]:
+        """Metadata of a built artifact (names, stride, imgsz, task, ...), or None."""
+        try:
+            with open(self.paths(model_path, fmt, imgsz)[1]) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _valid(self, artifact_path, meta) -> bool:
+        """Whether the artifact on disk is the one meta describes."""
+        try:
+            if meta is None or os.path.getsize(artifact_path) != meta["bytes"]:
+                return False
+            return not self.verify or _file_sha256(artifact_path) == meta["sha256"]
+        except (OSError, KeyError):
+            return False
+
+    def _remove(self, model_path, fmt, imgsz):
+        for path in self.paths(model_path, fmt, imgsz):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+
+    def _write(self, final_path, write):
+        """Call write(tmp_path) on a unique temporary file and move it to final_path."""
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=os.path.basename(final_path) + ".", suffix=".tmp")
+        os.close(fd)
+        try:
+            write(tmp)
+            os.replace(tmp, final_path)
+        finally:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(tmp)
+
+    def build(self, model_path, fmt='fused', imgsz=640) -> str:
+        """Load, fuse and store model_path in the given format. Returns the artifact path."""
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown artifact format '{fmt}', expected one of: {', '.join(FORMATS)}")
+        artifact_path, _ = self.paths(model_path, fmt, imgsz)
+        with self._locked(artifact_path):
+            self._build(model_path, fmt, imgsz)
+        return artifact_path
+
+    def _build(self, model_path, fmt, imgsz):
+        import torch
+        from ultralytics import YOLO
+
+        artifact_path, meta_path = self.paths(model_path, fmt, imgsz)
+        started = time.perf_counter()
+        yolo = YOLO(model_path)
+        module = yolo.model.float().fuse().eval()
+        for parameter in module.parameters():
+            parameter.requires_grad_(False)
+        stride = int(max(module.stride)) if hasattr(module, "stride") else 32
+        meta = {
+            "version": ARTIFACT_VERSION,
+            "format": fmt,
+            "source": os.path.basename(model_path),
+            "task": yolo.task,
+            "names": {int(k): v for k, v in yolo.names.items()},
+            "stride": stride,
+            "imgsz": [imgsz, imgsz],
+            "batch": 1,
+            "kpt_shape": list(getattr(module, "kpt_shape", None) or []) or None,
+        }
+        # Drop stale metadata first so the new artifact is never checked against it
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(meta_path)
+        if fmt == 'fused':
+            # Same layout as an ultralytics checkpoint, so YOLO() loads it unchanged
+            self._write(artifact_path, lambda tmp: torch.save(
+                {"model": module, "train_args": dict(getattr(module, "args", {}) or {}),
+                 "date": time.strftime("%Y-%m-%dT%H:%M:%S"), "glfps_artifact": meta}, tmp))
+        else:
+            # What ultralytics' Exporter does first: in export mode the Detect/Pose head returns
+            # one tensor instead of the (tensor, dict) pair the tracer cannot handle
+            from ultralytics.nn.modules import Detect
+            for m in module.modules():
+                if isinstance(m, Detect):  # Also Pose, Segment and OBB heads
+                    m.export, m.format, m.dynamic, m.shape = True, 'torchscript', False, None
+            example = torch.zeros(1, 3, imgsz, imgsz)
+            module(example)  # Dry run, so the head's anchors are built before tracing
+            traced = torch.jit.trace(module, example, strict=False, check_trace=False)
+            self._write(artifact_path, lambda tmp: torch.jit.save(
+                traced, tmp, _extra_files={"config.txt": json.dumps(meta)}))
+        meta.update(bytes=os.path.getsize(artifact_path), sha256=_file_sha256(artifact_path),
+                    build_seconds=time.perf_counter() - started)
+
+        def write_meta(tmp):
+            with open(tmp, "w") as f:
+                json.dump(meta, f, indent=2)
+        self._write(meta_path, write_meta)
+
+    def get(self, model_path, fmt='fused', imgsz=640) -> str:
+        """Path of the artifact for model_path, (re)building it first if it is missing or corrupt."""
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown artifact format '{fmt}', expected one of: {', '.join(FORMATS)}")
+        artifact_path, _ = self.paths(model_path, fmt, imgsz)
+        with self._locked(artifact_path):
+            if not self._valid(artifact_path, self.metadata(model_path, fmt, imgsz)):
+                self._remove(model_path, fmt, imgsz)
+                self._build(model_path, fmt, imgsz)
+        return artifact_path
+
+    def load(self, model_path, fmt='fused', imgsz=640):
+        """A YOLO model loaded from the artifact of model_path (built on first use, rebuilt if unloadable)."""
+        from ultralytics import YOLO
+        for attempt in range(2):
+            artifact_path = self.get(model_path, fmt, imgsz)
+            meta = self.metadata(model_path, fmt, imgsz)
+            try:
+                if meta is None:
+                    raise ValueError("artifact metadata is missing")
+                return YOLO(artifact_path, task=meta["task"])
+            except Exception as e:
+                if attempt:
+                    raise
+                print(f"⚠️ Rebuilding model artifact {artifact_path}: {e}")
+                with self._locked(artifact_path):
+                    self._remove(model_path, fmt, imgsz)
+
+    def clear(self):
+        with self._lock:
+            if os.path.isdir(self.root):
+                for name in os.listdir(self.root):
+                    os.remove(os.path.join(self.root, name))
+
+
+_artifact_cache = None
+_artifact_cache_lock = threading.Lock()
+
+
+def get_artifact_cache() -> ArtifactCache:
+    """Return the process-wide artifact cache, creating it on first use."""
+    global _artifact_cache
+    with _artifact_cache_lock:
+        if _artifact_cache is None:
+            _artifact_cache = ArtifactCache()
+        return _artifact_cache
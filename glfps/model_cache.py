@@ -0,0 +1,150 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+import numpy as np
+
+from glfps.detection import DetectionEngine
+
+
+def model_nbytes(engine) -> int:
+    """
+    Approximate memory held by an engine's model: parameter and buffer bytes
+    for PyTorch models, file size for exported backends.
+    """
+    module = getattr(engine.model, 'model', None)
+    total = 0
+    if hasattr(module, 'parameters') and hasattr(module, 'buffers'):
+        for tensor in list(module.parameters()) + list(module.buffers()):
+            total += tensor.numel() * tensor.element_size()
+    if total == 0 and engine.model_path and os.path.isfile(engine.model_path):
+        total = os.path.getsize(engine.model_path)
+    return total
+
+
+def warmup_engine(engine, frame_size=(640, 480)):
+    """Run one dummy frame so lazy initialization (layer fusing, allocations) happens off the hot path."""
+    width, height = frame_size
+    engine.detect(np.zeros((height, width, 3), dtype=np.uint8))
+
+
+class ModelCache:
+    """
+    Process-wide cache of loaded DetectionEngines keyed by (model path, backend),
+    with LRU eviction by entry count and total model bytes. Loads run on a
+    background thread so callers (e.g. the GUI thread) never block on YOLO().
+    """
+    def __init__(self, max_entries=3, max_bytes=2 * 1024 ** 3, warmup=True):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.warmup = warmup
+        self._entries = OrderedDict()  # key -> (engine, nbytes)
+        self._pending = {}  # key -> Future
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-loader")
+
+    @staticmethod
+    def make_key(model_path, backend='torch'):
+        if os.path.exists(model_path):
+            model_path = os.path.abspath(model_path)
+        return (model_path, backend or 'torch')
+
+    def get(self, model_path, backend='torch') -> DetectionEngine:
+        """Return a cached engine, loading it (or waiting for a pending load) if needed."""
+        return self.load_async(model_path, backend).result()
+
+    def peek(self, model_path, backend='torch') -> Optional[DetectionEngine]:
+        """Return the cached engine if it is already loaded, without loading."""
+        key = self.make_key(model_path, backend)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def load_async(self, model_path, backend='torch', callback=None):
+        """
+        Load and warm up an engine in the background. Returns a Future; if
+        callback is given it is called as callback(engine, error) from the
+        loader thread (or immediately when the engine is already cached).
+        """
+        key = self.make_key(model_path, backend)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                future = Future()
+                future.set_result(entry[0])
+            else:
+                future = self._pending.get(key)
+                if future is None:
+                    future = self._executor.submit(self._load, key)
+                    self._pending[key] = future
+
+        if callback is not None:
+            def done(f):
+                error = f.exception()
+                callback(None if error else f.result(), error)
+            future.add_done_callback(done)
+        return future
+
+    def _load(self, key):
+        model_path, backend = key
+        try:
+            engine = DetectionEngine(model_path=model_path, backend=backend)
+            if self.warmup:
+                warmup_engine(engine)
+            nbytes = model_nbytes(engine)
+            with self._lock:
+                self._entries[key] = (engine, nbytes)
+                self._entries.move_to_end(key)
+                self._evict(keep=key)
+            print(f"✅ Model cached: {os.path.basename(model_path)} ({backend}, {nbytes / 1e6:.1f} MB)")
+            return engine
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def _evict(self, keep):
+        """Drop least recently used entries until within limits. Caller holds the lock."""
+        while len(self._entries) > 1:
+            total = sum(nbytes for _, nbytes in self._entries.values())
+            if len(self._entries) <= self.max_entries and (not self.max_bytes or total <= self.max_bytes):
+                break
+            oldest = next(iter(self._entries))
+            if oldest == keep:
+                break
+            self._entries.pop(oldest)
+            print(f"♻️ Model evicted from cache: {os.path.basename(oldest[0])} ({oldest[1]})")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Current cache contents and memory accounting."""
+        with self._lock:
+            return {
+                "entries": [{"model_path": k[0], "backend": k[1], "bytes": nbytes}
+                            for k, (_, nbytes) in self._entries.items()],
+                "total_bytes": sum(nbytes for _, nbytes in self._entries.values()),
+                "pending": len(self._pending),
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
+
+
+_model_cache = None
+_model_cache_lock = threading.Lock()
+
+
+def get_model_cache() -> ModelCache:
+    """Return the process-wide model cache, creating it on first use."""
+    global _model_cache
+    with _model_cache_lock:
+        if _model_cache is None:
+            _model_cache = ModelCache()
+        return _model_cache
@@ -0,0 +1,46 @@
+import cv2
+
+# Color mapping for different body parts (BGR)
+BODY_PART_COLORS = {
+    'head': (255, 0, 0),      # Blue
+    'face': (255, 0, 255),    # Magenta
+    'torso': (0, 255, 0),     # Green
+    'left_arm': (255, 165, 0), # Orange
+    'right_arm': (255, 165, 0), # Orange
+    'left_leg': (128, 0, 128), # Purple
+    'right_leg': (128, 0, 128), # Purple
+    'left_hand': (0, 255, 255), # Yellow
+    'right_hand': (0, 255, 255), # Yellow
+    'left_foot': (165, 42, 42), # Brown
+    'right_foot': (165, 42, 42), # Brown
+    'body': (0, 255, 0),      # Green
+    'person': (0, 255, 0)     # Green
+}
+
+def draw_detections(frame, detections, mark_body_parts=True):
+    """
+    Draw detection boxes and labels onto a BGR frame in place.
+    Returns the same frame for convenience.
+    """
+    for det in detections:
+        x, y, w, h = det["bbox"]
+        label = det["label"]
+        conf = det["confidence"]
+        det_type = det.get("type", "unknown")
+
+        # Get color for this body part
+        color = BODY_PART_COLORS.get(label, (0, 255, 0))
+
+        # Draw bounding box
+        cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
+
+        # Draw label with confidence
+        label_text = f"{label.replace('_', ' ').title()} {int(conf * 100)}%"
+        cv2.putText(frame, label_text, (x, y - 10),
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+
+        # Add type indicator
+        if mark_body_parts and det_type == "body_part":
+            cv2.circle(frame, (x + w - 5, y + 5), 3, (255, 255, 255), -1)
+
+    return frame
@@ -0,0 +1,299 @@
+"""
+Multi-process capture/inference pipeline.
+
+    capture process  --FrameRing (shared memory)-->  inference worker(s)
+                                                            |
+    GUI process  <------- results queue (small dicts) ------+
+
+Capture writes downscaled BGR frames into a FrameRing; inference workers map
+the same ring and run detection on the shared buffer directly. Only
+detections cross a queue, so the GUI never pickles frames and Qt painting in
+the GUI process does not compete with inference for the GIL. Processes are
+started with the 'spawn' method so they do not inherit Qt or torch state.
+
+Each process applies its stage's CPU set and nice value (see glfps.affinity)
+before doing anything else, and reports its scheduling jitter as "stats"
+messages every STATS_EVERY frames; the latest per stage is in stage_stats.
+Any process that fails sends an "error" message naming it, which
+get_result() raises in the consumer.
+
+Ring slots are sized from the source's geometry (the monitor, the pipe's
+frame size or the video's), downscaled to max_width; a frame that still
+does not fit, e.g. after a resolution change, is scaled down to fit.
+"""
+
+import multiprocessing
+import os
+import queue
+import time
+
+from glfps.affinity import StageMonitor, apply_stage
+from glfps.frame_ring import FrameRing
+
+STATS_EVERY = 100
+# Ring slot shape when the source's size cannot be known in advance (image folders, synthetic frames)
+DEFAULT_MAX_SHAPE = (2160, 1280, 3)
+
+
+def source_size(source, monitor_index=1, capture_options=None):
+    """(width, height) of the frames a capture source produces, or None if unknown before capturing."""
+    capture_options = capture_options or {}
+    if source is None or source == 'screen':
+        import mss
+        with mss.mss() as sct:
+            if not 0 <= monitor_index < len(sct.monitors):
+                return None
+            monitor = sct.monitors[monitor_index]
+        return monitor["width"], monitor["height"]
+    if source.startswith('pipe:'):
+        width, height = capture_options.get("width"), capture_options.get("height")
+        return (width, height) if width and height else None
+    if capture_options.get("resolution"):
+        return tuple(capture_options["resolution"])
+    if os.path.isfile(source):
+        import cv2
+        cap = cv2.VideoCapture(source)
+        try:
+            width, height = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        finally:
+            cap.release()
+        return (width, height) if width and height else None
+    return None
+
+
+def ring_shape(size, max_width):
+    """Slot shape for frames of size (width, height) after downscaling to max_width."""
+    width, height = size
+    if width > max_width:
+        width, height = max_width, int(height * max_width / width)
+    return height, width, 3
+
+
+def capture_main(ring_name, source, monitor_index, fps, max_width, stop_event, stage=None, results=None,
+                 capture_options=None):
+    """Capture process: grab frames, downscale and publish them into the ring."""
+    ring = None
+    try:
+        apply_stage("capture", stage)
+        import cv2
+        from glfps.screen_capture import create_capture
+
+        monitor_stage = StageMonitor("capture")
+        frames = 0
+        ring = FrameRing(ring_name, create=False)
+        options = dict(capture_options or {})
+        if source is not None and source != 'screen' and not source.startswith('pipe:'):
+            options.setdefault("loop", True)  # Only replays can loop
+        capture = create_capture(source, monitor_index=monitor_index, max_fps=fps.value,
+                                 replay_fps=fps.value, **options)
+        monitor = capture.get_monitor_info() or {}
+        monitor_offset = (monitor.get('left', 0), monitor.get('top', 0))
+        current_fps = fps.value
+        last_capture = None
+        while not stop_event.is_set():
+            if fps.value != current_fps:
+                current_fps = fps.value
+                capture.set_fps(current_fps)
+            frame = capture.get_frame()
+            if frame is None or capture.last_capture_time == last_capture:
+                # Not due yet (ScreenCapture returns its cached frame); wait for the next tick
+                monitor_stage.sleep_until(time.perf_counter() + 0.002)
+                continue
+            last_capture = capture.last_capture_time
+            monitor_stage.tick()
+            frames += 1
+            if results is not None and frames % STATS_EVERY == 0:
+                results.put({"type": "stats", "stage": "capture", "report": monitor_stage.report()})
+
+            height, width, channels = frame.shape
+            shape = ring_shape((width, height), max_width)[:2] + (channels,)
+            if shape[0] * shape[1] * channels > ring.slot_bytes:
+                # Bigger than the source looked when the ring was sized: shrink to fit the slot
+                scale = (ring.slot_bytes / (shape[0] * shape[1] * channels)) ** 0.5
+                shape = (int(shape[0] * scale), int(shape[1] * scale), channels)
+            slot, view = ring.begin_write(shape)
+            if shape[:2] != (height, width):
+                # Resize straight into the ring slot instead of via a temporary
+                cv2.resize(frame, (shape[1], shape[0]), dst=view)
+            else:
+                view[...] = frame
+            ring.end_write(slot, shape, timestamp_ns=time.time_ns(),
+                           original_size=(width, height), monitor_offset=monitor_offset)
+    except Exception as e:
+        if results is not None:
+            results.put({"type": "error", "process": "capture", "error": str(e)})
+    finally:
+        if ring is not None:
+            ring.close()
+
+
+def inference_main(ring_name, model_path, backend, worker_index, num_workers, threads,
+                   results, stop_event, stage=None):
+    """
+    Inference worker: run detection on the newest frame assigned to this
+    worker (frame_id % num_workers == worker_index) and publish the result.
+    """
+    # Before torch starts its thread pools, so they inherit the CPU set
+    apply_stage("inference", stage)
+    from glfps.service import pin_threads
+    pin_threads({"torch": threads})
+    from glfps.detection import DetectionEngine
+    from glfps.model_cache import warmup_engine
+
+    ring = None
+    last_id = -1
+    monitor_stage = StageMonitor(f"inference-{worker_index}")
+    processed = 0
+    try:
+        detector = DetectionEngine(model_path=model_path, backend=backend)
+        detector.verbose = False
+        warmup_engine(detector)
+        ring = FrameRing(ring_name, create=False)
+        results.put({"type": "ready", "worker": worker_index})
+
+        while not stop_event.is_set():
+            latest = ring.latest_id()
+            frame_id = latest - (latest - worker_index) % num_workers
+            if latest < 0 or frame_id <= last_id or frame_id < 0:
+                monitor_stage.sleep_until(time.perf_counter() + 0.001)
+                continue
+            ref = ring.read(frame_id)
+            if ref is None:
+                last_id = frame_id  # Already overwritten; move on to a newer frame
+                continue
+
+            monitor_stage.tick()
+            start = time.perf_counter()
+            detections = detector.detect(ref.frame)
+            elapsed = time.perf_counter() - start
+            last_id = frame_id
+            if not ring.is_valid(ref):
+                continue  # Capture lapped us mid-inference; the frame was torn
+            results.put({
+                "type": "result",
+                "worker": worker_index,
+                "frame_id": frame_id,
+                "timestamp_ns": ref.timestamp_ns,
+                "frame_size": (ref.frame.shape[1], ref.frame.shape[0]),
+                "original_size": ref.original_size,
+                "monitor_offset": ref.monitor_offset,
+                "inference_ms": elapsed * 1000,
+                "detections": detections,
+            })
+            del ref
+            processed += 1
+            if processed % STATS_EVERY == 0:
+                results.put({"type": "stats", "stage": monitor_stage.name, "report": monitor_stage.report()})
+    except Exception as e:
+        results.put({"type": "error", "process": f"inference-{worker_index}", "worker": worker_index,
+                     "error": str(e)})
+    finally:
+        if ring is not None:
+            ring.close()
+
+
+class ProcessPipeline:
+    """
+    Owns the frame ring, the capture process and the inference workers.
+    Consumers call get_result() and, for display, read_frame().
+    """
+    def __init__(self, model_path='yolov8n-pose.pt', backend='torch', source=None, monitor_index=1,
+                 max_fps=15, workers=1, threads_per_worker=None, slots=4, max_width=1280,
+                 max_shape=None, stages=None, capture_options=None):
+        self.model_path = model_path
+        self.backend = backend
+        self.source = source
+        self.monitor_index = monitor_index
+        self.workers = max(1, workers)
+        self.threads_per_worker = threads_per_worker
+        self.slots = max(slots, self.workers + 2)
+        self.max_width = max_width
+        self.max_shape = max_shape  # None: sized from the source (see source_size)
+        self.capture_options = capture_options or {}  # e.g. width/height/pix_fmt for 'pipe:' sources
+        self.stages = stages or {}  # {"capture": {"cpus": ..., "nice": ...}, "inference": {...}}
+        self.stage_stats = {}       # Latest StageMonitor report per stage
+        self.ctx = multiprocessing.get_context('spawn')
+        self.fps = self.ctx.Value('d', float(max_fps))
+        self.ring = None
+        self.processes = []
+        self.results = None
+        self.stop_event = None
+
+    def start(self, ready_timeout=300):
+        """Start all processes and wait until every worker has loaded its model."""
+        max_shape = self.max_shape
+        if max_shape is None:
+            try:
+                size = source_size(self.source, self.monitor_index, self.capture_options)
+            except Exception:
+                size = None  # The capture process reports the real problem, if there is one
+            max_shape = ring_shape(size, self.max_width) if size else DEFAULT_MAX_SHAPE
+        self.ring = FrameRing(slots=self.slots, max_shape=max_shape)
+        self.results = self.ctx.Queue()
+        self.stop_event = self.ctx.Event()
+        for index in range(self.workers):
+            self.processes.append(self.ctx.Process(
+                target=inference_main, name=f"glfps-inference-{index}", daemon=True,
+                args=(self.ring.name, self.model_path, self.backend, index, self.workers,
+                      self.threads_per_worker, self.results, self.stop_event,
+                      self.stages.get("inference"))))
+        self.processes.append(self.ctx.Process(
+            target=capture_main, name="glfps-capture", daemon=True,
+            args=(self.ring.name, self.source, self.monitor_index, self.fps, self.max_width,
+                  self.stop_event, self.stages.get("capture"), self.results, self.capture_options)))
+        for process in self.processes:
+            process.start()
+
+        ready = 0
+        deadline = time.monotonic() + ready_timeout
+        while ready < self.workers:
+            try:
+                message = self.results.get(timeout=max(0.1, deadline - time.monotonic()))
+            except queue.Empty:
+                self.stop()
+                raise TimeoutError("Inference workers did not become ready in time")
+            if message["type"] == "error":
+                self.stop()
+                raise RuntimeError(f"{message['process']} process failed: {message['error']}")
+            if message["type"] == "ready":
+                ready += 1
+            elif message["type"] == "stats":
+                self.stage_stats[message["stage"]] = message["report"]
+
+    def get_result(self, timeout=0.1):
+        """Next result dict from any worker, or None on timeout. Raises on capture or worker errors."""
+        try:
+            message = self.results.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        if message["type"] == "error":
+            raise RuntimeError(f"{message['process']} process failed: {message['error']}")
+        if message["type"] == "stats":
+            self.stage_stats[message["stage"]] = message["report"]
+        return message if message["type"] == "result" else None
+
+    def read_frame(self, frame_id=None):
+        """Copy of a frame from the ring (the newest if it has been overwritten), for display."""
+        ref = self.ring.read(frame_id, copy=True) if frame_id is not None else None
+        if ref is None:
+            ref = self.ring.read(copy=True)
+        return None if ref is None else ref.frame
+
+    def set_fps(self, fps):
+        self.fps.value = float(fps)
+
+    def is_alive(self):
+        return all(process.is_alive() for process in self.processes)
+
+    def stop(self, timeout=3.0):
+        if self.stop_event is not None:
+            self.stop_event.set()
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join(1.0)
+        self.processes = []
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
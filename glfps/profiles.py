@@ -0,0 +1,205 @@
+"""
+Per-machine performance profiles and saved GUI settings.
+
+A profile holds what makes one model run well on one machine: backend,
+inference threads, inference size and capture FPS. The first time a
+(machine, model) pair is seen, tune_profile() measures them with a short
+benchmark on synthetic frames; the result is stored under
+~/.config/glfps/profiles (or $GLFPS_CONFIG_DIR/profiles), keyed by a
+fingerprint of the machine and the model file's content hash, so later
+startups only read a small JSON file.
+
+    python -m glfps profile --model yolov8n-pose.pt            # show (tuning if needed)
+    python -m glfps profile --model yolov8n-pose.pt --retune
+"""
+
+import hashlib
+import importlib.util
+import json
+import os
+import platform
+import threading
+import time
+from typing import Optional
+
+PROFILE_VERSION = 1
+DEFAULT_PROFILE = {"backend": "torch", "threads": None, "imgsz": 640, "fps": 10}
+# Backends tried besides torch, when their runtime is installed (exports are made once, next to the model)
+BACKEND_MODULES = {"onnx": "onnxruntime", "openvino": "openvino"}
+INFERENCE_SIZES = (640, 512, 416, 320)
+
+_model_hashes = {}  # (path, size, mtime) -> model_hash()
+_model_hashes_lock = threading.Lock()
+
+
+def config_dir():
+    return os.environ.get("GLFPS_CONFIG_DIR") or os.path.join(os.path.expanduser("~"), ".config", "glfps")
+
+
+def settings_path():
+    """Where the GUI saves its settings."""
+    return os.path.join(config_dir(), "settings.json")
+
+
+def _cpu_model() -> str:
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor()
+
+
+def machine_fingerprint() -> str:
+    """Stable id of this machine's hardware and platform; changes when either does."""
+    parts = {
+        "node": platform.node(),
+        "system": platform.system(),
+        "machine": platform.machine(),
+        "cpu": _cpu_model(),
+        "cpus": os.cpu_count(),
+    }
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def model_hash(model_path) -> str:
+    """
+    Content hash of the model file (of its name for models ultralytics
+    downloads on first use), memoized by size and mtime: the GUI looks it up
+    on every model switch.
+    """
+    if not os.path.isfile(model_path):
+        return hashlib.sha256(os.path.basename(model_path).encode()).hexdigest()[:16]
+    stat = os.stat(model_path)
+    memo_key = (os.path.abspath(model_path), stat.st_size, stat.st_mtime_ns)
+    with _model_hashes_lock:
+        digest = _model_hashes.get(memo_key)
+    if digest is None:
+        hasher = hashlib.sha256()
+        with open(model_path, 'rb') as f:
+            for data in iter(lambda: f.read(1024 * 1024), b''):
+                hasher.update(data)
+        digest = hasher.hexdigest()[:16]
+        with _model_hashes_lock:
+            _model_hashes[memo_key] = digest
+    return digest
+
+
+def profile_path(model_path, directory=None):
+    directory = directory or os.path.join(config_dir(), "profiles")
+    return os.path.join(directory, f"{machine_fingerprint()}-{model_hash(model_path)}.json")
+
+
+def load_profile(model_path, directory=None) -> Optional[dict]:
+    """The stored profile for this machine and model, or None if it was never tuned."""
+    try:
+        with open(profile_path(model_path, directory)) as f:
+            profile = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return profile if profile.get("version") == PROFILE_VERSION else None
+
+
+def save_profile(model_path, profile, directory=None):
+    path = profile_path(model_path, directory)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(profile, f, indent=2)
+    os.replace(tmp, path)
+
+
+def available_backends():
+    return ["torch"] + [backend for backend, module in BACKEND_MODULES.items()
+                        if importlib.util.find_spec(module) is not None]
+
+
+def _latency(engine, frames, repeats=2) -> float:
+    """Median seconds per frame over repeats passes of frames."""
+    times = []
+    for _ in range(repeats):
+        for frame in frames:
+            start = time.perf_counter()
+            engine.detect(frame)
+            times.append(time.perf_counter() - start)
+    return sorted(times)[len(times) // 2]
+
+
+def tune_profile(model_path, frame_size=(1280, 720), target_fps=15, max_fps=30, backends=None,
+                 sizes=INFERENCE_SIZES, log=print) -> dict:
+    """
+    Measure this machine: the fastest backend and thread count at full
+    inference size, then the largest inference size that still sustains
+    target_fps, and a capture FPS with headroom for capture and drawing.
+    """
+    import torch
+    from glfps.detection import INFERENCE_ARGS, DetectionEngine
+    from glfps.model_cache import warmup_engine
+    from glfps.replay import synthetic_frames
+
+    frames = synthetic_frames(count=6, resolution=frame_size)
+    cpus = os.cpu_count() or 1
+    thread_options = sorted({t for t in (1, 2, 4, 8, cpus) if t <= cpus})
+    default_threads = torch.get_num_threads()
+    started = time.perf_counter()
+    best = None
+    for backend in backends or available_backends():
+        try:
+            engine = DetectionEngine(model_path=model_path, backend=backend)
+        except Exception as e:
+            log(f"   {backend}: skipped ({e})")
+            continue
+        engine.verbose = False
+        warmup_engine(engine, frame_size)
+        # Only torch-executed backends follow torch's thread setting
+        for threads in thread_options if backend in ("torch", "torchscript") else [None]:
+            torch.set_num_threads(threads or default_threads)
+            latency = _latency(engine, frames)
+            log(f"   {backend}, {threads or 'default'} threads: {latency * 1000:.1f} ms")
+            if best is None or latency < best[0]:
+                best = (latency, backend, threads, engine)
+    if best is None:
+        raise RuntimeError(f"No backend could load {model_path}")
+
+    latency, backend, threads, engine = best
+    torch.set_num_threads(threads or default_threads)
+    imgsz = INFERENCE_ARGS["imgsz"]
+    # Exported models (ONNX, OpenVINO, TorchScript) have a static input of the export size
+    swept = sorted(sizes, reverse=True) if backend == "torch" else []
+    if not swept:
+        log(f"   imgsz {imgsz}: fixed by the {backend} export")
+    for size in swept:
+        sized = engine.with_inference_args(imgsz=size)
+        warmup_engine(sized, frame_size)
+        latency = _latency(sized, frames)
+        log(f"   imgsz {size}: {latency * 1000:.1f} ms")
+        imgsz = size
+        if latency * target_fps <= 1.0:
+            break
+    profile = dict(
+        DEFAULT_PROFILE,
+        version=PROFILE_VERSION,
+        backend=backend,
+        threads=threads,
+        imgsz=imgsz,
+        # Leave a fifth of each frame interval for capture, drawing and the GUI
+        fps=max(1, min(max_fps, int(0.8 / latency))),
+        latency_ms=latency * 1000,
+        machine=machine_fingerprint(),
+        model=os.path.basename(model_path),
+        tuned_seconds=time.perf_counter() - started,
+        created=time.time(),
+    )
+    log(f"✅ Profile: {backend}, {threads or 'default'} threads, imgsz {imgsz}, {profile['fps']} FPS")
+    return profile
+
+
+def get_profile(model_path, retune=False, directory=None, **tune_args) -> dict:
+    """The stored profile for model_path, tuning and storing one first if needed."""
+    profile = None if retune else load_profile(model_path, directory)
+    if profile is None:
+        profile = tune_profile(model_path, **tune_args)
+        save_profile(model_path, profile, directory)
+    return profile
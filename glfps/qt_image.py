@@ -0,0 +1,15 @@
+import cv2
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage, QPixmap
+
+
+def frame_to_pixmap(frame, size):
+    """Convert a BGR frame to a QPixmap scaled to fit size, keeping aspect ratio."""
+    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    h, w, ch = rgb_frame.shape
+    bytes_per_line = ch * w
+    qt_image = QImage(rgb_frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
+
+    # scaled() returns a new image, so rgb_frame only needs to outlive this call
+    scaled_image = qt_image.scaled(size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    return QPixmap.fromImage(scaled_image)
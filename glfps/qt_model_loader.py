@@ -0,0 +1,28 @@
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from glfps.model_cache import get_model_cache
+
+
+class ModelLoader(QObject):
+    """
+    Loads models through the shared ModelCache on a background thread and
+    reports back on the Qt thread that owns this object, so widgets can swap
+    engines from a slot without freezing the UI.
+    """
+    model_loaded = pyqtSignal(str, object)  # model_path, DetectionEngine
+    model_failed = pyqtSignal(str, str)  # model_path, error message
+
+    def __init__(self, parent=None, cache=None):
+        super().__init__(parent)
+        self.cache = cache or get_model_cache()
+
+    def load(self, model_path, backend='torch'):
+        """Start loading model_path; emits model_loaded or model_failed when done."""
+        def on_done(engine, error):
+            # Signals emitted from the loader thread are queued to our thread
+            if error is not None:
+                self.model_failed.emit(model_path, str(error))
+            else:
+                self.model_loaded.emit(model_path, engine)
+
+        self.cache.load_async(model_path, backend, callback=on_done)
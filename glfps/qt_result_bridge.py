@@ -0,0 +1,28 @@
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from glfps.result_bus import ResultBus
+
+
+class ResultBridge(QObject):
+    """
+    Delivers the newest DetectionResult from a ResultBus to the Qt thread that
+    owns this object. Uses a 'latest' subscription, so if painting falls
+    behind, intermediate frames are skipped instead of piling up as queued
+    signals.
+    """
+    result_ready = pyqtSignal(object)  # DetectionResult
+    _wake = pyqtSignal()
+
+    def __init__(self, bus: ResultBus, parent=None, name='gui'):
+        super().__init__(parent)
+        self._wake.connect(self._deliver)
+        # Emitting from the publisher thread only posts an event to our thread
+        self.subscription = bus.subscribe(name, mode='latest', on_ready=self._wake.emit)
+
+    def _deliver(self):
+        result = self.subscription.poll()
+        if result is not None:
+            self.result_ready.emit(result)
+
+    def close(self):
+        self.subscription.close()
@@ -0,0 +1,148 @@
+import shlex
+import subprocess
+import sys
+import time
+from typing import Optional
+
+import cv2
+import numpy as np
+
+# bytes per pixel (as a fraction for planar YUV) and the cv2 conversion to BGR
+PIXEL_FORMATS = {
+    'bgr24': (3, None),
+    'rgb24': (3, cv2.COLOR_RGB2BGR),
+    'bgra': (4, cv2.COLOR_BGRA2BGR),
+    'bgr0': (4, cv2.COLOR_BGRA2BGR),
+    'rgba': (4, cv2.COLOR_RGBA2BGR),
+    'gray': (1, cv2.COLOR_GRAY2BGR),
+    'yuv420p': (1.5, cv2.COLOR_YUV2BGR_I420),
+    'nv12': (1.5, cv2.COLOR_YUV2BGR_NV12),
+}
+
+
+def ffmpeg_command(input_path, width, height, pix_fmt='bgr24', fps=None, ffmpeg='ffmpeg'):
+    """Build an ffmpeg command line that decodes input_path to raw frames on stdout."""
+    cmd = [ffmpeg, '-loglevel', 'error', '-nostdin', '-i', input_path,
+           '-vf', f'scale={width}:{height}', '-f', 'rawvideo', '-pix_fmt', pix_fmt]
+    if fps:
+        cmd += ['-r', str(fps)]
+    return cmd + ['-']
+
+
+class RawPipeCapture:
+    """
+    Drop-in replacement for ScreenCapture that reads a raw frame stream of a
+    declared size and pixel format from stdin ('-'), a named pipe or file, or
+    the stdout of a decoder command such as `ffmpeg -f rawvideo -`.
+
+    Frames are read with readinto() into a small pool of preallocated buffers
+    and wrapped with np.frombuffer, so steady state allocates nothing. A
+    frame returned by get_frame() stays valid for the next `buffers - 1`
+    calls; copy it if it must live longer.
+    """
+    def __init__(self, source='-', width=None, height=None, pix_fmt='bgr24', command=None,
+                 max_fps: Optional[float] = None, buffers: int = 4, clock=time.perf_counter):
+        if not width or not height:
+            raise ValueError("RawPipeCapture needs the frame width and height of the stream")
+        if pix_fmt not in PIXEL_FORMATS:
+            raise ValueError(f"Unsupported pixel format '{pix_fmt}', expected one of: {', '.join(PIXEL_FORMATS)}")
+        self.source = source
+        self.width = width
+        self.height = height
+        self.pix_fmt = pix_fmt
+        self.clock = clock
+        bytes_per_pixel, self.conversion = PIXEL_FORMATS[pix_fmt]
+        self.frame_bytes = int(width * height * bytes_per_pixel)
+        if bytes_per_pixel == 1.5:
+            self.raw_shape = (height * 3 // 2, width)
+        elif bytes_per_pixel == 1:
+            self.raw_shape = (height, width)
+        else:
+            self.raw_shape = (height, width, bytes_per_pixel)
+
+        self.process = None
+        if command is not None:
+            args = shlex.split(command) if isinstance(command, str) else list(command)
+            self.process = subprocess.Popen(args, stdout=subprocess.PIPE, bufsize=0)
+            self.stream = self.process.stdout
+        elif source == '-':
+            self.stream = open(sys.stdin.fileno(), 'rb', buffering=0, closefd=False)
+        else:
+            self.stream = open(source, 'rb', buffering=0)
+
+        self.raw_buffers = [bytearray(self.frame_bytes) for _ in range(max(1, buffers))]
+        self.raw_frames = [np.frombuffer(b, dtype=np.uint8).reshape(self.raw_shape) for b in self.raw_buffers]
+        # Converted formats get their own pool of BGR outputs
+        self.bgr_frames = None
+        if self.conversion is not None:
+            self.bgr_frames = [np.empty((height, width, 3), dtype=np.uint8) for _ in self.raw_buffers]
+        self.index = 0
+        self.eof = False
+        self.frame_count = 0
+        self.last_capture_time = 0
+        self.set_fps(max_fps)
+        self.monitor = {"left": 0, "top": 0, "width": width, "height": height}
+
+    def _read_into(self, buffer) -> bool:
+        """Fill buffer completely; False on end of stream."""
+        view = memoryview(buffer)
+        filled = 0
+        while filled < self.frame_bytes:
+            count = self.stream.readinto(view[filled:])
+            if not count:
+                return False
+            filled += count
+        return True
+
+    def get_frame(self) -> Optional[np.ndarray]:
+        """
+        Return the next frame as BGR, or None once the stream has ended.
+        When max_fps is set, waits until the next frame is due.
+        """
+        if self.eof:
+            return None
+        if self.frame_interval:
+            wait = self.last_capture_time + self.frame_interval - self.clock()
+            if wait > 0:
+                time.sleep(wait)
+
+        index = self.index
+        if not self._read_into(self.raw_buffers[index]):
+            self.eof = True
+            return None
+        self.index = (index + 1) % len(self.raw_buffers)
+
+        frame = self.raw_frames[index]
+        if self.conversion is not None:
+            frame = cv2.cvtColor(frame, self.conversion, dst=self.bgr_frames[index])
+        self.frame_count += 1
+        self.last_capture_time = self.clock()
+        return frame
+
+    def set_fps(self, fps):
+        """Pace reads; None or 0 reads as fast as the producer writes."""
+        self.max_fps = fps
+        self.frame_interval = 1.0 / fps if fps else 0
+
+    def set_monitor(self, monitor_index: int):
+        """Monitors do not apply to piped sources."""
+        pass
+
+    def get_available_monitors(self) -> list:
+        return [self.monitor]
+
+    def get_monitor_info(self) -> dict:
+        return self.monitor
+
+    def test_capture(self) -> bool:
+        return not self.eof
+
+    def close(self):
+        self.stream.close()  # stdin is opened with closefd=False, so this leaves fd 0 alone
+        if self.process is not None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+            self.process = None
@@ -0,0 +1,128 @@
+import os
+import time
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+class ReplayCapture:
+    """
+    Drop-in replacement for ScreenCapture that replays frames from a video
+    file, an image folder or in-memory arrays. Frames are decoded up front so
+    replay cost is just the per-frame copy a real capture would also pay.
+    """
+    def __init__(self, source=None, resolution: Optional[Tuple[int, int]] = None,
+                 max_fps: Optional[float] = None, loop: bool = True, max_frames: int = 300,
+                 clock=time.perf_counter):
+        self.source = source
+        self.resolution = resolution
+        self.loop = loop
+        self.clock = clock
+        self.frames = self._load_frames(source, max_frames)
+        if resolution is not None:
+            self.frames = [cv2.resize(f, resolution) for f in self.frames]
+        if not self.frames:
+            raise ValueError(f"No frames could be loaded from {source!r}")
+
+        self.position = 0
+        self.frame_count = 0
+        self.last_capture_time = 0
+        self.set_fps(max_fps)
+
+        height, width = self.frames[0].shape[:2]
+        self.monitor = {"left": 0, "top": 0, "width": width, "height": height}
+
+    def _load_frames(self, source, max_frames):
+        """Load frames from the given source into memory."""
+        if source is None:
+            return synthetic_frames(count=min(max_frames, 30))
+        if isinstance(source, np.ndarray):
+            return [source]
+        if isinstance(source, (list, tuple)):
+            return [np.ascontiguousarray(f) for f in source[:max_frames]]
+        if os.path.isdir(source):
+            names = sorted(n for n in os.listdir(source) if n.lower().endswith(IMAGE_EXTENSIONS))
+            frames = []
+            for name in names[:max_frames]:
+                frame = cv2.imread(os.path.join(source, name))
+                if frame is not None:
+                    frames.append(frame)
+            return frames
+
+        cap = cv2.VideoCapture(source)
+        frames = []
+        try:
+            while len(frames) < max_frames:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                frames.append(frame)
+        finally:
+            cap.release()
+        return frames
+
+    def get_frame(self) -> Optional[np.ndarray]:
+        """
+        Return the next replayed frame, or None when the source is exhausted.
+        When max_fps is set, waits until the next frame is due.
+        """
+        if self.position >= len(self.frames):
+            if not self.loop:
+                return None
+            self.position = 0
+
+        if self.frame_interval:
+            wait = self.last_capture_time + self.frame_interval - self.clock()
+            if wait > 0:
+                time.sleep(wait)
+
+        frame = self.frames[self.position].copy()
+        self.position += 1
+        self.frame_count += 1
+        self.last_capture_time = self.clock()
+        return frame
+
+    def set_fps(self, fps):
+        """Set replay pacing; None or 0 replays as fast as frames are requested."""
+        self.max_fps = fps
+        self.frame_interval = 1.0 / fps if fps else 0
+
+    def set_monitor(self, monitor_index: int):
+        """Monitors do not apply to replayed sources."""
+        pass
+
+    def get_available_monitors(self) -> list:
+        return [self.monitor]
+
+    def get_monitor_info(self) -> dict:
+        return self.monitor
+
+    def test_capture(self) -> bool:
+        return len(self.frames) > 0
+
+
+def synthetic_frames(count=30, resolution=(1280, 720), people=3, seed=0):
+    """
+    Generate deterministic BGR frames with person-like blobs on a noisy
+    background, for running the pipeline without any recorded media.
+    """
+    rng = np.random.default_rng(seed)
+    width, height = resolution
+    background = rng.integers(0, 80, size=(height, width, 3), dtype=np.uint8)
+    frames = []
+    for i in range(count):
+        frame = background.copy()
+        for p in range(people):
+            cx = int((p + 1) * width / (people + 1) + 20 * np.sin(i / 5 + p))
+            top = height // 4
+            # head, torso and legs
+            cv2.circle(frame, (cx, top), height // 20, (180, 190, 220), -1)
+            cv2.rectangle(frame, (cx - width // 40, top + height // 20),
+                          (cx + width // 40, top + height // 4), (60, 90, 160), -1)
+            cv2.rectangle(frame, (cx - width // 50, top + height // 4),
+                          (cx + width // 50, top + height // 2), (40, 40, 40), -1)
+        frames.append(frame)
+    return frames
@@ -0,0 +1,292 @@
+"""
+Multi-core inference with several engine replicas.
+
+One DetectionEngine stops scaling after about 8 intra-op threads, so on
+many-core hosts N replicas with T threads each get more done than a single
+engine with N x T threads. ReplicaPool runs every replica in a process of
+its own, pinned to its own CPU set (os.sched_setaffinity) with
+torch.set_num_threads(T) and one inter-op thread. All replicas take frames
+from one shared work queue, so a replica that finishes early starts on the
+next frame straight away.
+
+The best split depends on the model, the input size and the host.
+autotune() measures the candidates, by default on the path `batch --pin`
+runs (workers decoding their own chunks of a video), or on a ReplicaPool
+with --pool:
+
+    python -m glfps autotune --model yolov8n-pose.pt --size 1280x720
+    python -m glfps autotune --model yolov8n-pose.pt --input recording.mp4
+"""
+
+import multiprocessing
+import os
+import queue
+import tempfile
+import time
+from typing import List, Optional, Sequence, Tuple
+
+# How often blocked queue operations check that every replica process is still alive
+POLL_SECONDS = 1.0
+
+
+def available_cpus() -> List[int]:
+    """CPUs this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def partition_cpus(replicas, threads, cpus=None) -> List[List[int]]:
+    """
+    Split cpus into one set of `threads` CPUs per replica. Neighbouring CPU
+    numbers (usually sharing caches) go to the same replica; when there are
+    more replicas x threads than CPUs the sets wrap around and overlap.
+    """
+    cpus = list(cpus or available_cpus())
+    return [[cpus[(replica * threads + i) % len(cpus)] for i in range(threads)] for replica in range(replicas)]
+
+
+def candidate_splits(cpu_count) -> List[Tuple[int, int]]:
+    """(replicas, threads) pairs that use every CPU: threads of 1, 2, 4, ... up to all of them."""
+    splits = []
+    threads = 1
+    while threads <= cpu_count:
+        splits.append((cpu_count // threads, threads))
+        threads *= 2
+    if splits[-1][1] != cpu_count:
+        splits.append((1, cpu_count))
+    return splits
+
+
+def pin_process(cpus, threads):
+    """Restrict the current process to cpus and size its thread pools to match."""
+    if cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+    from glfps.service import pin_threads
+    pin_threads({"torch": threads, "interop": 1, "opencv": 1})
+
+
+def replica_main(index, model_path, backend, cpus, threads, jobs, results):
+    """Replica process: detect frames from the shared jobs queue until it gets None."""
+    try:
+        pin_process(cpus, threads)
+        from glfps.detection import DetectionEngine
+        from glfps.model_cache import warmup_engine
+        engine = DetectionEngine(model_path=model_path, backend=backend)
+        engine.verbose = False
+        warmup_engine(engine)
+        results.put({"type": "ready", "replica": index})
+        while True:
+            job = jobs.get()
+            if job is None:
+                break
+            job_id, frame = job
+            start = time.perf_counter()
+            detections = engine.detect(frame)
+            results.put({"type": "result", "replica": index, "job_id": job_id,
+                         "inference_ms": (time.perf_counter() - start) * 1000, "detections": detections})
+    except Exception as e:
+        results.put({"type": "error", "replica": index, "error": str(e)})
+
+
+class ReplicaPool:
+    """
+    N DetectionEngine replicas in worker processes with partitioned CPUs.
+    map() runs frames through all of them and yields results in order.
+    """
+    def __init__(self, model_path='yolov8n-pose.pt', backend='torch', replicas=None, threads=None,
+                 cpus=None, pin=True, queue_size=None):
+        cpus = list(cpus or available_cpus())
+        if threads is None:
+            threads = max(1, len(cpus) // replicas) if replicas else min(4, len(cpus))
+        self.replicas = replicas or max(1, len(cpus) // threads)
+        self.threads = threads
+        self.model_path = model_path
+        self.backend = backend
+        self.cpu_sets = partition_cpus(self.replicas, threads, cpus) if pin else [None] * self.replicas
+        self.ctx = multiprocessing.get_context('spawn')
+        # Two frames per replica: one running, one waiting, so no replica idles between frames
+        self.jobs = self.ctx.Queue(maxsize=queue_size or self.replicas * 2)
+        self.results = self.ctx.Queue()
+        self.processes = []
+        self.frames_done = [0] * self.replicas
+        self.inference_ms = [0.0] * self.replicas
+        self._next_job = 0
+
+    def start(self, ready_timeout=300):
+        """Start every replica and wait until all of them have loaded and warmed up their model."""
+        for index in range(self.replicas):
+            process = self.ctx.Process(
+                target=replica_main, name=f"glfps-replica-{index}", daemon=True,
+                args=(index, self.model_path, self.backend, self.cpu_sets[index], self.threads,
+                      self.jobs, self.results))
+            process.start()
+            self.processes.append(process)
+        ready = 0
+        deadline = time.monotonic() + ready_timeout
+        while ready < self.replicas:
+            try:
+                message = self.results.get(timeout=min(POLL_SECONDS, max(0.1, deadline - time.monotonic())))
+            except queue.Empty:
+                self._check_alive()
+                if time.monotonic() >= deadline:
+                    self.close()
+                    raise TimeoutError("Replicas did not become ready in time")
+                continue
+            if message["type"] == "error":
+                self.close()
+                raise RuntimeError(f"Replica {message['replica']} failed: {message['error']}")
+            ready += message["type"] == "ready"
+        return self
+
+    def _check_alive(self):
+        """Raise if a replica process died without reporting (OOM killer, segfault)."""
+        dead = [process for process in self.processes if not process.is_alive()]
+        if dead:
+            exits = ", ".join(f"{process.name} (exit code {process.exitcode})" for process in dead)
+            self.close()
+            raise RuntimeError(f"Replica process exited: {exits}")
+
+    def _put(self, job):
+        while True:
+            try:
+                self.jobs.put(job, timeout=POLL_SECONDS)
+                return
+            except queue.Full:
+                self._check_alive()
+
+    def _collect(self, timeout=None) -> dict:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = POLL_SECONDS if deadline is None else min(POLL_SECONDS, max(0.0, deadline - time.monotonic()))
+            try:
+                message = self.results.get(timeout=wait)
+                break
+            except queue.Empty:
+                self._check_alive()
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise
+        if message["type"] == "error":
+            raise RuntimeError(f"Replica {message['replica']} failed: {message['error']}")
+        self.frames_done[message["replica"]] += 1
+        self.inference_ms[message["replica"]] += message["inference_ms"]
+        return message
+
+    def map(self, frames):
+        """Detect every frame; yields detection lists in the order of frames."""
+        finished = {}
+        next_out = self._next_job
+        in_flight = 0
+        for frame in frames:
+            self._put((self._next_job, frame))
+            self._next_job += 1
+            in_flight += 1
+            # Keep the queue full but collect as we go, so memory stays bounded on long inputs
+            while in_flight > self.replicas * 2:
+                message = self._collect()
+                finished[message["job_id"]] = message["detections"]
+                in_flight -= 1
+                while next_out in finished:
+                    yield finished.pop(next_out)
+                    next_out += 1
+        while in_flight:
+            message = self._collect()
+            finished[message["job_id"]] = message["detections"]
+            in_flight -= 1
+            while next_out in finished:
+                yield finished.pop(next_out)
+                next_out += 1
+
+    def stats(self) -> dict:
+        return {
+            "replicas": self.replicas,
+            "threads": self.threads,
+            "cpu_sets": self.cpu_sets,
+            "frames": list(self.frames_done),
+            "mean_inference_ms": [ms / n if n else 0.0 for ms, n in zip(self.inference_ms, self.frames_done)],
+        }
+
+    def close(self, timeout=3.0):
+        for _ in self.processes:
+            try:
+                self.jobs.put(None, timeout=timeout)
+            except queue.Full:
+                break
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join(1.0)
+        self.processes = []
+
+    def __enter__(self):
+        return self.start() if not self.processes else self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _time_pool(model_path, backend, replicas, threads, cpus, frames) -> dict:
+    """Throughput of a ReplicaPool fed decoded frames through its work queue."""
+    with ReplicaPool(model_path, backend, replicas=replicas, threads=threads, cpus=cpus) as pool:
+        list(pool.map(frames[:replicas * 2]))  # Reach steady state before timing
+        start = time.perf_counter()
+        count = sum(1 for _ in pool.map(frames))
+        elapsed = time.perf_counter() - start
+        stats = pool.stats()
+    latencies = [ms for ms in stats["mean_inference_ms"] if ms]
+    return {"fps": count / elapsed if elapsed else 0.0,
+            "frame_ms": sum(latencies) / len(latencies) if latencies else 0.0}
+
+
+def _time_batch(model_path, backend, replicas, threads, cpus, input_path, frame_count, out_dir) -> dict:
+    """Throughput of run_batch with pinned workers, which decode their own chunks of input_path."""
+    from glfps.batch import run_batch
+    summary = run_batch([input_path], out_dir, model_path, backend, workers=replicas, threads_per_worker=threads,
+                        chunk_size=max(1, frame_count // (replicas * 2)), pin_cpus=True, cpus=cpus)
+    # Time inside the workers only: process start-up and model loading are not part of the steady state
+    per_worker = summary["per_worker_fps"]
+    return {"fps": per_worker * summary["workers"], "frame_ms": 1000 / per_worker if per_worker else 0.0,
+            "workers": summary["workers"]}
+
+
+def autotune(model_path='yolov8n-pose.pt', backend='torch', frame_size=(1280, 720), frames=256,
+             splits: Optional[Sequence[Tuple[int, int]]] = None, cpus=None, log=print,
+             input_path=None, mode='batch') -> List[dict]:
+    """
+    Measure throughput of each (replicas, threads) split. mode 'batch'
+    times what `batch --workers R --threads T --pin` runs (workers decoding
+    chunks of input_path, by default a synthetic video of frame_size);
+    'pool' times a ReplicaPool fed synthetic frames. Returns one result
+    dict per split, fastest first.
+    """
+    if mode not in ('batch', 'pool'):
+        raise ValueError(f"Unknown autotune mode '{mode}', expected batch or pool")
+    import cv2
+    from glfps.replay import synthetic_frames
+    cpus = list(cpus or available_cpus())
+    results = []
+    with tempfile.TemporaryDirectory(prefix="glfps-autotune-") as tmp:
+        frame_count = frames
+        if mode == 'pool':
+            inputs = synthetic_frames(count=frames, resolution=frame_size)
+        elif input_path is None:
+            input_path = os.path.join(tmp, "synthetic.mp4")
+            writer = cv2.VideoWriter(input_path, cv2.VideoWriter_fourcc(*'mp4v'), 30, tuple(frame_size))
+            for frame in synthetic_frames(count=frames, resolution=frame_size):
+                writer.write(frame)
+            writer.release()
+        else:
+            from glfps.batch import scan_input
+            frame_count = scan_input(input_path).frame_count
+        for replicas, threads in splits or candidate_splits(len(cpus)):
+            if mode == 'pool':
+                result = _time_pool(model_path, backend, replicas, threads, cpus, inputs)
+            else:
+                result = _time_batch(model_path, backend, replicas, threads, cpus, input_path, frame_count,
+                                     os.path.join(tmp, "out"))
+            result = dict(result, replicas=replicas, threads=threads)
+            log(f"{replicas:3d} replicas x {threads:2d} threads: {result['fps']:7.1f} FPS, "
+                f"{result['frame_ms']:6.1f} ms per frame")
+            results.append(result)
+    return sorted(results, key=lambda r: r["fps"], reverse=True)
@@ -0,0 +1,146 @@
+"""
+In-process publish/subscribe bus for detection results.
+
+The detection loop publishes one DetectionResult per frame. Each subscriber
+picks its delivery mode:
+
+- 'latest': holds only the newest result; unread results are replaced
+  (GUI display, mouse control).
+- 'queue': bounded FIFO; when full the oldest result is dropped
+  (recorders, sinks, metrics).
+
+publish() never blocks on a subscriber: delivery is an append under the
+subscription's own lock, and drops are counted instead of waiting.
+"""
+
+import threading
+from collections import deque
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+DELIVERY_MODES = ('latest', 'queue')
+
+
+class DetectionResult(NamedTuple):
+    """One frame's detections plus what consumers need to interpret them."""
+    frame_id: int
+    timestamp: float
+    detections: list
+    frame: Optional[np.ndarray] = None                  # Processed frame, shared: treat as read-only
+    frame_size: Optional[Tuple[int, int]] = None        # (width, height) detections refer to
+    original_size: Optional[Tuple[int, int]] = None     # (width, height) before downscaling
+    monitor_offset: Tuple[int, int] = (0, 0)            # Screen position of the captured area
+
+
+class Subscription:
+    """
+    A subscriber's mailbox. Read it with get() (blocking), poll() or drain().
+    on_ready, if given, is called on the publisher's thread whenever the
+    mailbox goes from empty to non-empty; it must return immediately (e.g.
+    emit a queued Qt signal or set an Event).
+    """
+    def __init__(self, bus, name, mode='latest', maxsize=16, on_ready: Optional[Callable[[], None]] = None):
+        if mode not in DELIVERY_MODES:
+            raise ValueError(f"Unknown delivery mode '{mode}', expected one of: {', '.join(DELIVERY_MODES)}")
+        self.bus = bus
+        self.name = name
+        self.mode = mode
+        self.on_ready = on_ready
+        self.delivered = 0
+        self.dropped = 0
+        self._items = deque(maxlen=1 if mode == 'latest' else max(1, maxsize))
+        self._cond = threading.Condition(threading.Lock())
+
+    def _offer(self, result):
+        with self._cond:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1  # Oldest unread result is discarded by the deque
+            was_empty = not self._items
+            self._items.append(result)
+            self.delivered += 1
+            self._cond.notify()
+        if was_empty and self.on_ready is not None:
+            self.on_ready()
+
+    def get(self, timeout=None) -> Optional[DetectionResult]:
+        """Wait for the next result; None on timeout."""
+        with self._cond:
+            if not self._items and not self._cond.wait_for(lambda: self._items, timeout):
+                return None
+            return self._items.popleft()
+
+    def poll(self) -> Optional[DetectionResult]:
+        """Next result if one is waiting, without blocking."""
+        with self._cond:
+            return self._items.popleft() if self._items else None
+
+    def drain(self) -> List[DetectionResult]:
+        """All waiting results, oldest first."""
+        with self._cond:
+            items = list(self._items)
+            self._items.clear()
+            return items
+
+    def pending(self) -> int:
+        return len(self._items)
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+
+class ResultBus:
+    """Fans DetectionResults out to any number of subscriptions."""
+    def __init__(self):
+        self._subscriptions = ()
+        self._lock = threading.Lock()
+        self.published = 0
+
+    def subscribe(self, name, mode='latest', maxsize=16, on_ready=None) -> Subscription:
+        subscription = Subscription(self, name, mode, maxsize, on_ready)
+        with self._lock:
+            # Copy-on-write so publish() can iterate without taking the lock
+            self._subscriptions = self._subscriptions + (subscription,)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions = tuple(s for s in self._subscriptions if s is not subscription)
+
+    def publish(self, result: DetectionResult):
+        if not isinstance(result, DetectionResult):
+            raise TypeError(f"ResultBus carries DetectionResult, got {type(result).__name__}")
+        self.published += 1
+        for subscription in self._subscriptions:
+            subscription._offer(result)
+
+    def stats(self) -> dict:
+        """Delivered/dropped/pending counts per subscriber."""
+        return {s.name: {"mode": s.mode, "delivered": s.delivered, "dropped": s.dropped,
+                         "pending": s.pending()}
+                for s in self._subscriptions}
+
+
+class ConsumerThread(threading.Thread):
+    """
+    Runs handler(result) for every result delivered to a subscription on a
+    thread of its own, so slow consumers such as sinks or recorders only
+    ever fall behind (and drop) rather than stall the publisher.
+    """
+    def __init__(self, subscription, handler, name=None):
+        super().__init__(daemon=True, name=name or f"consumer-{subscription.name}")
+        self.subscription = subscription
+        self.handler = handler
+        self.running = False
+
+    def run(self):
+        self.running = True
+        while self.running:
+            result = self.subscription.get(timeout=0.1)
+            if result is not None:
+                self.handler(result)
+
+    def stop(self, timeout=1.0):
+        self.running = False
+        self.join(timeout)
+        self.subscription.close()
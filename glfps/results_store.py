@@ -0,0 +1,346 @@
+"""
+Persistent columnar store for per-frame detections.
+
+A store is a directory:
+
+    meta.json        labels, fps, columns, and per-chunk offsets and zone maps
+    index.npy        int64[frames + 1]; rows of frame f are index[f]:index[f + 1]
+    timestamps.npy   float64[frames]; NaN for frames that were never written
+    <column>.bin     one file per column, written in chunks of whole frames
+
+Detection columns are frame (uint32), label (uint16, into meta labels),
+x, y, w, h (int32), confidence (float32), person (int32, -1 when the
+detection carries no "person_id") and interpolated (uint8). Chunks are
+either raw, in which case a column file is memory-mapped as a whole, or
+zlib-compressed per chunk and decompressed on demand through a small cache.
+
+index.npy and timestamps.npy are always raw and memory-mapped, so fetching
+one frame touches only the chunks holding its rows. Every chunk records the
+frame range it covers and, per label, its row count and best confidence;
+queries skip chunks that cannot match before reading any column data.
+"""
+
+import json
+import os
+import zlib
+from collections import OrderedDict
+from typing import List, Tuple
+
+import numpy as np
+
+from glfps.detection_codec import DEFAULT_LABELS
+
+COLUMNS = OrderedDict([
+    ("frame", np.uint32),
+    ("label", np.uint16),
+    ("x", np.int32),
+    ("y", np.int32),
+    ("w", np.int32),
+    ("h", np.int32),
+    ("confidence", np.float32),
+    ("person", np.int32),
+    ("interpolated", np.uint8),
+])
+COMPRESSIONS = (None, 'zlib')
+FORMAT_VERSION = 1
+
+
+class ResultStoreWriter:
+    """
+    Appends frames to a new store. Frames must arrive in increasing order;
+    skipped frame ids are recorded as having no detections. Implements the
+    sink interface (write/close), so it can stand in for a JsonlSink.
+    """
+    def __init__(self, path, labels=None, fps=None, chunk_rows=65536, compression='zlib', level=1):
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression '{compression}', expected None or 'zlib'")
+        os.makedirs(path, exist_ok=True)
+        if os.path.exists(os.path.join(path, "meta.json")):
+            os.remove(os.path.join(path, "meta.json"))  # Overwriting: incomplete until close()
+        self.path = path
+        self.fps = fps
+        self.chunk_rows = max(1, chunk_rows)
+        self.compression = compression
+        self.level = level
+        self.labels = list(labels or DEFAULT_LABELS)
+        self.label_ids = {label: i for i, label in enumerate(self.labels)}
+        self.offsets = [0]
+        self.timestamps = []
+        self.chunks = []
+        self.rows = 0
+        self._buffer = {name: [] for name in COLUMNS}
+        self._files = {name: open(os.path.join(path, f"{name}.bin"), 'wb') for name in COLUMNS}
+        self._file_sizes = dict.fromkeys(COLUMNS, 0)
+
+    def write(self, frame_id, timestamp, detections):
+        frame_count = len(self.timestamps)
+        if frame_id < frame_count:
+            raise ValueError(f"Frames must be written in order: got {frame_id} after {frame_count - 1}")
+        if frame_id > frame_count:
+            # Frames never written (e.g. skipped by a stride) have no rows
+            self.offsets.extend([self.offsets[-1]] * (frame_id - frame_count))
+            self.timestamps.extend([float('nan')] * (frame_id - frame_count))
+
+        buffer = self._buffer
+        for det in detections:
+            label_id = self.label_ids.get(det["label"])
+            if label_id is None:
+                label_id = self.label_ids[det["label"]] = len(self.labels)
+                self.labels.append(det["label"])
+            x, y, w, h = det["bbox"]
+            buffer["frame"].append(frame_id)
+            buffer["label"].append(label_id)
+            buffer["x"].append(x)
+            buffer["y"].append(y)
+            buffer["w"].append(w)
+            buffer["h"].append(h)
+            buffer["confidence"].append(det["confidence"])
+            buffer["person"].append(det.get("person_id", -1))
+            buffer["interpolated"].append(bool(det.get("interpolated", False)))
+        self.rows += len(detections)
+        self.offsets.append(self.rows)
+        self.timestamps.append(timestamp)
+        # Chunks end on frame boundaries so a frame's rows never span two chunks
+        if len(buffer["frame"]) >= self.chunk_rows:
+            self._flush_chunk()
+
+    def _flush_chunk(self):
+        buffer = self._buffer
+        count = len(buffer["frame"])
+        if not count:
+            return
+        arrays = {name: np.asarray(buffer[name], dtype=dtype) for name, dtype in COLUMNS.items()}
+        chunk = {
+            "rows": count,
+            "row_start": self.rows - count,
+            "frame_min": int(arrays["frame"][0]),
+            "frame_max": int(arrays["frame"][-1]),
+            "columns": {},
+            "labels": {},
+        }
+        for name, array in arrays.items():
+            data = array.tobytes()
+            if self.compression == 'zlib':
+                data = zlib.compress(data, self.level)
+            self._files[name].write(data)
+            chunk["columns"][name] = [self._file_sizes[name], len(data)]
+            self._file_sizes[name] += len(data)
+        # Zone map: per label, how many rows and the best confidence
+        order = np.argsort(arrays["label"], kind="stable")
+        labels, starts, counts = np.unique(arrays["label"][order], return_index=True, return_counts=True)
+        best = np.maximum.reduceat(arrays["confidence"][order], starts)
+        chunk["labels"] = {str(int(l)): [int(c), float(b)] for l, c, b in zip(labels, counts, best)}
+        self.chunks.append(chunk)
+        for values in buffer.values():
+            values.clear()
+
+    def close(self):
+        self._flush_chunk()
+        for f in self._files.values():
+            f.close()
+        np.save(os.path.join(self.path, "index.npy"), np.asarray(self.offsets, dtype=np.int64))
+        np.save(os.path.join(self.path, "timestamps.npy"), np.asarray(self.timestamps, dtype=np.float64))
+        meta = {
+            "version": FORMAT_VERSION,
+            "labels": self.labels,
+            "fps": self.fps,
+            "frames": len(self.timestamps),
+            "rows": self.rows,
+            "compression": self.compression,
+            "columns": {name: np.dtype(dtype).str for name, dtype in COLUMNS.items()},
+            "chunks": self.chunks,
+        }
+        # meta.json goes last and atomically: a store without it is incomplete
+        tmp = os.path.join(self.path, "meta.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(self.path, "meta.json"))
+
+
+class ResultStore:
+    """
+    Read-only view of a store. Column data is read lazily per chunk:
+    memory-mapped for raw stores, decompressed and cached (cache_chunks
+    chunk-columns) for compressed ones.
+    """
+    def __init__(self, path, cache_chunks=64):
+        self.path = path
+        meta_path = os.path.join(path, "meta.json")
+        if not os.path.exists(meta_path):
+            raise FileNotFoundError(f"{path} is not a complete results store (no meta.json)")
+        with open(meta_path) as f:
+            self.meta = json.load(f)
+        if self.meta["version"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported results store version {self.meta['version']}")
+        self.labels = self.meta["labels"]
+        self.label_ids = {label: i for i, label in enumerate(self.labels)}
+        self.fps = self.meta["fps"]
+        self.compression = self.meta["compression"]
+        self.dtypes = {name: np.dtype(dtype) for name, dtype in self.meta["columns"].items()}
+        self.chunks = self.meta["chunks"]
+        self.index = np.load(os.path.join(path, "index.npy"), mmap_mode='r')
+        self.timestamps = np.load(os.path.join(path, "timestamps.npy"), mmap_mode='r')
+        self.row_starts = np.array([c["row_start"] for c in self.chunks] + [self.meta["rows"]], dtype=np.int64)
+        self.chunk_frames = np.array([(c["frame_min"], c["frame_max"]) for c in self.chunks],
+                                     dtype=np.int64).reshape(-1, 2)
+        # Zone maps as (chunks, labels) arrays: rows per label, best confidence (-1 when absent)
+        self.label_counts = np.zeros((len(self.chunks), len(self.labels)), dtype=np.int64)
+        self.label_best = np.full((len(self.chunks), len(self.labels)), -1.0, dtype=np.float32)
+        for i, chunk in enumerate(self.chunks):
+            for label_id, (count, best) in chunk["labels"].items():
+                self.label_counts[i, int(label_id)] = count
+                self.label_best[i, int(label_id)] = best
+        self.cache_chunks = cache_chunks
+        self._cache = OrderedDict()
+        self._maps = {}
+        self._fds = {}
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def close(self):
+        for fd in self._fds.values():
+            os.close(fd)
+        self._fds.clear()
+        self._maps.clear()
+        self._cache.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _chunk_column(self, chunk_index, name) -> np.ndarray:
+        """One column of one chunk."""
+        if self.compression is None:
+            column = self._maps.get(name)
+            if column is None:
+                file_path = os.path.join(self.path, f"{name}.bin")
+                column = np.memmap(file_path, dtype=self.dtypes[name], mode='r') if os.path.getsize(file_path) \
+                    else np.empty(0, dtype=self.dtypes[name])
+                self._maps[name] = column
+            return column[self.row_starts[chunk_index]:self.row_starts[chunk_index + 1]]
+
+        key = (chunk_index, name)
+        array = self._cache.get(key)
+        if array is not None:
+            self._cache.move_to_end(key)
+            return array
+        fd = self._fds.get(name)
+        if fd is None:
+            fd = self._fds[name] = os.open(os.path.join(self.path, f"{name}.bin"), os.O_RDONLY)
+        offset, size = self.chunks[chunk_index]["columns"][name]
+        array = np.frombuffer(zlib.decompress(os.pread(fd, size, offset)), dtype=self.dtypes[name])
+        self._cache[key] = array
+        if len(self._cache) > self.cache_chunks:
+            self._cache.popitem(last=False)
+        return array
+
+    def rows(self, start, stop, columns=None) -> dict:
+        """Columns for rows start..stop-1 as arrays, keyed by column name."""
+        columns = columns or list(self.dtypes)
+        if stop <= start:
+            return {name: np.empty(0, dtype=self.dtypes[name]) for name in columns}
+        first = int(np.searchsorted(self.row_starts, start, side='right')) - 1
+        last = int(np.searchsorted(self.row_starts, stop - 1, side='right')) - 1
+        result = {}
+        for name in columns:
+            parts = [self._chunk_column(i, name) for i in range(first, last + 1)]
+            data = parts[0] if len(parts) == 1 else np.concatenate(parts)
+            offset = start - self.row_starts[first]
+            result[name] = data[offset:offset + stop - start]
+        return result
+
+    def frame(self, frame_id) -> List[dict]:
+        """Detections for one frame, as the detection dicts they were written from."""
+        if not 0 <= frame_id < len(self):
+            return []
+        rows = self.rows(int(self.index[frame_id]), int(self.index[frame_id + 1]))
+        detections = []
+        for i in range(len(rows["frame"])):
+            label = self.labels[rows["label"][i]]
+            det = {
+                "bbox": [int(rows["x"][i]), int(rows["y"][i]), int(rows["w"][i]), int(rows["h"][i])],
+                "label": label,
+                "confidence": float(rows["confidence"][i]),
+                "type": "person" if label == "person" else "body_part",
+            }
+            if rows["person"][i] >= 0:
+                det["person_id"] = int(rows["person"][i])
+            if rows["interpolated"][i]:
+                det["interpolated"] = True
+            detections.append(det)
+        return detections
+
+    def timestamp(self, frame_id) -> float:
+        return float(self.timestamps[frame_id])
+
+    def frame_at(self, timestamp) -> int:
+        """Index of the last written frame at or before timestamp."""
+        written = ~np.isnan(self.timestamps)
+        frames = np.flatnonzero(written)
+        if not len(frames):
+            return 0
+        position = np.searchsorted(self.timestamps[frames], timestamp, side='right') - 1
+        return int(frames[max(0, position)])
+
+    def _candidate_chunks(self, label_id, min_count, min_confidence, start, end) -> np.ndarray:
+        mask = (self.label_best[:, label_id] >= min_confidence) if label_id < self.label_best.shape[1] \
+            else np.zeros(len(self.chunks), dtype=bool)
+        if min_count > 1:
+            # A chunk without min_count rows of the label can still not hold a matching frame
+            mask &= self.label_counts[:, label_id] >= min_count
+        if start is not None:
+            mask &= self.chunk_frames[:, 1] >= start
+        if end is not None:
+            mask &= self.chunk_frames[:, 0] < end
+        return np.flatnonzero(mask)
+
+    def frames_with(self, label, min_count=1, min_confidence=0.0, start=None, end=None) -> np.ndarray:
+        """
+        Frame ids (ascending) with at least min_count detections of label at
+        or above min_confidence, optionally limited to frames start..end-1.
+        """
+        label_id = self.label_ids.get(label)
+        if label_id is None:
+            return np.empty(0, dtype=np.int64)
+        matches = []
+        for chunk_index in self._candidate_chunks(label_id, min_count, min_confidence, start, end):
+            frames = self._chunk_column(chunk_index, "frame")
+            hit = (self._chunk_column(chunk_index, "label") == label_id) \
+                & (self._chunk_column(chunk_index, "confidence") >= min_confidence)
+            if start is not None:
+                hit &= frames >= start
+            if end is not None:
+                hit &= frames < end
+            frame_ids, counts = np.unique(frames[hit], return_counts=True)
+            matches.append(frame_ids[counts >= min_count])
+        return np.concatenate(matches).astype(np.int64) if matches else np.empty(0, dtype=np.int64)
+
+    def time_ranges(self, label, min_count=1, min_confidence=0.0, max_gap=1) -> List[Tuple[float, float]]:
+        """
+        (start, end) timestamps of runs of frames matching frames_with(),
+        where consecutive matches at most max_gap frames apart form one run.
+        """
+        frames = self.frames_with(label, min_count, min_confidence)
+        if not len(frames):
+            return []
+        breaks = np.flatnonzero(np.diff(frames) > max_gap)
+        starts = np.concatenate(([frames[0]], frames[breaks + 1]))
+        ends = np.concatenate((frames[breaks], [frames[-1]]))
+        return [(self.timestamp(s), self.timestamp(e)) for s, e in zip(starts, ends)]
+
+    def count(self, label, min_confidence=0.0) -> int:
+        """Detections of label at or above min_confidence across the store."""
+        label_id = self.label_ids.get(label)
+        if label_id is None:
+            return 0
+        if min_confidence <= 0:
+            return int(self.label_counts[:, label_id].sum())
+        total = 0
+        for chunk_index in self._candidate_chunks(label_id, 1, min_confidence, None, None):
+            hit = (self._chunk_column(chunk_index, "label") == label_id) \
+                & (self._chunk_column(chunk_index, "confidence") >= min_confidence)
+            total += int(hit.sum())
+        return total
@@ -0,0 +1,134 @@
+"""
+Sparse detection over video: run the model on key frames only and fill in
+the frames between them.
+
+Key frames are either every `stride`-th frame, or (adaptive) frames whose
+content differs from the last key frame by more than a threshold, with
+`stride` as the longest allowed gap. Detections on consecutive key frames
+are associated by label and IoU, and the frames in between get linearly
+interpolated boxes, marked with "interpolated": True. Body parts are boxes
+like any other detection, so they are interpolated the same way.
+"""
+
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+def iou(a, b) -> float:
+    """Intersection over union of two [x, y, w, h] boxes."""
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    iw = min(ax + aw, bx + bw) - max(ax, bx)
+    ih = min(ay + ah, by + bh) - max(ay, by)
+    if iw <= 0 or ih <= 0:
+        return 0.0
+    inter = iw * ih
+    return inter / float(aw * ah + bw * bh - inter)
+
+
+def associate(previous, current, min_iou=0.3) -> List[Tuple[int, int]]:
+    """
+    Greedily match detections with the same label, highest IoU first.
+    Returns (index in previous, index in current) pairs.
+    """
+    candidates = []
+    for i, a in enumerate(previous):
+        for j, b in enumerate(current):
+            if a["label"] == b["label"]:
+                overlap = iou(a["bbox"], b["bbox"])
+                if overlap >= min_iou:
+                    candidates.append((overlap, i, j))
+    candidates.sort(reverse=True)
+    used_previous, used_current, pairs = set(), set(), []
+    for _, i, j in candidates:
+        if i not in used_previous and j not in used_current:
+            used_previous.add(i)
+            used_current.add(j)
+            pairs.append((i, j))
+    return pairs
+
+
+def _lerp_detection(a, b, t):
+    det = dict(a)
+    det["bbox"] = [int(round(p + (q - p) * t)) for p, q in zip(a["bbox"], b["bbox"])]
+    det["confidence"] = a["confidence"] + (b["confidence"] - a["confidence"]) * t
+    det["interpolated"] = True
+    return det
+
+
+def hold(detections) -> list:
+    """Copies of detections carried over unchanged to a frame that was not run."""
+    return [dict(det, interpolated=True) for det in detections]
+
+
+def interpolate_gap(start_index, start_detections, end_index, end_detections,
+                    min_iou=0.3) -> Iterator[Tuple[int, list]]:
+    """
+    Yield (frame_index, detections) for every frame strictly between two key
+    frames. Matched detections move linearly; unmatched ones are held from
+    the nearer key frame.
+    """
+    pairs = associate(start_detections, end_detections, min_iou)
+    matched_start = {i for i, _ in pairs}
+    matched_end = {j for _, j in pairs}
+    only_start = [d for i, d in enumerate(start_detections) if i not in matched_start]
+    only_end = [d for j, d in enumerate(end_detections) if j not in matched_end]
+    span = end_index - start_index
+    for index in range(start_index + 1, end_index):
+        t = (index - start_index) / span
+        detections = [_lerp_detection(start_detections[i], end_detections[j], t) for i, j in pairs]
+        detections += hold(only_start if t < 0.5 else only_end)
+        yield index, detections
+
+
+class SceneChangeDetector:
+    """
+    Flags frames whose content differs from the last key frame: the mean
+    absolute difference of 64x36 grayscale thumbnails, as a fraction of
+    full scale, above threshold.
+    """
+    def __init__(self, threshold=0.08, size=(64, 36)):
+        self.threshold = threshold
+        self.size = size
+        self.reference = None
+
+    def signature(self, frame) -> np.ndarray:
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        return cv2.resize(gray, self.size, interpolation=cv2.INTER_AREA).astype(np.float32)
+
+    def difference(self, frame) -> float:
+        if self.reference is None:
+            return 1.0
+        return float(np.abs(self.signature(frame) - self.reference).mean()) / 255.0
+
+    def set_reference(self, frame):
+        self.reference = self.signature(frame)
+
+    def reset(self):
+        self.reference = None
+
+
+def select_key_frames(frames: Iterable[Tuple[int, np.ndarray]], stride=4,
+                      scene_threshold: Optional[float] = None) -> Iterator[Tuple[int, np.ndarray, bool]]:
+    """
+    Yield (frame_index, frame, is_key) for a run of frames. The first frame
+    is always a key frame, then every stride-th frame, or with
+    scene_threshold set, any frame that changed enough since the last key
+    frame and at most stride frames after it.
+    """
+    scenes = SceneChangeDetector(scene_threshold) if scene_threshold is not None else None
+    last_key = None
+    for index, frame in frames:
+        if last_key is None or index - last_key >= stride:
+            is_key = True
+        elif scenes is not None:
+            is_key = scenes.difference(frame) > scenes.threshold
+        else:
+            is_key = False
+        if is_key:
+            last_key = index
+            if scenes is not None:
+                scenes.set_reference(frame)
+        yield index, frame, is_key
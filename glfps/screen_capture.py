@@ -126,12 +126,7 @@ class ScreenCapture:
         """Capture using mss library (optimized)."""
         try:
             sct_img = self.sct.grab(self.monitor)
-            frame = np.array(sct_img)
-            if frame.size == 0:
-                return None
-            # Convert BGRA to BGR
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
-            return frame
+            return bgra_to_bgr(sct_img)
         except Exception as e:
             print(f"mss capture error: {e}")
             return None
@@ -174,11 +169,7 @@ class ScreenCapture:
         if self.use_mss:
             try:
                 sct_img = self.sct.grab(self.monitor)
-                frame = np.array(sct_img)
-                if frame.size == 0:
-                    return None
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
-                return frame
+                return bgra_to_bgr(sct_img)
             except Exception as e:
                 print(f"Standard capture error: {e}")
         
@@ -217,4 +208,47 @@ class ScreenCapture:
     def test_capture(self) -> bool:
         """Test if screen capture is working."""
         frame = self.get_frame()
-        return frame is not None and frame.size > 0 
\ No newline at end of file
+        return frame is not None and frame.size > 0 
+
+def bgra_to_bgr(sct_img) -> Optional[np.ndarray]:
+    """
+    Convert a raw BGRA screenshot (mss image or array) to a BGR frame.
+    Returns None for empty captures.
+    """
+    frame = np.asarray(sct_img)
+    if frame.size == 0:
+        return None
+    return cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
+
+
+def downscale_frame(frame: np.ndarray, max_width: int = 1280) -> np.ndarray:
+    """
+    Resize a frame for faster processing if it is wider than max_width.
+    Returns the original frame unchanged when no resize is needed.
+    """
+    height, width = frame.shape[:2]
+    if width > max_width:
+        scale = max_width / width
+        new_width = int(width * scale)
+        new_height = int(height * scale)
+        frame = cv2.resize(frame, (new_width, new_height))
+    return frame
+
+
+def create_capture(source=None, monitor_index=1, max_fps=15, replay_fps=None, **replay_options):
+    """
+    Create a frame source. With no source this is a ScreenCapture (mss is only
+    imported here, when capture actually starts). 'pipe:PATH' reads raw
+    frames from a FIFO, file or stdin ('pipe:-') through RawPipeCapture, which
+    needs width, height and optionally pix_fmt in replay_options. Anything
+    else is a video file or image folder replayed through ReplayCapture;
+    'synthetic' replays generated frames. Sources other than the screen are
+    paced at replay_fps if given.
+    """
+    if source is None or source == 'screen':
+        return ScreenCapture(monitor_index=monitor_index, max_fps=max_fps)
+    if source.startswith('pipe:'):
+        from glfps.raw_pipe import RawPipeCapture
+        return RawPipeCapture(source[len('pipe:'):], max_fps=replay_fps, **replay_options)
+    from glfps.replay import ReplayCapture
+    return ReplayCapture(None if source == 'synthetic' else source, max_fps=replay_fps, **replay_options)
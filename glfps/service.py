@@ -0,0 +1,242 @@
+"""
+Headless detection service.
+
+Runs ScreenCapture (or a replayed source) through DetectionEngine and writes
+results to configurable sinks, without importing Qt. Start it with
+
+    python -m glfps run --config service.yaml
+"""
+
+import copy
+import json
+import os
+import signal
+import sys
+import time
+
+from glfps.affinity import StageMonitor, apply_stage, format_report
+from glfps.detection import filter_detections
+from glfps.screen_capture import create_capture, downscale_frame
+from glfps.sinks import create_sink
+
+DEFAULT_CONFIG = {
+    "source": {
+        "type": "screen",       # screen | replay | pipe
+        "path": None,           # replay: video file or image folder; pipe: FIFO/file, '-' for stdin
+        "monitor": 1,
+        "fps": 10,              # screen capture rate limit
+        "replay_fps": None,     # pace replayed/piped frames (None = as fast as possible)
+        "loop": False,
+        "width": None,          # pipe: raw frame size and pixel format
+        "height": None,
+        "pix_fmt": "bgr24",
+        "command": None,        # pipe: decoder command to spawn instead of reading path
+    },
+    "model": {
+        "path": "yolov8n-pose.pt",
+        "backend": "torch",
+    },
+    "threads": {
+        "torch": None,          # intra-op threads (None = library default)
+        "interop": None,        # inter-op threads
+        "opencv": None,
+    },
+    "stages": {                 # CPU set ("0-3,8") and nice value per stage, see glfps.affinity
+        "capture": {"cpus": None, "nice": None},
+        "inference": {"cpus": None, "nice": None},
+        "render": {"cpus": None, "nice": None},
+    },
+    "detection": {
+        "mode": "All Body Parts",
+        "target_parts": None,
+        "max_width": 1280,
+    },
+    "sinks": [{"type": "stdout"}],
+    "run": {
+        "max_frames": None,
+        "duration": None,       # seconds
+        "stats_every": 100,     # frames between status lines (0 = off)
+    },
+}
+
+
+def log(message):
+    """Status output goes to stderr so stdout can carry results."""
+    print(message, file=sys.stderr, flush=True)
+
+
+def merge_config(base, override):
+    """Recursively merge override into a copy of base."""
+    merged = copy.deepcopy(base)
+    for key, value in (override or {}).items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_config(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def load_config(path=None, overrides=None):
+    """Load a JSON or YAML config file and merge it over DEFAULT_CONFIG."""
+    config = {}
+    if path:
+        with open(path) as f:
+            if path.endswith(('.yaml', '.yml')):
+                import yaml
+                config = yaml.safe_load(f) or {}
+            else:
+                config = json.load(f)
+    config = merge_config(DEFAULT_CONFIG, config)
+    return merge_config(config, overrides)
+
+
+def pin_threads(threads):
+    """
+    Fix the thread pool sizes used by inference. Environment variables are set
+    before torch is imported so OpenMP/MKL pick them up as well.
+    """
+    count = threads.get("torch")
+    if count:
+        for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+            os.environ.setdefault(var, str(count))
+    if count or threads.get("interop"):
+        import torch
+        if count:
+            torch.set_num_threads(count)
+        if threads.get("interop"):
+            try:
+                torch.set_num_interop_threads(threads["interop"])
+            except RuntimeError as e:
+                # Only allowed before any inter-op work has started
+                log(f"⚠️ Could not set inter-op threads: {e}")
+    if threads.get("opencv") is not None:
+        import cv2
+        cv2.setNumThreads(threads["opencv"])
+
+
+class DetectionService:
+    """
+    Capture -> detect -> sinks loop for machines without Qt or a display.
+    """
+    def __init__(self, config):
+        self.config = config
+        self.running = False
+        self.frame_id = 0
+        self.capture = None
+        self.detector = None
+        self.sinks = []
+        self.monitor = StageMonitor("inference")
+
+    def setup(self):
+        config = self.config
+        # Capture and inference share this loop, so it runs as the inference stage
+        applied = apply_stage("inference", config["stages"]["inference"])
+        if applied:
+            log(f"Pinned inference stage: {applied}")
+        pin_threads(config["threads"])
+
+        source = config["source"]
+        if source["type"] == "replay":
+            self.capture = create_capture(source["path"], replay_fps=source.get("replay_fps"),
+                                          loop=source.get("loop", False))
+        elif source["type"] == "pipe":
+            self.capture = create_capture("pipe:" + (source.get("path") or "-"),
+                                          replay_fps=source.get("replay_fps"),
+                                          width=source["width"], height=source["height"],
+                                          pix_fmt=source.get("pix_fmt", "bgr24"),
+                                          command=source.get("command"))
+        else:
+            self.capture = create_capture(None, monitor_index=source["monitor"], max_fps=source["fps"])
+
+        from glfps.detection import DetectionEngine
+        model = config["model"]
+        log(f"Loading model {model['path']} ({model['backend']})...")
+        self.detector = DetectionEngine(model_path=model["path"], backend=model["backend"])
+        self.detector.verbose = False  # Keep stdout for results
+
+        self.sinks = [create_sink(spec) for spec in config["sinks"]]
+
+    def process_frame(self, frame):
+        """Run detection on one frame and publish the result to every sink."""
+        detection = self.config["detection"]
+        processed = downscale_frame(frame, max_width=detection["max_width"])
+        detections = filter_detections(self.detector.detect(processed),
+                                       detection["mode"], detection["target_parts"])
+        timestamp = time.time()
+        for sink in self.sinks:
+            sink.write(self.frame_id, timestamp, detections)
+        self.frame_id += 1
+        return detections
+
+    def run(self):
+        """Run until stopped, the source is exhausted or a run limit is reached."""
+        if self.detector is None:
+            self.setup()
+        limits = self.config["run"]
+        max_frames = limits.get("max_frames")
+        deadline = time.monotonic() + limits["duration"] if limits.get("duration") else None
+        stats_every = limits.get("stats_every") or 0
+
+        self.running = True
+        start = time.perf_counter()
+        last_capture = None
+        log("✅ Detection service running")
+        try:
+            is_screen = self.config["source"]["type"] == "screen"
+            while self.running:
+                if is_screen:
+                    # Sleep until the next capture is due instead of spinning on cached frames
+                    wait = self.capture.last_capture_time + self.capture.frame_interval - time.time()
+                    if wait > 0:
+                        self.monitor.sleep_until(time.perf_counter() + wait)
+                frame = self.capture.get_frame()
+                if frame is None:
+                    if not is_screen:
+                        break  # Replay or pipe exhausted
+                    continue
+                # ScreenCapture may still hand back a cached copy; skip duplicates
+                if is_screen and self.capture.last_capture_time == last_capture:
+                    time.sleep(0.001)
+                    continue
+                last_capture = self.capture.last_capture_time
+
+                self.monitor.tick()
+                self.process_frame(frame)
+
+                if stats_every and self.frame_id % stats_every == 0:
+                    elapsed = time.perf_counter() - start
+                    log(f"   {self.frame_id} frames, {self.frame_id / elapsed:.1f} FPS; "
+                        f"{format_report(self.monitor.report())}")
+                if max_frames and self.frame_id >= max_frames:
+                    break
+                if deadline and time.monotonic() >= deadline:
+                    break
+        finally:
+            self.close()
+        return self.frame_id
+
+    def stop(self):
+        self.running = False
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+        self.sinks = []
+        if hasattr(self.capture, "close"):
+            self.capture.close()
+
+
+def run_service(config_path=None, overrides=None):
+    """Entry point for `python -m glfps run`."""
+    config = load_config(config_path, overrides)
+    service = DetectionService(config)
+
+    def handle_signal(signum, frame):
+        log("🛑 Stopping detection service...")
+        service.stop()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+    frames = service.run()
+    log(f"✅ Processed {frames} frames")
+    return 0
@@ -0,0 +1,19 @@
+from multiprocessing import shared_memory
+
+
+def attach_shared_memory(name):
+    """
+    Attach to a shared memory segment created by another process without
+    taking ownership of it. By default Python's resource tracker would unlink
+    the segment when *this* process exits, pulling it out from under its owner.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+        return shm
@@ -0,0 +1,270 @@
+import errno
+import json
+import os
+import socket
+import stat
+import sys
+
+from glfps.detection_codec import create_encoder
+
+
+class Sink:
+    """
+    Destination for per-frame detection results. Subclasses implement write();
+    sinks must never block the detection loop for long.
+    """
+    def write(self, frame_id, timestamp, detections):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class JsonlSink(Sink):
+    """Writes one JSON object per frame to a file, or to stdout when path is '-'."""
+    def __init__(self, path='-', flush_every=1):
+        self.path = path
+        self.flush_every = max(1, flush_every)
+        self.count = 0
+        self.stream = sys.stdout if path == '-' else open(path, 'a', buffering=1024 * 1024)
+
+    def write(self, frame_id, timestamp, detections):
+        record = {"frame_id": frame_id, "timestamp": timestamp, "detections": detections}
+        self.stream.write(json.dumps(record) + "\n")
+        self.count += 1
+        if self.count % self.flush_every == 0:
+            self.stream.flush()
+
+    def close(self):
+        self.stream.flush()
+        if self.stream is not sys.stdout:
+            self.stream.close()
+
+
+class NullSink(Sink):
+    """Discards results; useful for benchmarking the pipeline itself."""
+    def write(self, frame_id, timestamp, detections):
+        pass
+
+
+class _Peer:
+    """
+    One non-blocking reader connection with its own bounded backlog. Whole
+    records are queued or dropped, so a reader never sees a partial record.
+    A dropped record may have carried a label table update, so the next
+    record delivered after a drop is preceded by the full stream header.
+    """
+    def __init__(self, write, close, header, max_pending):
+        self._write = write
+        self._close = close
+        self.header = header
+        self.pending = bytearray(header())
+        self.max_pending = max_pending
+        self.dropped = 0
+        self.stale = False
+        self.closed = False
+
+    def send(self, data):
+        """Queue data and flush what the OS accepts. Returns False if data was dropped."""
+        if self.stale:
+            data = self.header() + data
+        delivered = len(self.pending) + len(data) <= self.max_pending
+        if delivered:
+            self.pending += data
+            self.stale = False
+        else:
+            self.dropped += 1
+            self.stale = True
+        self.flush()
+        return delivered and not self.closed
+
+    def flush(self):
+        while self.pending and not self.closed:
+            try:
+                written = self._write(self.pending)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                self.close()  # Reader went away (EPIPE, ECONNRESET)
+                return
+            del self.pending[:written]
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self._close()
+
+
+class FileTransport:
+    """Appends records to a regular file (or stdout for '-')."""
+    def __init__(self, path, flush_every=1):
+        self.path = path
+        self.flush_every = max(1, flush_every)
+        self.count = 0
+        self.stream = sys.stdout.buffer if path == '-' else open(path, 'ab', buffering=1024 * 1024)
+        self.started = False
+
+    def connect(self, header):
+        if not self.started:
+            self.stream.write(header())
+            self.started = True
+        return True
+
+    def send(self, data):
+        self.stream.write(data)
+        self.count += 1
+        if self.count % self.flush_every == 0:
+            self.stream.flush()
+        return True
+
+    def close(self):
+        self.stream.flush()
+        if self.stream is not sys.stdout.buffer:
+            self.stream.close()
+
+
+class FifoTransport:
+    """
+    Writes to a named pipe, creating it if needed. Opened non-blocking, so
+    with no reader attached records are dropped instead of stalling; a
+    reader that attaches later starts with a fresh stream header.
+    """
+    def __init__(self, path, max_pending=1024 * 1024):
+        self.path = path
+        self.max_pending = max_pending
+        if not os.path.exists(path):
+            os.mkfifo(path)
+        elif not stat.S_ISFIFO(os.stat(path).st_mode):
+            raise ValueError(f"{path} exists and is not a named pipe")
+        self.peer = None
+
+    def _open(self, header):
+        try:
+            fd = os.open(self.path, os.O_WRONLY | os.O_NONBLOCK)
+        except OSError as e:
+            if e.errno == errno.ENXIO:
+                return None  # No reader yet
+            raise
+        return _Peer(lambda data: os.write(fd, data), lambda: os.close(fd), header, self.max_pending)
+
+    def connect(self, header):
+        """Attach to a reader if there is none; True when one is connected."""
+        if self.peer is None or self.peer.closed:
+            self.peer = self._open(header)
+        return self.peer is not None
+
+    def send(self, data):
+        return self.peer.send(data)
+
+    def close(self):
+        if self.peer is not None:
+            self.peer.close()
+
+
+class UnixSocketTransport:
+    """
+    Listens on a Unix domain socket and streams every record to all
+    connected readers. Each reader has a bounded backlog; a reader that
+    falls behind loses records rather than slowing detection down.
+    """
+    def __init__(self, path, max_pending=1024 * 1024):
+        self.path = path
+        self.max_pending = max_pending
+        if os.path.exists(path):
+            os.unlink(path)
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(path)
+        self.server.listen()
+        self.server.setblocking(False)
+        self.peers = []
+
+    def connect(self, header):
+        """Accept pending readers; True when at least one is connected."""
+        while True:
+            try:
+                conn, _ = self.server.accept()
+            except (BlockingIOError, InterruptedError):
+                break
+            conn.setblocking(False)
+            self.peers.append(_Peer(conn.send, conn.close, header, self.max_pending))
+        return bool(self.peers)
+
+    def send(self, data):
+        delivered = True
+        for peer in self.peers:
+            delivered = peer.send(data) and delivered
+        if any(peer.closed for peer in self.peers):
+            self.peers = [peer for peer in self.peers if not peer.closed]
+        return delivered and bool(self.peers)
+
+    def close(self):
+        for peer in self.peers:
+            peer.flush()
+            peer.close()
+        self.server.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+class StreamSink(Sink):
+    """
+    Encodes each frame ('binary' or 'jsonl', see glfps.detection_codec) and
+    hands it to a transport. Transports never block: records that cannot be
+    delivered are counted in `dropped`.
+    """
+    def __init__(self, transport, format='binary'):
+        self.transport = transport
+        self.encoder = create_encoder(format)
+        self.written = 0
+        self.dropped = 0
+
+    def write(self, frame_id, timestamp, detections):
+        if not self.transport.connect(self.encoder.header):
+            self.dropped += 1  # Nobody listening; skip encoding entirely
+            return
+        data = self.encoder.encode(frame_id, timestamp, detections)
+        if self.transport.send(data):
+            self.written += 1
+        else:
+            self.dropped += 1
+
+    def stats(self):
+        return {"written": self.written, "dropped": self.dropped}
+
+    def close(self):
+        self.transport.close()
+        if self.dropped:
+            print(f"⚠️ {type(self.transport).__name__}: {self.dropped} of "
+                  f"{self.written + self.dropped} frames dropped", file=sys.stderr)
+
+
+SINK_TYPES = {
+    'jsonl': JsonlSink,
+    'stdout': lambda **options: JsonlSink(path='-', **options),
+    'null': NullSink,
+    'binary': lambda path, flush_every=1: StreamSink(FileTransport(path, flush_every), 'binary'),
+    'fifo': lambda path, format='binary', max_pending=1024 * 1024:
+        StreamSink(FifoTransport(path, max_pending), format),
+    'unix': lambda path, format='binary', max_pending=1024 * 1024:
+        StreamSink(UnixSocketTransport(path, max_pending), format),
+}
+
+
+def create_sink(spec):
+    """
+    Create a sink from a config entry such as {"type": "jsonl", "path": "out.jsonl"}.
+    A bare string is a JSONL path ('-' for stdout), a '.bin' path for the
+    binary format, or 'unix:PATH' / 'fifo:PATH' for a binary stream.
+    """
+    if isinstance(spec, str):
+        kind, sep, path = spec.partition(':')
+        if sep and kind in ('unix', 'fifo'):
+            return SINK_TYPES[kind](path=path)
+        if spec.endswith('.bin'):
+            return SINK_TYPES['binary'](path=spec)
+        return JsonlSink(path=spec)
+    options = dict(spec)
+    sink_type = options.pop('type', 'jsonl')
+    if sink_type not in SINK_TYPES:
+        raise ValueError(f"Unknown sink type '{sink_type}', expected one of: {', '.join(SINK_TYPES)}")
+    return SINK_TYPES[sink_type](**options)
@@ -0,0 +1,170 @@
+"""
+Video decoding off the inference thread.
+
+ThreadedVideoReader decodes on a background thread into a bounded queue,
+so inference never waits on cv2.VideoCapture.read() while frames are
+buffered. Frames skipped by a stride are only grab()bed (demuxed and
+decoded into the codec's internal buffer) and never retrieve()d, which
+saves the colour conversion and copy out of the decoder.
+
+keyframe_chunks() splits a video into frame ranges that start on
+keyframes, so independent readers for parallel chunks can seek without
+decoding from an earlier keyframe first.
+"""
+
+import queue
+import shutil
+import subprocess
+import threading
+from typing import List, Optional, Tuple
+
+import cv2
+
+_END = object()
+
+
+class ThreadedVideoReader:
+    """
+    Iterates (frame_index, frame) over frames start, start + stride, ...
+    below end (default: the whole video). Frames are prefetched by a
+    daemon thread up to queue_size ahead; iteration stops at the end of the
+    range or the first frame that fails to decode. Also offers a
+    cv2.VideoCapture-style read() returning (ok, frame).
+    """
+    def __init__(self, path, start=0, end=None, stride=1, queue_size=8):
+        self.path = path
+        self.start = max(0, start)
+        self.stride = max(1, stride)
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise ValueError(f"Cannot open video {path}")
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        # Streams of unknown length report no frame count: read until decode fails
+        self.end = end if end else (self.frame_count if self.frame_count > 0 else None)
+        self.frame_index = -1  # Index of the frame last returned
+        self._queue = queue.Queue(maxsize=max(1, queue_size))
+        self._stop = threading.Event()
+        self._error = None
+        self._done = False
+        self._thread = threading.Thread(target=self._decode, daemon=True, name=f"decode-{path}")
+        self._thread.start()
+
+    def _put(self, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _decode(self):
+        cap = self.cap
+        try:
+            if self.start:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, self.start)
+            index = self.start
+            while not self._stop.is_set() and (self.end is None or index < self.end):
+                ok, frame = cap.read()
+                if not ok:
+                    break
+                if not self._put((index, frame)):
+                    return
+                index += 1
+                # Advance to the next sampled frame without converting the ones in between
+                for _ in range(self.stride - 1):
+                    if (self.end is not None and index >= self.end) or not cap.grab():
+                        return
+                    index += 1
+        except Exception as e:
+            self._error = e
+        finally:
+            self._put(_END)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> Tuple[int, object]:
+        if self._done:
+            raise StopIteration
+        item = self._queue.get()
+        if item is _END:
+            self._done = True
+            if self._error is not None:
+                raise self._error
+            raise StopIteration
+        self.frame_index = item[0]
+        return item
+
+    def read(self):
+        """(True, frame) for the next sampled frame, (False, None) at the end."""
+        try:
+            return True, next(self)[1]
+        except StopIteration:
+            return False, None
+
+    def buffered(self) -> int:
+        """Decoded frames waiting to be consumed."""
+        return self._queue.qsize()
+
+    def isOpened(self) -> bool:
+        return not self._done
+
+    def release(self):
+        self._stop.set()
+        self._thread.join(timeout=2)
+        self.cap.release()
+        self._done = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def keyframe_indices(path, fps=None, ffprobe="ffprobe") -> Optional[List[int]]:
+    """
+    Frame indices of the video's keyframes, read from packet flags with
+    ffprobe (no decoding). None if ffprobe is unavailable or fails.
+    """
+    if shutil.which(ffprobe) is None:
+        return None
+    if fps is None:
+        cap = cv2.VideoCapture(path)
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        cap.release()
+    cmd = [ffprobe, "-v", "error", "-select_streams", "v:0",
+           "-show_entries", "packet=pts_time,flags", "-of", "csv=p=0", path]
+    try:
+        output = subprocess.run(cmd, capture_output=True, text=True, timeout=60, check=True).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    times = []
+    for line in output.splitlines():
+        fields = line.strip().split(",")
+        if len(fields) >= 2 and fields[1].startswith("K") and fields[0] not in ("", "N/A"):
+            times.append(float(fields[0]))
+    if not times:
+        return None
+    first = min(times)
+    return sorted({round((t - first) * fps) for t in times})
+
+
+def keyframe_chunks(path, frame_count, chunk_size, fps=None, ffprobe="ffprobe") -> List[Tuple[int, int]]:
+    """
+    Split frames [0, frame_count) into (start, end) ranges of roughly
+    chunk_size frames whose starts fall on keyframes. Falls back to evenly
+    sized ranges when keyframes cannot be read.
+    """
+    if frame_count <= 0:
+        return []
+    keyframes = keyframe_indices(path, fps, ffprobe)
+    if not keyframes:
+        return [(start, min(start + chunk_size, frame_count)) for start in range(0, frame_count, chunk_size)]
+    starts = [0]
+    for keyframe in keyframes:
+        if keyframe - starts[-1] >= chunk_size and keyframe < frame_count:
+            starts.append(keyframe)
+    return [(start, end) for start, end in zip(starts, starts[1:] + [frame_count])]
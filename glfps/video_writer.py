@@ -0,0 +1,121 @@
+"""
+Annotated video output off the detection thread.
+
+AsyncVideoWriter takes (frame, detections) pairs through a bounded queue
+and draws the overlay and encodes with cv2.VideoWriter on a thread of its
+own. cv2 releases the GIL while drawing and encoding, so the producer only
+pays for a queue put. When the queue is full the 'block' policy waits
+(back-pressure: no frame is lost), and 'drop' discards the frame and counts
+it (live use, where stalling the producer is worse than a gap).
+"""
+
+import queue
+import threading
+import time
+from typing import Optional
+
+import cv2
+
+from glfps.overlay import draw_detections
+
+POLICIES = ('block', 'drop')
+_END = object()
+
+
+class AsyncVideoWriter:
+    """
+    Encodes frames to a video file on a background thread. Frames passed to
+    write() are drawn on in place and must not be modified by the caller
+    afterwards; pass copy=True to write() when the caller reuses the buffer.
+    The frame size is taken from the first frame unless given.
+    """
+    def __init__(self, path, fps=30.0, frame_size=None, fourcc='mp4v', queue_size=32, policy='block'):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy '{policy}', expected one of: {', '.join(POLICIES)}")
+        self.path = path
+        self.fps = fps or 30.0
+        self.frame_size = frame_size
+        self.fourcc = fourcc
+        self.policy = policy
+        self.written = 0
+        self.dropped = 0
+        self.encode_seconds = 0.0
+        self.error = None
+        self._writer = None
+        self._queue = queue.Queue(maxsize=max(1, queue_size))
+        self._thread = threading.Thread(target=self._run, daemon=True, name=f"encode-{path}")
+        self._thread.start()
+
+    def write(self, frame, detections=None, copy=False) -> bool:
+        """Queue a frame (and the detections to draw on it). False if it was dropped."""
+        if self.error is not None:
+            raise self.error
+        item = (frame.copy() if copy else frame, detections)
+        if self.policy == 'drop':
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:
+                self.dropped += 1
+                return False
+        else:
+            self._queue.put(item)
+        return True
+
+    def _open(self, frame):
+        if self.frame_size is None:
+            height, width = frame.shape[:2]
+            self.frame_size = (width, height)
+        self._writer = cv2.VideoWriter(self.path, cv2.VideoWriter_fourcc(*self.fourcc), self.fps, self.frame_size)
+        if not self._writer.isOpened():
+            raise IOError(f"Cannot open video writer for {self.path}")
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _END:
+                break
+            if self.error is not None:
+                continue  # Keep draining so a blocked producer can finish
+            frame, detections = item
+            started = time.perf_counter()
+            try:
+                if self._writer is None:
+                    self._open(frame)
+                if detections:
+                    draw_detections(frame, detections)
+                if (frame.shape[1], frame.shape[0]) != self.frame_size:
+                    frame = cv2.resize(frame, self.frame_size)
+                self._writer.write(frame)
+                self.written += 1
+            except Exception as e:
+                self.error = e
+            self.encode_seconds += time.perf_counter() - started
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> dict:
+        return {
+            "written": self.written,
+            "dropped": self.dropped,
+            "pending": self.pending(),
+            "encode_fps": self.written / self.encode_seconds if self.encode_seconds else 0.0,
+        }
+
+    def close(self, timeout: Optional[float] = None):
+        """Encode everything still queued, then finalize the file."""
+        self._queue.put(_END)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            return  # Still encoding: releasing the writer now would pull it out from under the thread
+        if self._writer is not None:
+            self._writer.release()
+            self._writer = None
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
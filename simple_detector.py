@@ -6,10 +6,9 @@ A focused application for real-time screen detection with settings.
 
 import sys
 import os
+import json
 import platform
 import cv2
-import numpy as np
-import pyautogui
 import threading
 import time
 import subprocess
@@ -20,23 +19,40 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QLineEdit, QTextEdit, QProgressBar, QSystemTrayIcon,
                              QMenu, QAction)
 from PyQt5.QtCore import QTimer, Qt, QThread, pyqtSignal
-from PyQt5.QtGui import QImage, QPixmap, QFont, QIcon, QColor
+from PyQt5.QtGui import QFont, QIcon, QColor
 
-# Optional keyboard import for hotkeys
-try:
-    import keyboard
-    KEYBOARD_AVAILABLE = True
-except ImportError:
-    keyboard = None
-    KEYBOARD_AVAILABLE = False
-    print("⚠️ keyboard module not installed - hotkeys will use GUI-based detection only")
+# Optional keyboard module for hotkeys, imported by setup_hotkeys after the
+# window is shown (it starts a listener thread and is slow to import)
+keyboard = None
+KEYBOARD_AVAILABLE = None
+
+def load_keyboard():
+    """Import the optional keyboard module on first use."""
+    global keyboard, KEYBOARD_AVAILABLE
+    if KEYBOARD_AVAILABLE is None:
+        try:
+            import keyboard as keyboard_module
+            keyboard = keyboard_module
+            KEYBOARD_AVAILABLE = True
+        except ImportError:
+            KEYBOARD_AVAILABLE = False
+            print("⚠️ keyboard module not installed - hotkeys will use GUI-based detection only")
+    return KEYBOARD_AVAILABLE
 
 # Add the project root to the path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from glfps.detection import DetectionEngine
-from glfps.screen_capture import ScreenCapture
-from glfps.automation import Automation
+from glfps.affinity import StageMonitor, apply_stage, format_report, restore_defaults
+from glfps.detection import filter_detections
+from glfps.screen_capture import ScreenCapture, downscale_frame
+from glfps.overlay import draw_detections
+from glfps.qt_image import frame_to_pixmap
+from glfps.qt_model_loader import ModelLoader
+from glfps.process_pipeline import ProcessPipeline
+from glfps.result_bus import DetectionResult, ResultBus
+from glfps.profiles import load_profile, save_profile, settings_path, tune_profile
+from glfps.service import load_config, pin_threads
+from glfps.qt_result_bridge import ResultBridge
 from glfps.training.annotator import Annotator
 
 class MouseController:
@@ -83,6 +99,23 @@ class MouseController:
         # Control thread
         self.control_thread = None
         self.running = False
+        self.subscription = None
+
+    def attach(self, result_bus):
+        """Follow the newest result on result_bus; stale results are never acted on."""
+        if self.subscription is not None:
+            self.subscription.close()
+        self.subscription = result_bus.subscribe("mouse", mode='latest')
+
+    def _apply_result(self, result):
+        """Take detections and coordinate mapping from a DetectionResult."""
+        if result.original_size and result.frame_size and \
+                (result.original_size, result.frame_size) != (self.original_frame_size, self.processed_frame_size):
+            self.update_scaling_factors(result.original_size, result.frame_size)
+        left, top = result.monitor_offset
+        if (left, top) != (self.monitor_offset_x, self.monitor_offset_y):
+            self.update_monitor_offset({'left': left, 'top': top})
+        self.current_detections = result.detections
 
     def start(self):
         """Start the mouse control thread."""
@@ -102,6 +135,11 @@ class MouseController:
     def _control_loop(self):
         """Main control loop for mouse movement."""
         while self.running:
+            if self.subscription is not None:
+                result = self.subscription.poll()
+                if result is not None:
+                    self._apply_result(result)
+            
             # Handle normal mouse movement if enabled
             if self.enabled:
                 self._move_to_target()
@@ -177,6 +215,7 @@ class MouseController:
             
             # Move mouse to center of detection with longer duration for smoother movement
             try:
+                import pyautogui  # Deferred: slow to import and needs a display
                 # Calculate distance to determine movement duration
                 distance = 0
                 if self.last_position:
@@ -296,84 +335,66 @@ class MouseController:
         return scaled_x, scaled_y
 
 class DetectionThread(QThread):
-    """Thread for running detection to prevent GUI freezing."""
-    frame_ready = pyqtSignal(np.ndarray, list)
+    """
+    Thread for running detection to prevent GUI freezing. Every frame's
+    result is published on result_bus; the GUI and mouse controller subscribe.
+    """
     error_occurred = pyqtSignal(str)
     
-    def __init__(self, screen_capture, detector, detection_mode, target_parts, mouse_controller):
+    def __init__(self, screen_capture, detector, detection_mode, target_parts, result_bus, stages=None,
+                 max_width=1280):
         super().__init__()
+        self.max_width = max_width
         self.screen_capture = screen_capture
         self.detector = detector
         self.detection_mode = detection_mode
         self.target_parts = target_parts
-        self.mouse_controller = mouse_controller
+        self.result_bus = result_bus
+        self.stages = stages or {}
+        self.monitor = StageMonitor("inference")
+        self.frame_id = 0
         self.running = False
         
+    def swap_detector(self, detector):
+        """Switch to a new (already loaded) detector; takes effect on the next frame."""
+        self.detector = detector
+        
+    def set_target_parts(self, target_parts):
+        """Change the body part filter; takes effect on the next frame."""
+        self.target_parts = list(target_parts)
+        
+    def stage_reports(self):
+        return [self.monitor.report()]
+        
     def run(self):
+        # Capture runs on this thread too, so it is placed as the inference stage
+        apply_stage("inference", self.stages.get("inference"))
         self.running = True
         while self.running:
             try:
+                # Read the detector once per frame so a swap never splits a frame
+                detector = self.detector
                 frame = self.screen_capture.get_frame()
                 if frame is None:
                     continue
+                self.monitor.tick()
                 
                 # Store original frame size
                 original_height, original_width = frame.shape[:2]
                 original_size = (original_width, original_height)
                 
                 # Resize for performance
-                processed_frame = frame.copy()
-                if original_width > 1280:
-                    scale = 1280 / original_width
-                    new_width = int(original_width * scale)
-                    new_height = int(original_height * scale)
-                    processed_frame = cv2.resize(frame, (new_width, new_height))
+                processed_frame = downscale_frame(frame, max_width=self.max_width)
                 
                 processed_size = (processed_frame.shape[1], processed_frame.shape[0])
+                monitor_info = self.screen_capture.get_monitor_info() or {}
                 
-                # Update mouse controller with scaling information and monitor offset
-                if self.mouse_controller:
-                    self.mouse_controller.update_scaling_factors(original_size, processed_size)
-                    # Get monitor information for coordinate offset
-                    monitor_info = self.screen_capture.get_monitor_info()
-                    self.mouse_controller.update_monitor_offset(monitor_info)
-                
-                # Run detection on processed frame
-                if self.detection_mode == "All Body Parts":
-                    detections = self.detector.detect(processed_frame)
-                elif self.detection_mode == "Person Only":
-                    detections = [d for d in self.detector.detect(processed_frame) if d["label"] == "person"]
-                else:  # Custom Selection
-                    print(f"🔍 Custom Selection Mode - Target parts: {self.target_parts}")
-                    # Get all detections first
-                    all_detections = self.detector.detect(processed_frame)
-                    
-                    # Filter based on target parts
-                    detections = []
-                    for det in all_detections:
-                        if det["label"] in self.target_parts:
-                            detections.append(det)
-                    
-                    print(f"🔍 Custom Selection - Found {len(detections)} detections")
-                
-                # Filter detections based on current checkbox states (for all modes)
-                if self.detection_mode == "Custom Selection":
-                    # Only show detections for checked body parts
-                    filtered_detections = []
-                    for det in detections:
-                        if det["label"] in self.target_parts:
-                            filtered_detections.append(det)
-                    detections = filtered_detections
-                    print(f"🔍 After filtering: {len(detections)} detections")
-                elif self.detection_mode == "All Body Parts":
-                    # For "All Body Parts" mode, still respect checkbox states if they were changed
-                    if hasattr(self, 'target_parts') and self.target_parts:
-                        filtered_detections = []
-                        for det in detections:
-                            if det["label"] in self.target_parts:
-                                filtered_detections.append(det)
-                        detections = filtered_detections
-                        print(f"🔍 All Body Parts mode - Filtered to {len(detections)} detections")
+                # Run detection on processed frame and filter by mode/checkbox states
+                all_detections = detector.detect(processed_frame)
+                detections = filter_detections(all_detections, self.detection_mode, self.target_parts)
+                if self.detection_mode != "Person Only":
+                    print(f"🔍 {self.detection_mode} - Target parts: {self.target_parts}, "
+                          f"{len(detections)} of {len(all_detections)} detections kept")
                 
                 # Debug: Print detection info
                 if detections:
@@ -384,11 +405,16 @@ class DetectionThread(QThread):
                 else:
                     print(f"🎯 No detections found for current settings")
                 
-                # Update mouse controller with detections
-                if self.mouse_controller:
-                    self.mouse_controller.update_detections(detections)
-                
-                self.frame_ready.emit(processed_frame, detections)
+                self.result_bus.publish(DetectionResult(
+                    frame_id=self.frame_id,
+                    timestamp=time.time(),
+                    detections=detections,
+                    frame=processed_frame,
+                    frame_size=processed_size,
+                    original_size=original_size,
+                    monitor_offset=(monitor_info.get('left', 0), monitor_info.get('top', 0)),
+                ))
+                self.frame_id += 1
                 
             except Exception as e:
                 self.error_occurred.emit(str(e))
@@ -403,15 +429,125 @@ class DetectionThread(QThread):
             self.terminate()
             self.wait(1000)  # Wait for termination
 
+class ProfileTuner(QThread):
+    """Tunes and stores the performance profile of a model on this machine (see glfps.profiles)."""
+    tuned = pyqtSignal(str, object)  # model_path, profile dict
+    failed = pyqtSignal(str, str)    # model_path, error message
+    
+    def __init__(self, model_path, parent=None):
+        super().__init__(parent)
+        self.model_path = model_path
+        
+    def run(self):
+        try:
+            profile = tune_profile(self.model_path)
+            save_profile(self.model_path, profile)
+        except Exception as e:
+            self.failed.emit(self.model_path, str(e))
+            return
+        self.tuned.emit(self.model_path, profile)
+
+class ProcessDetectionThread(QThread):
+    """
+    Drop-in for DetectionThread that runs capture and inference in separate
+    processes (see glfps.process_pipeline). This thread only receives results
+    and reads the matching frame from shared memory for display.
+    """
+    error_occurred = pyqtSignal(str)
+    
+    def __init__(self, model_path, monitor_index, fps, detection_mode, target_parts, result_bus, stages=None):
+        super().__init__()
+        self.pipeline = ProcessPipeline(model_path=model_path, monitor_index=monitor_index, max_fps=fps,
+                                        stages=stages)
+        self.detection_mode = detection_mode
+        self.target_parts = target_parts
+        self.result_bus = result_bus
+        self.running = False
+        
+    def swap_detector(self, detector):
+        """Workers load their own model; a new model takes effect when detection is restarted."""
+        print("ℹ️ Model change applies after restarting multi-process detection")
+        
+    def set_target_parts(self, target_parts):
+        """Change the body part filter; takes effect on the next result."""
+        self.target_parts = list(target_parts)
+        
+    def set_fps(self, fps):
+        self.pipeline.set_fps(fps)
+        
+    def stage_reports(self):
+        # dict.copy() runs without releasing the GIL, so it cannot see this thread's updates half-done
+        return list(self.pipeline.stage_stats.copy().values())
+        
+    def run(self):
+        self.running = True
+        last_frame_id = -1
+        try:
+            self.pipeline.start()
+            while self.running:
+                result = self.pipeline.get_result(timeout=0.1)
+                if result is None:
+                    if not self.pipeline.is_alive():
+                        raise RuntimeError("Capture or inference process exited")
+                    continue
+                if result["frame_id"] <= last_frame_id:
+                    continue  # Another worker already delivered a newer frame
+                last_frame_id = result["frame_id"]
+                
+                detections = filter_detections(result["detections"], self.detection_mode, self.target_parts)
+                self.result_bus.publish(DetectionResult(
+                    frame_id=result["frame_id"],
+                    timestamp=result["timestamp_ns"] / 1e9,
+                    detections=detections,
+                    frame=self.pipeline.read_frame(result["frame_id"]),
+                    frame_size=tuple(result["frame_size"]),
+                    original_size=tuple(result["original_size"]),
+                    monitor_offset=tuple(result["monitor_offset"]),
+                ))
+        except Exception as e:
+            if self.running:
+                self.error_occurred.emit(str(e))
+        finally:
+            self.pipeline.stop()
+    
+    def stop(self):
+        """Stop the pipeline processes and this thread."""
+        self.running = False
+        if not self.wait(5000):
+            print("⚠️ Process detection thread did not stop gracefully, terminating...")
+            self.terminate()
+            self.wait(1000)
+            self.pipeline.stop()
+
 class DetectionTab(QWidget):
     """Main detection interface."""
     
     def __init__(self):
         super().__init__()
         self.mouse_controller = MouseController()
+        self.result_bus = ResultBus()
+        self.mouse_controller.attach(self.result_bus)
+        self.result_bridge = ResultBridge(self.result_bus, self)
+        self.result_bridge.result_ready.connect(self.on_result)
+        self.model_loader = ModelLoader(self)
+        self.model_loader.model_loaded.connect(self.on_model_loaded)
+        self.model_loader.model_failed.connect(self.on_model_failed)
+        self.requested_model = None
+        self.start_pending = False  # Start was clicked before the model finished loading
+        # Tuned per machine and model (glfps.profiles); saved settings take precedence for FPS
+        self.profile = None
+        self.profile_tuner = None
+        self.backend = 'torch'
+        self.use_profile_fps = True
+        self.max_width = 1280
+        # Stage CPU sets / nice values from the config in $GLFPS_CONFIG, if any (see glfps.affinity)
+        self.stages = load_config(os.environ.get("GLFPS_CONFIG"))["stages"]
+        self.render_monitor = StageMonitor("render")
         self.init_ui()
         self.detection_thread = None
-        self.setup_hotkeys()
+        # Deferred until the event loop runs so the window appears first
+        QTimer.singleShot(0, self.setup_hotkeys)
+        QTimer.singleShot(0, self.preload_model)
         
     def keyPressEvent(self, event):
         """Handle key press events for emergency stop."""
@@ -489,6 +625,11 @@ class DetectionTab(QWidget):
         
         control_layout.addLayout(top_row)
         
+        # Run capture and inference in their own processes so UI work cannot stall inference
+        self.multiprocess_checkbox = QCheckBox("Multi-process mode (capture and inference in separate processes)")
+        self.multiprocess_checkbox.setToolTip("Model and monitor changes apply when detection is restarted")
+        control_layout.addWidget(self.multiprocess_checkbox)
+        
         # Detection Mode
         mode_layout = QHBoxLayout()
         mode_layout.addWidget(QLabel("Detection Mode:"))
@@ -630,7 +771,7 @@ class DetectionTab(QWidget):
         
     def setup_hotkeys(self):
         """Setup global hotkeys for mouse control."""
-        if not KEYBOARD_AVAILABLE:
+        if not load_keyboard():
             print("⚠️ keyboard module not available - using GUI-based key detection only")
             print("⚠️ ESC key will work when GUI is focused")
             self.setup_fallback_hotkeys()
@@ -726,13 +867,84 @@ class DetectionTab(QWidget):
             self.mouse_status_label.setText("Status: Disabled")
             self.mouse_status_label.setStyleSheet("color: #e74c3c; font-size: 12px;")
         
+    def preload_model(self):
+        """Load and warm up the selected model in the background after startup."""
+        if self.detector is None and self.requested_model is None:
+            self.on_model_changed(self.model_combo.currentText())
+    
     def on_model_changed(self, model_path):
-        try:
-            self.detector = DetectionEngine(model_path=model_path)
-            self.status_label.setText(f"Model loaded: {model_path}")
-        except Exception as e:
-            self.status_label.setText(f"Error loading model: {e}")
-            QMessageBox.warning(self, "Model Error", f"Failed to load model: {e}")
+        """Load the model in the background; detection keeps running on the old one until it is ready."""
+        self.requested_model = model_path
+        profile = load_profile(model_path)
+        if profile is None:
+            self.start_profile_tuning(model_path)
+            return
+        self.apply_profile(profile)
+        self.status_label.setText(f"Loading model: {model_path}...")
+        self.model_loader.load(model_path, self.backend)
+    
+    def start_profile_tuning(self, model_path):
+        """First use of this model on this machine: measure it, then load it with the tuned settings."""
+        if self.profile_tuner is not None and self.profile_tuner.isRunning():
+            return  # on_profile_tuned picks up the newest requested model
+        self.status_label.setText(f"Tuning performance profile for {os.path.basename(model_path)}...")
+        self.profile_tuner = ProfileTuner(model_path, self)
+        self.profile_tuner.tuned.connect(self.on_profile_tuned)
+        self.profile_tuner.failed.connect(self.on_profile_failed)
+        self.profile_tuner.start()
+    
+    def on_profile_tuned(self, model_path, profile):
+        self.on_model_changed(self.requested_model)
+    
+    def on_profile_failed(self, model_path, error):
+        print(f"⚠️ Profile tuning failed for {model_path}: {error}; using defaults")
+        if model_path == self.requested_model:
+            self.status_label.setText(f"Loading model: {model_path}...")
+            self.model_loader.load(model_path, self.backend)
+        else:
+            self.on_model_changed(self.requested_model)
+    
+    def apply_profile(self, profile):
+        """Use a tuned profile: backend and threads for the next load, imgsz per detector, capture FPS."""
+        self.profile = profile
+        self.backend = profile.get("backend") or 'torch'
+        if profile.get("threads"):
+            pin_threads({"torch": profile["threads"]})
+        if self.use_profile_fps and profile.get("fps"):
+            self.fps_spinbox.setValue(profile["fps"])
+    
+    def configure_detector(self, detector):
+        """This window's view of a cached engine: the profile's imgsz without changing the shared engine."""
+        if self.profile and self.profile.get("imgsz"):
+            return detector.with_inference_args(imgsz=self.profile["imgsz"])
+        return detector
+    
+    def retune_profile(self):
+        model_path = self.requested_model or self.model_combo.currentText()
+        self.requested_model = model_path
+        self.start_profile_tuning(model_path)
+    
+    def on_model_loaded(self, model_path, detector):
+        if model_path != self.requested_model:
+            return  # Superseded by a newer selection
+        self.detector = self.configure_detector(detector)
+        if self.detection_thread and self.detection_thread.isRunning():
+            self.detection_thread.swap_detector(self.detector)
+        self.status_label.setText(f"Model loaded: {model_path}")
+        if self.start_pending:
+            self.start_pending = False
+            self.start_btn.setEnabled(True)
+            self.toggle_detection()
+    
+    def on_model_failed(self, model_path, error):
+        if model_path != self.requested_model:
+            return  # Superseded by a newer selection
+        self.requested_model = None
+        if self.start_pending:
+            self.start_pending = False
+            self.start_btn.setEnabled(True)
+        self.status_label.setText(f"Error loading model: {error}")
+        QMessageBox.warning(self, "Model Error", f"Failed to load model: {error}")
     
     def pick_model_file(self):
         path, _ = QFileDialog.getOpenFileName(self, "Select Model File", "", "PyTorch Model (*.pt)")
@@ -774,6 +986,8 @@ class DetectionTab(QWidget):
             print(f"❌ Error changing monitor: {e}")
     
     def on_fps_changed(self, fps):
+        if isinstance(self.detection_thread, ProcessDetectionThread):
+            self.detection_thread.set_fps(fps)
         if self.screen_capture is not None:
             self.screen_capture.set_fps(fps)
             self.status_label.setText(f"FPS set to {fps}")
@@ -820,7 +1034,7 @@ class DetectionTab(QWidget):
                           if checkbox.isChecked()]
             
             # Update the detection thread's target parts
-            self.detection_thread.target_parts = target_parts
+            self.detection_thread.set_target_parts(target_parts)
             
             # Also update the mouse controller's target parts
             if self.mouse_controller:
@@ -858,32 +1072,51 @@ class DetectionTab(QWidget):
             if self.screen_capture is None:
                 self.screen_capture = ScreenCapture(monitor_index=1, max_fps=self.fps_spinbox.value())
             
-            if self.detector is None:
-                try:
-                    self.detector = DetectionEngine(model_path=self.model_combo.currentText())
-                except Exception as e:
-                    QMessageBox.warning(self, "Model Error", f"Failed to load model: {e}")
-                    return
-            
-            # Test capture
-            if not self.screen_capture.test_capture():
-                QMessageBox.warning(self, "Capture Error", "Screen capture not working.")
-                return
-            
             # Start detection thread
             target_parts = [part for part, checkbox in self.body_part_checkboxes.items() 
                           if checkbox.isChecked()]
             
-            self.detection_thread = DetectionThread(
-                self.screen_capture, 
-                self.detector, 
-                self.detection_mode.currentText(),
-                target_parts,
-                self.mouse_controller
-            )
-            self.detection_thread.frame_ready.connect(self.update_frame)
+            if self.multiprocess_checkbox.isChecked():
+                # Capture and inference run in child processes; nothing to load here
+                self.detection_thread = ProcessDetectionThread(
+                    self.requested_model or self.model_combo.currentText(),
+                    self.screen_capture.monitor_index,
+                    self.fps_spinbox.value(),
+                    self.detection_mode.currentText(),
+                    target_parts,
+                    self.result_bus,
+                    self.stages
+                )
+            else:
+                if self.detector is None:
+                    # Start once the background load is done instead of loading on the GUI thread
+                    self.start_pending = True
+                    self.start_btn.setEnabled(False)
+                    if self.requested_model is None:  # Not started yet, or the last load failed
+                        self.on_model_changed(self.model_combo.currentText())
+                    self.status_label.setText(f"Waiting for model: {self.requested_model}...")
+                    return
+                
+                # Test capture
+                if not self.screen_capture.test_capture():
+                    QMessageBox.warning(self, "Capture Error", "Screen capture not working.")
+                    return
+                
+                self.detection_thread = DetectionThread(
+                    self.screen_capture, 
+                    self.detector, 
+                    self.detection_mode.currentText(),
+                    target_parts,
+                    self.result_bus,
+                    self.stages,
+                    self.max_width
+                )
+            self.render_monitor = StageMonitor("render")
             self.detection_thread.error_occurred.connect(self.on_detection_error)
             self.detection_thread.start()
+            # Results are drawn on this (the GUI) thread. Pinned only now: threads and processes
+            # inherit the settings of the thread that starts them
+            apply_stage("render", self.stages.get("render"))
             
             self.is_detecting = True
             self.start_btn.setText("Stop Detection")
@@ -916,6 +1149,8 @@ class DetectionTab(QWidget):
             
             # Stop detection thread
             if self.detection_thread:
+                for report in self.detection_thread.stage_reports() + [self.render_monitor.report()]:
+                    print(f"⏱️ {format_report(report)}")
                 try:
                     self.detection_thread.stop()
                     if not self.detection_thread.wait(3000):  # Wait up to 3 seconds
@@ -926,6 +1161,8 @@ class DetectionTab(QWidget):
                     print(f"⚠️ Error stopping detection thread: {e}")
                 finally:
                     self.detection_thread = None
+            # Back to the process defaults, so model loaders started from here are not pinned
+            restore_defaults()
             
             # Reset state
             self.is_detecting = False
@@ -952,39 +1189,18 @@ class DetectionTab(QWidget):
             self.video_label.setText("No video feed")
             print("✅ Detection stopped successfully")
     
+    def on_result(self, result):
+        if result.frame is not None and self.is_detecting:
+            self.render_monitor.tick()
+            # Other subscribers may hold the same frame; draw on a copy
+            self.update_frame(result.frame.copy(), result.detections)
+    
     def update_frame(self, frame, detections):
-        # Color mapping for body parts
-        colors = {
-            'head': (255, 0, 0), 'face': (255, 0, 255), 'torso': (0, 255, 0),
-            'left_arm': (255, 165, 0), 'right_arm': (255, 165, 0),
-            'left_leg': (128, 0, 128), 'right_leg': (128, 0, 128),
-            'left_hand': (0, 255, 255), 'right_hand': (0, 255, 255),
-            'left_foot': (165, 42, 42), 'right_foot': (165, 42, 42),
-            'body': (0, 255, 0), 'person': (0, 255, 0)
-        }
-        
         # Draw detections
-        for det in detections:
-            x, y, w, h = det["bbox"]
-            label = det["label"]
-            conf = det["confidence"]
-            
-            color = colors.get(label, (0, 255, 0))
-            cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
-            
-            label_text = f"{label.replace('_', ' ').title()} {int(conf * 100)}%"
-            cv2.putText(frame, label_text, (x, y - 10), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+        draw_detections(frame, detections, mark_body_parts=False)
         
         # Convert to Qt format
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        h, w, ch = rgb_frame.shape
-        bytes_per_line = ch * w
-        qt_image = QImage(rgb_frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
-        
-        # Scale to fit label
-        scaled_image = qt_image.scaled(self.video_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
-        self.video_label.setPixmap(QPixmap.fromImage(scaled_image))
+        self.video_label.setPixmap(frame_to_pixmap(frame, self.video_label.size()))
     
     def on_detection_error(self, error_msg):
         self.status_label.setText(f"Detection error: {error_msg}")
@@ -1105,8 +1321,15 @@ class SettingsTab(QWidget):
         self.max_frame_width.setRange(640, 1920)
         self.max_frame_width.setValue(1280)
         self.max_frame_width.setToolTip("Maximum frame width for processing")
+        self.max_frame_width.valueChanged.connect(self.on_max_frame_width_changed)
         perf_layout.addRow("Max Frame Width:", self.max_frame_width)
         
+        # Backend, threads, inference size and FPS measured for this machine and model
+        self.retune_btn = QPushButton("Retune Performance Profile")
+        self.retune_btn.setToolTip("Benchmark the selected model again on this machine")
+        self.retune_btn.clicked.connect(self.retune_profile)
+        perf_layout.addRow("Profile:", self.retune_btn)
+        
         perf_group.setLayout(perf_layout)
         layout.addWidget(perf_group)
         
@@ -1162,12 +1385,12 @@ class SettingsTab(QWidget):
         cv_version = cv2.__version__
         info_layout.addRow("OpenCV Version:", QLabel(cv_version))
         
-        # Check PyAutoGUI version
+        # Check PyAutoGUI version (from package metadata, without importing it)
         try:
-            import pyautogui
-            pyautogui_version = pyautogui.__version__
+            from importlib.metadata import version
+            pyautogui_version = version("PyAutoGUI")
             info_layout.addRow("PyAutoGUI Version:", QLabel(pyautogui_version))
-        except:
+        except Exception:
             info_layout.addRow("PyAutoGUI:", QLabel("Not installed"))
         
         info_group.setLayout(info_layout)
@@ -1242,13 +1465,80 @@ class SettingsTab(QWidget):
         if self.detection_tab and self.detection_tab.mouse_controller:
             self.detection_tab.mouse_controller.set_targeting_position(position)
     
+    def on_max_frame_width_changed(self, width):
+        """Applies to detection started from now on."""
+        if self.detection_tab:
+            self.detection_tab.max_width = width
+    
+    def retune_profile(self):
+        if self.detection_tab:
+            self.detection_tab.retune_profile()
+    
+    def current_settings(self):
+        return {
+            "target_priority": self.target_parts_combo.currentText(),
+            "smoothing": self.smoothing_slider.value(),
+            "target_confidence": self.target_confidence.value(),
+            "debug_targeting": self.debug_targeting.isChecked(),
+            "targeting_position": self.targeting_position_combo.currentText(),
+            "default_fps": self.default_fps.value(),
+            "max_frame_width": self.max_frame_width.value(),
+            "confidence_threshold": self.confidence_threshold.value(),
+            "show_confidence": self.show_confidence.isChecked(),
+            "show_labels": self.show_labels.isChecked(),
+            "show_target_indicator": self.show_target_indicator.isChecked(),
+        }
+    
     def save_settings(self):
-        # TODO: Implement settings save
-        QMessageBox.information(self, "Settings", "Settings saved!")
+        path = settings_path()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                json.dump(self.current_settings(), f, indent=2)
+        except OSError as e:
+            QMessageBox.warning(self, "Settings", f"Could not save settings: {e}")
+            return
+        QMessageBox.information(self, "Settings", f"Settings saved to {path}")
     
-    def load_settings(self):
-        # TODO: Implement settings load
-        QMessageBox.information(self, "Settings", "Settings loaded!")
+    def load_settings(self, quiet=False):
+        """Restore saved settings (quiet: at startup, without message boxes). Returns True if any were loaded."""
+        path = settings_path()
+        try:
+            with open(path) as f:
+                settings = json.load(f)
+        except FileNotFoundError:
+            if not quiet:
+                QMessageBox.information(self, "Settings", "No saved settings found.")
+            return False
+        except (OSError, ValueError) as e:
+            if not quiet:
+                QMessageBox.warning(self, "Settings", f"Could not load settings: {e}")
+            return False
+        
+        # Setting the widgets runs their change handlers, which apply the values
+        combos = {"target_priority": self.target_parts_combo, "targeting_position": self.targeting_position_combo}
+        for key, combo in combos.items():
+            if key in settings:
+                combo.setCurrentText(settings[key])
+        values = {"smoothing": self.smoothing_slider, "target_confidence": self.target_confidence,
+                  "default_fps": self.default_fps, "max_frame_width": self.max_frame_width,
+                  "confidence_threshold": self.confidence_threshold}
+        for key, widget in values.items():
+            if key in settings:
+                widget.setValue(int(settings[key]))
+        checks = {"debug_targeting": self.debug_targeting, "show_confidence": self.show_confidence,
+                  "show_labels": self.show_labels, "show_target_indicator": self.show_target_indicator}
+        for key, checkbox in checks.items():
+            if key in settings:
+                checkbox.setChecked(bool(settings[key]))
+        
+        if self.detection_tab and "default_fps" in settings:
+            # A saved FPS is the user's choice; the tuned profile no longer overrides it
+            self.detection_tab.use_profile_fps = False
+            self.detection_tab.fps_spinbox.setValue(self.default_fps.value())
+        if not quiet:
+            QMessageBox.information(self, "Settings", f"Settings loaded from {path}")
+        return True
     
     def reset_settings(self):
         self.default_fps.setValue(10)
@@ -1277,6 +1567,8 @@ class MainWindow(QMainWindow):
         # Add tabs
         self.detection_tab = DetectionTab()
         self.settings_tab = SettingsTab(self.detection_tab)
+        # Before the detection tab preloads its model, so saved settings apply from the start
+        self.settings_tab.load_settings(quiet=True)
         
         self.tabs.addTab(self.detection_tab, "Detection")
         self.tabs.addTab(self.settings_tab, "Settings")
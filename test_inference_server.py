@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test the inference server against clients that go away mid-request.
+Uses a stand-in engine, so no model is needed.
+"""
+
+import multiprocessing
+import os
+import socket
+import sys
+import tempfile
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from glfps.inference_server import InferenceClient, parse_address, recv_message, send_message
+
+
+class SlowEngine:
+    """Reads every frame only after a delay, like a batch waiting on the GPU."""
+    verbose = False
+
+    def label_names(self):
+        return ["person"]
+
+    def detect_batch(self, frames):
+        time.sleep(0.5)
+        return [[{"bbox": [0, 0, 1, 1], "label": "person", "confidence": float(frame.sum() % 2)}]
+                for frame in frames]
+
+
+class SlowEngineCache:
+    def get(self, model_path, backend='torch'):
+        return SlowEngine()
+
+
+def _serve(address):
+    from glfps import model_cache
+    from glfps.inference_server import InferenceServer
+    model_cache._model_cache = SlowEngineCache()
+    InferenceServer({"torch": "slow"}, address=address, max_delay_ms=1.0).serve_forever()
+
+
+def _wait_for_server(address, timeout=10.0):
+    family, connect_address = parse_address(address)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.socket(family, socket.SOCK_STREAM) as sock:
+                sock.connect(connect_address)
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise TimeoutError("Inference server did not start")
+
+
+def test_disconnect_with_request_in_flight():
+    """A client that disconnects while its frame is queued must not crash the server."""
+    print("🧪 Testing disconnect with a request in flight")
+    with tempfile.TemporaryDirectory() as tmp:
+        address = os.path.join(tmp, "server.sock")
+        server = multiprocessing.get_context('spawn').Process(target=_serve, args=(address,), daemon=True)
+        server.start()
+        try:
+            _wait_for_server(address)
+            shape = (480, 640, 3)
+            shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)))
+            np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)[...] = 7
+            family, connect_address = parse_address(address)
+            sock = socket.socket(family, socket.SOCK_STREAM)
+            sock.connect(connect_address)
+            send_message(sock, {"op": "detect", "id": 1, "shm": shm.name, "shape": list(shape)})
+            # Requests are handled in order, so once hello is answered the frame is queued
+            send_message(sock, {"op": "hello"})
+            assert "backends" in recv_message(sock)
+            # Gone before the batch reads the frame
+            sock.close()
+            shm.close()
+            shm.unlink()
+            time.sleep(1.0)
+            assert server.is_alive(), f"server died with exit code {server.exitcode}"
+
+            client = InferenceClient(address)
+            try:
+                detections = client.detect(np.zeros(shape, dtype=np.uint8))
+            finally:
+                client.close()
+            assert detections and detections[0]["label"] == "person"
+            assert server.is_alive(), f"server died with exit code {server.exitcode}"
+        finally:
+            server.terminate()
+            server.join(5)
+    print("✅ Server survived the disconnect and served the next client")
+
+
+if __name__ == "__main__":
+    test_disconnect_with_request_in_flight()